@@ -1,3 +1,7 @@
+import queue
+import threading
+from dataclasses import asdict
+
 from .models import (
     ParsedResult, 
     ValidationResult, 
@@ -7,9 +11,15 @@ from .models import (
     GenerationResult
 )
 
-from .parser import NaturalLanguageParser, ScopeDetector
+from .parser import NaturalLanguageParser, ScopeDetector, PARSER_VERSION
 from .generator import YAMLGenerator, FileGenerator, BatchGenerator, TemplateRenderer
 from .validator import ParameterValidator, SmartParameterOptimizer, BestPracticesAdvisor
+from .spec_index import SpecIndex, ActionSpec, FlagSpec, get_spec_index
+from .registry import InstanceRegistry, get_registry, get_parser, get_generator
+from .singleflight import SingleFlight, get_generation_flight
+from .result_cache import GenerationCache, get_generation_cache
+from .sinks import ResultSink, YAMLStreamSink, NDJSONSink, open_sink
+from .generator import GENERATOR_VERSION
 from .cli import ChaosBladeCLI
 
 __version__ = "1.0.0"
@@ -40,6 +50,28 @@ __all__ = [
     "SmartParameterOptimizer",
     "BestPracticesAdvisor",
     
+    # Spec
+    "SpecIndex",
+    "ActionSpec",
+    "FlagSpec",
+    "get_spec_index",
+    
+    # Registry
+    "InstanceRegistry",
+    "get_registry",
+    "get_parser",
+    "get_generator",
+    "SingleFlight",
+    "get_generation_flight",
+    "GenerationCache",
+    "get_generation_cache",
+    
+    # Sinks
+    "ResultSink",
+    "YAMLStreamSink",
+    "NDJSONSink",
+    "open_sink",
+    
     # CLI
     "ChaosBladeCLI"
 ]
@@ -70,31 +102,151 @@ def quick_generate(instruction: str, output_file: str = None, model: str = None)
     Returns:
         生成的YAML内容
     """
-    parser = create_parser(model=model)
-    generator = create_generator()
+    # 复用进程级的解析器和生成器，避免每次请求重建客户端和校验器
+    parser = get_parser(model=model)
+    generator = get_generator()
+    
+    # 相同 (指令, 模型) 的并发请求只解析一次（与 stream_generate 共享）
+    parsed_data = get_generation_flight().do(
+        (instruction, model), lambda: _parse_instruction(parser, instruction)
+    )
+    
+    result = generator.generate_yaml(parsed_data)
+    if not result.success:
+        raise Exception(f"生成失败: {result.error_message}")
+    yaml_content = result.yaml_content
+    
+    if output_file:
+        with open(output_file, 'w', encoding='utf-8') as f:
+            f.write(yaml_content)
+    
+    return yaml_content
+
+
+def _parse_instruction(parser: NaturalLanguageParser, instruction: str, on_event=None) -> ParsedResult:
+    """读取缓存或解析指令
+    
+    持久化的解析结果缓存重启后仍可命中；YAML由调用方每次重新生成以获得新的实验名称。
+    on_event 非空时使用流式解析，并把 (事件名, 数据) 逐个交给 on_event。
+    """
+    cache = get_generation_cache()
+    key = _generation_cache_key(parser, instruction)
+    parsed_data = _get_cached_parse(cache, key, parser, instruction)
+    if parsed_data is not None:
+        return parsed_data
+    
+    if on_event is None:
+        parsed_data = parser.parse_instruction(instruction)
+    else:
+        for event, data in parser.stream_instruction(instruction):
+            on_event(event, data)
+            if event != "token":
+                parsed_data = data
+    cache.set(key, parsed_data)
+    return parsed_data
+
+
+def _generation_cache_key(parser: NaturalLanguageParser, instruction: str) -> str:
+    return GenerationCache.make_key(
+        instruction, parser.model_name, parser.mode, parser.specifications.version, PARSER_VERSION,
+        GENERATOR_VERSION
+    )
+
+
+def _get_cached_parse(cache: GenerationCache, key: str, parser: NaturalLanguageParser,
+                      instruction: str):
+    """读取缓存的解析结果，并换上新的带时间戳的实验名称，避免重复的CR名称"""
+    parsed_data = cache.get(key)
+    if parsed_data is not None:
+        parsed_data.name = parser._generate_name(instruction, parsed_data.scope,
+                                                 parsed_data.target, parsed_data.action)
+    return parsed_data
+
+
+def stream_generate(instruction: str, model: str = None):
+    """流式生成YAML，依次产出 (事件名, 数据):
+    
+    - ("parse", {"stage": "rule"|"final", ...解析结果})
+    - ("token", {"text": 大模型增量文本})，仅在调用大模型时出现
+    - ("validation", {"warnings": [...]})
+    - ("yaml", {"yaml_content": ...}) 或 ("error", {"error": ...})
+    
+    解析步骤与 quick_generate 共用SingleFlight: 相同 (指令, 模型) 的并发请求只解析一次，
+    只有执行解析的请求收到token事件，其余请求在解析完成后收到最终结果。
+    """
+    parser = get_parser(model=model)
+    generator = get_generator()
+    
+    # 解析在后台线程中经由SingleFlight执行，事件通过队列转发给当前请求
+    events = queue.Queue()
+    
+    def run():
+        try:
+            parsed = get_generation_flight().do(
+                (instruction, model),
+                lambda: _parse_instruction(parser, instruction, lambda event, data: events.put((event, data)))
+            )
+            events.put(("done", parsed))
+        except BaseException as e:
+            events.put(("failed", e))
+    
+    threading.Thread(target=run, name="stream-parse", daemon=True).start()
+    
+    final_sent = False
+    while True:
+        event, data = events.get()
+        if event == "token":
+            yield "token", {"text": data}
+        elif event == "failed":
+            raise data
+        elif event == "done":
+            parsed_data = data
+            break
+        else:
+            final_sent = event != "rule"
+            yield "parse", dict(asdict(data), stage="rule" if event == "rule" else "final")
+    
+    if not final_sent:
+        yield "parse", dict(asdict(parsed_data), stage="final")
     
-    parsed_data = parser.parse_instruction(instruction)
     result = generator.generate_yaml(parsed_data)
+    yield "validation", {"warnings": parsed_data.warnings + result.warnings}
     
     if result.success:
-        if output_file:
-            with open(output_file, 'w', encoding='utf-8') as f:
-                f.write(result.yaml_content)
-        
-        return result.yaml_content
+        yield "yaml", {"yaml_content": result.yaml_content}
     else:
-        raise Exception(f"生成失败: {result.error_message}")
+        yield "error", {"error": f"生成失败: {result.error_message}"}
 
 
-def batch_generate(instructions: list, output_dir: str = "./generated-yamls") -> list:
+def batch_generate(instructions: list, output_dir: str = "./generated-yamls", pack: bool = False,
+                   max_experiments: int = None, multi_document: bool = False, workers: int = None) -> list:
     """批量生成YAML
     
     Args:
         instructions: 指令列表
         output_dir: 输出目录
+        pack: 是否把兼容的实验打包到同一个ChaosBlade资源中
+        max_experiments: 打包时每个资源的最大实验数
+        multi_document: 打包时输出多文档YAML流而不是合并实验
+        workers: 规则解析的进程数，默认取 BATCH_WORKERS
     
     Returns:
         生成结果列表
     """
+    batch_gen = BatchGenerator(output_dir)
+    if pack:
+        return batch_gen.generate_packed(instructions, max_experiments=max_experiments,
+                                         multi_document=multi_document)
+    return batch_gen.generate_from_instructions(instructions, workers=workers)
+
+
+def iter_batch_generate(instructions, model: str = None, concurrency: int = None):
+    """流式批量生成，按完成顺序逐条产出 (序号, 指令, 生成结果)
+    
+    Args:
+        instructions: 指令序列，可以是惰性迭代器
+        model: 模型名称
+        concurrency: 大模型请求的最大并发数
+    """
     batch_gen = BatchGenerator()
-    return batch_gen.generate_from_instructions(instructions)
\ No newline at end of file
+    return batch_gen.iter_generate(instructions, model, concurrency, save_files=False)
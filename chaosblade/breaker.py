@@ -0,0 +1,137 @@
+import time
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Dict, Any, Tuple, Type
+
+from .settings import get_setting
+
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+DEFAULT_FAILURE_THRESHOLD = 5
+DEFAULT_RESET_TIMEOUT = 30.0
+
+
+class CircuitOpenError(RuntimeError):
+    """熔断器打开，请求未发送"""
+
+
+class CircuitBreaker:
+    """大模型后端熔断器
+
+    连续失败达到阈值后打开，打开期间直接拒绝请求；
+    经过 reset_timeout 后进入半开状态，只放行一个探测请求，
+    探测成功则关闭，失败则重新打开。
+    """
+
+    def __init__(self, name: str, failure_threshold: int = DEFAULT_FAILURE_THRESHOLD,
+                 reset_timeout: float = DEFAULT_RESET_TIMEOUT):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        """当前状态，打开超过 reset_timeout 后视为半开"""
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self) -> str:
+        if self._state == OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+            self._state = HALF_OPEN
+            self._probing = False
+        return self._state
+
+    def allow(self) -> bool:
+        """是否放行本次请求，半开状态下只放行一个探测请求"""
+        with self._lock:
+            state = self._current_state()
+            if state == CLOSED:
+                return True
+            if state == HALF_OPEN and not self._probing:
+                self._probing = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            if self._state != CLOSED:
+                logger.info(f"模型 {self.name} 探测成功，熔断器关闭")
+            self._state = CLOSED
+            self._failures = 0
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._state == HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != OPEN:
+                    logger.warning(f"模型 {self.name} 连续失败 {self._failures} 次，熔断器打开")
+                self._state = OPEN
+                self._opened_at = time.monotonic()
+                self._probing = False
+
+    @contextmanager
+    def protect(self, neutral: Tuple[Type[BaseException], ...] = ()):
+        """包裹一次请求: 熔断时抛出CircuitOpenError，按结果更新状态
+
+        Args:
+            neutral: 说明后端可达的异常（如返回内容无法解析），按成功计
+        """
+        if not self.allow():
+            raise CircuitOpenError(f"模型 {self.name} 已熔断，{self.get_state()['retry_in']}秒后重试")
+        try:
+            yield
+        except neutral:
+            self.record_success()
+            raise
+        except Exception:
+            self.record_failure()
+            raise
+        except BaseException:
+            # 调用方中途放弃（如流式请求的客户端断开），不计入结果，只释放探测名额
+            with self._lock:
+                self._probing = False
+            raise
+        else:
+            self.record_success()
+
+    def get_state(self) -> Dict[str, Any]:
+        with self._lock:
+            state = self._current_state()
+            retry_in = self.reset_timeout - (time.monotonic() - self._opened_at) if state == OPEN else 0.0
+            return {
+                "state": state,
+                "failures": self._failures,
+                "retry_in": round(max(0.0, retry_in), 1)
+            }
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_circuit_breaker(model: str) -> CircuitBreaker:
+    """获取指定模型的进程级熔断器"""
+    breaker = _breakers.get(model)
+    if breaker is None:
+        with _breakers_lock:
+            breaker = _breakers.get(model)
+            if breaker is None:
+                breaker = CircuitBreaker(
+                    model,
+                    failure_threshold=get_setting("CIRCUIT_BREAKER_FAILURES", DEFAULT_FAILURE_THRESHOLD),
+                    reset_timeout=get_setting("CIRCUIT_BREAKER_RESET_TIMEOUT", DEFAULT_RESET_TIMEOUT)
+                )
+                _breakers[model] = breaker
+    return breaker
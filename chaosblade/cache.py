@@ -0,0 +1,199 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Optional, Hashable
+
+
+logger = logging.getLogger(__name__)
+
+
+def make_cache_key(*parts: Any) -> str:
+    """由多个字段生成稳定的缓存键"""
+    payload = json.dumps(parts, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class LRUCache:
+    """线程安全的内存LRU缓存"""
+
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self._data: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            if key not in self._data:
+                return default
+            self._data.move_to_end(key)
+            return self._data[key]
+
+    def set(self, key: Hashable, value: Any):
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._data
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class SQLiteCache:
+    """基于SQLite的磁盘键值缓存，值以JSON保存
+
+    schema_version 变化时丢弃旧表；设置 max_entries 后按最近访问时间淘汰。
+    """
+
+    # 每写入多少次检查一次容量
+    EVICT_INTERVAL = 64
+
+    def __init__(self, path: str, table: str = "entries", max_entries: int = None,
+                 schema_version: int = 1):
+        self.path = path
+        self.table = table
+        self.max_entries = max_entries
+        self.schema_version = schema_version
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._writes = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False, timeout=5)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._migrate(conn)
+            conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {self.table} ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                "created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            conn.execute(f"CREATE INDEX IF NOT EXISTS {self.table}_accessed ON {self.table} (accessed_at)")
+            conn.commit()
+            self._conn = conn
+            self._evict(conn)
+        return self._conn
+
+    def _migrate(self, conn: sqlite3.Connection):
+        """表结构版本不一致时重建表"""
+        conn.execute("CREATE TABLE IF NOT EXISTS cache_schema (name TEXT PRIMARY KEY, version INTEGER NOT NULL)")
+        row = conn.execute("SELECT version FROM cache_schema WHERE name = ?", (self.table,)).fetchone()
+        if row is not None and row[0] == self.schema_version:
+            return
+        if row is not None:
+            logger.info(f"缓存表 {self.table} 版本 {row[0]} -> {self.schema_version}，丢弃旧数据")
+        conn.execute(f"DROP TABLE IF EXISTS {self.table}")
+        conn.execute("INSERT OR REPLACE INTO cache_schema (name, version) VALUES (?, ?)",
+                     (self.table, self.schema_version))
+
+    def _evict(self, conn: sqlite3.Connection):
+        """按最近访问时间淘汰超出容量的条目"""
+        if not self.max_entries:
+            return
+        conn.execute(
+            f"DELETE FROM {self.table} WHERE key IN ("
+            f"SELECT key FROM {self.table} ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,)
+        )
+        conn.commit()
+
+    def get(self, key: str) -> Optional[Any]:
+        """读取缓存，磁盘不可用时返回None"""
+        now = time.time()
+        try:
+            with self._lock:
+                conn = self._connect()
+                row = conn.execute(f"SELECT value FROM {self.table} WHERE key = ?", (key,)).fetchone()
+                if row is None:
+                    return None
+                conn.execute(f"UPDATE {self.table} SET accessed_at = ? WHERE key = ?", (now, key))
+                conn.commit()
+            return json.loads(row[0])
+        except (sqlite3.Error, OSError, ValueError) as e:
+            logger.warning(f"磁盘缓存读取失败 ({self.path}): {e}")
+            return None
+
+    def set(self, key: str, value: Any):
+        """写入缓存，失败时只记录日志"""
+        now = time.time()
+        try:
+            payload = json.dumps(value, ensure_ascii=False)
+            with self._lock:
+                conn = self._connect()
+                conn.execute(
+                    f"INSERT OR REPLACE INTO {self.table} (key, value, created_at, accessed_at) "
+                    "VALUES (?, ?, ?, ?)",
+                    (key, payload, now, now)
+                )
+                conn.commit()
+                self._writes += 1
+                if self._writes % self.EVICT_INTERVAL == 0:
+                    self._evict(conn)
+        except (sqlite3.Error, OSError, TypeError, ValueError) as e:
+            logger.warning(f"磁盘缓存写入失败 ({self.path}): {e}")
+
+    def clear(self):
+        try:
+            with self._lock:
+                conn = self._connect()
+                conn.execute(f"DELETE FROM {self.table}")
+                conn.commit()
+        except (sqlite3.Error, OSError) as e:
+            logger.warning(f"磁盘缓存清理失败 ({self.path}): {e}")
+
+    def __len__(self) -> int:
+        try:
+            with self._lock:
+                return self._connect().execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+        except (sqlite3.Error, OSError):
+            return 0
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+class TwoLevelCache:
+    """内存LRU + 磁盘SQLite两级缓存"""
+
+    def __init__(self, memory: LRUCache, disk: Optional[SQLiteCache] = None):
+        self.memory = memory
+        self.disk = disk
+
+    def get(self, key: str) -> Optional[Any]:
+        value = self.memory.get(key)
+        if value is None and self.disk is not None:
+            value = self.disk.get(key)
+            if value is not None:
+                self.memory.set(key, value)
+        return value
+
+    def set(self, key: str, value: Any):
+        self.memory.set(key, value)
+        if self.disk is not None:
+            self.disk.set(key, value)
+
+    def clear(self):
+        self.memory.clear()
+        if self.disk is not None:
+            self.disk.clear()
@@ -0,0 +1,170 @@
+import os
+import re
+import threading
+from dataclasses import dataclass, field
+from typing import Dict, List, Any, Optional
+
+from .cache import LRUCache, SQLiteCache, TwoLevelCache, make_cache_key
+from .entities import ExtractedEntities, extract_entities
+from .llm import (
+    DEFAULT_LLM_CACHE_PATH, DEFAULT_LLM_CACHE_SIZE, DEFAULT_LLM_CACHE_MAX_ENTRIES,
+    PROMPT_VERSION, normalize_instruction
+)
+from .matcher import get_instruction_matcher
+from .settings import get_setting
+
+
+# 带单位的实体只把数值替换为占位符，单位保留在规范化文本中，如 "100ms" -> "<DURATION0>ms"，
+# 这样 "100ms" 和 "2s" 不会共用同一个骨架
+_UNIT_KINDS = ("duration", "size", "percentage")
+_LEADING_NUMBER_PATTERN = re.compile(r"\d+(?:\.\d+)?")
+# 看起来像资源名称的对象（含数字、连字符或点），纯单词保留原文
+_IDENTIFIER_PATTERN = re.compile(r".*[\d.-].*")
+_PLACEHOLDER_PATTERN = re.compile(r"<[A-Z_]+\d+>")
+# 骨架格式版本，修改占位符替换规则时递增，使已缓存的骨架失效
+SKELETON_VERSION = 3
+# 槽位值的边界只看ASCII字符: 中文紧挨着名称或数值时（如 "nginx-pod上"、"延迟100ms"）仍可替换
+_SLOT_BEFORE = r"(?<![A-Za-z0-9_.-])"
+_SLOT_AFTER = r"(?![A-Za-z0-9_-]|\.[A-Za-z0-9])"
+# 数值后可以紧跟单位，如 "100ms" 中的 "100"
+_UNIT_SUFFIX = r"(?=(?:ms|s|m|h|%|[KMGT]i?B|[KMGT])(?![A-Za-z0-9_]))"
+
+
+@dataclass
+class CanonicalInstruction:
+    """规范化指令: 实体替换为类型化占位符"""
+    text: str
+    slots: Dict[str, str] = field(default_factory=dict)
+    # 每个实体对应的占位符
+    groups: List[List[str]] = field(default_factory=list)
+
+    def fill(self, value: Any) -> Any:
+        """把骨架中的占位符替换为本指令的实体值"""
+        if isinstance(value, str):
+            return _PLACEHOLDER_PATTERN.sub(lambda m: self.slots.get(m.group(), m.group()), value)
+        if isinstance(value, list):
+            return [self.fill(item) for item in value]
+        if isinstance(value, dict):
+            return {key: self.fill(item) for key, item in value.items()}
+        return value
+
+    def skeletonize(self, value: Any) -> Any:
+        """把解析结果中的实体值替换为占位符"""
+        if isinstance(value, str):
+            return self._slot_pattern.sub(lambda m: self._reverse[m.group()], value) if self.slots else value
+        if isinstance(value, list):
+            return [self.skeletonize(item) for item in value]
+        if isinstance(value, dict):
+            return {key: self.skeletonize(item) for key, item in value.items()}
+        return value
+
+    def build_skeleton(self, data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """由解析结果生成骨架
+
+        有实体未出现在参数中，或描述中仍残留实体原值时无法安全复用，返回None。
+        """
+        skeleton = {
+            "scope": data["scope"],
+            "target": data["target"],
+            "action": data["action"],
+            "parameters": self.skeletonize(data["parameters"]),
+            "description": self.skeletonize(data.get("description", ""))
+        }
+        used = set(_PLACEHOLDER_PATTERN.findall(repr(skeleton["parameters"])))
+        if any(not used.intersection(group) for group in self.groups):
+            return None
+        if any(value in skeleton["description"] for value in self.slots.values()):
+            return None
+        return skeleton
+
+    @property
+    def _reverse(self) -> Dict[str, str]:
+        return {value: placeholder for placeholder, value in self.slots.items()}
+
+    @property
+    def _slot_pattern(self) -> re.Pattern:
+        # 长值优先，且只匹配完整的词，避免 "1" 命中 "10"
+        values = sorted(set(self.slots.values()), key=len, reverse=True)
+        numbers = [value for value in values if _LEADING_NUMBER_PATTERN.fullmatch(value)]
+        others = [value for value in values if value not in numbers]
+        alternatives = []
+        if others:
+            alternatives.append("(?:" + "|".join(re.escape(value) for value in others) + ")" + _SLOT_AFTER)
+        if numbers:
+            alternatives.append("(?:" + "|".join(re.escape(value) for value in numbers) + ")"
+                                "(?:" + _UNIT_SUFFIX + "|" + _SLOT_AFTER + ")")
+        return re.compile(_SLOT_BEFORE + "(?:" + "|".join(alternatives) + ")")
+
+
+def _is_placeholder_object(value: str) -> bool:
+    """对象名是否按资源名称处理（关键词本身不替换）"""
+    if not _IDENTIFIER_PATTERN.fullmatch(value):
+        return False
+    lowered = value.lower()
+    return not any(match.start == 0 and match.end == len(lowered)
+                   for match in get_instruction_matcher().find(lowered))
+
+
+def canonicalize(instruction: str, entities: ExtractedEntities = None) -> CanonicalInstruction:
+    """把指令中的名称、IP、路径、数值等替换为占位符；相同的值共用一个占位符"""
+    entities = entities or extract_entities(instruction)
+    canonical = CanonicalInstruction(text=instruction)
+    placeholders: Dict[str, str] = {}
+    counters: Dict[str, int] = {}
+    pieces = []
+    position = 0
+
+    for entity in entities.entities:
+        if entity.kind == "object" and not _is_placeholder_object(entity.value):
+            continue
+        value = entity.value
+        if entity.kind in _UNIT_KINDS:
+            number = _LEADING_NUMBER_PATTERN.match(value)
+            if number:
+                value = number.group()
+        value_start = instruction.find(value, entity.start, entity.end)
+        if value_start < 0 or value_start < position:
+            continue
+
+        placeholder = placeholders.get(value)
+        if placeholder is None:
+            kind = entity.kind.upper()
+            placeholder = f"<{kind}{counters.get(kind, 0)}>"
+            counters[kind] = counters.get(kind, 0) + 1
+            placeholders[value] = placeholder
+            canonical.slots[placeholder] = value
+            canonical.groups.append([placeholder])
+
+        pieces.append(instruction[position:value_start])
+        pieces.append(placeholder)
+        position = value_start + len(value)
+
+    pieces.append(instruction[position:])
+    canonical.text = "".join(pieces)
+    return canonical
+
+
+def skeleton_cache_key(model: str, canonical: CanonicalInstruction, spec_version: str) -> str:
+    """骨架缓存键: (模型, 规范化后的占位符指令, 规格版本, 提示词版本, 骨架版本)"""
+    return make_cache_key("llm-skeleton", model, normalize_instruction(canonical.text), spec_version,
+                          PROMPT_VERSION, SKELETON_VERSION)
+
+
+_skeleton_cache: Optional[TwoLevelCache] = None
+_skeleton_cache_lock = threading.Lock()
+
+
+def get_skeleton_cache() -> TwoLevelCache:
+    """获取进程级共享的解析骨架缓存，与LLM响应缓存共用同一个SQLite文件"""
+    global _skeleton_cache
+    if _skeleton_cache is None:
+        with _skeleton_cache_lock:
+            if _skeleton_cache is None:
+                path = get_setting("LLM_CACHE_PATH", DEFAULT_LLM_CACHE_PATH)
+                _skeleton_cache = TwoLevelCache(
+                    LRUCache(get_setting("LLM_CACHE_SIZE", DEFAULT_LLM_CACHE_SIZE)),
+                    SQLiteCache(os.path.expanduser(path), table="llm_skeletons",
+                                max_entries=get_setting("LLM_CACHE_MAX_ENTRIES", DEFAULT_LLM_CACHE_MAX_ENTRIES))
+                    if path else None
+                )
+    return _skeleton_cache
@@ -4,7 +4,9 @@ from typing import List, Optional
 
 from .parser import NaturalLanguageParser, ScopeDetector
 from .generator import YAMLGenerator, FileGenerator, BatchGenerator
+from .sinks import open_sink
 from .models import ParsedResult, ScopeConfig
+from .entities import benchmark as benchmark_entities
 
 
 logger = logging.getLogger(__name__)
@@ -45,6 +47,9 @@ class ChaosBladeCLI:
         elif command in ["--demo", "demo"]:
             self.demo_mode()
         
+        elif command in ["--bench", "bench"]:
+            self.benchmark_mode(args[1:])
+        
         elif command.startswith("--"):
             self.show_help()
         
@@ -237,18 +242,37 @@ class ChaosBladeCLI:
     
     def generate_from_file(self, args: List[str]):
         """从文件生成"""
+        # --workers N: 规则解析时使用N个进程
+        workers = None
+        if "--workers" in args:
+            position = args.index("--workers")
+            if position + 1 >= len(args) or not args[position + 1].isdigit():
+                print("❌ --workers 需要指定进程数")
+                return
+            workers = int(args[position + 1])
+            args = args[:position] + args[position + 2:]
+        
         if not args:
             print("❌ 请指定输入文件")
             return
         
         input_file = args[0]
         try:
+            if len(args) > 1:
+                # 指定输出文件时逐行读取、逐条写入，不在内存中保留全部结果
+                with open(input_file, 'r', encoding='utf-8') as f:
+                    instructions = (line.strip() for line in f if line.strip())
+                    summary = self.batch_generator.generate_to_sink(instructions, open_sink(args[1]),
+                                                                    workers=workers)
+                print(f"✅ 成功生成 {summary['succeeded']}/{summary['total']} 条配置，已写入 {args[1]}")
+                return
+            
             with open(input_file, 'r', encoding='utf-8') as f:
                 instructions = [line.strip() for line in f if line.strip()]
             
             print(f"📖 从文件 {input_file} 读取到 {len(instructions)} 条指令")
             
-            results = self.batch_generator.generate_from_instructions(instructions)
+            results = self.batch_generator.generate_from_instructions(instructions, workers=workers)
             
             success_count = sum(1 for r in results if r.success)
             print(f"✅ 成功生成 {success_count} 个配置文件")
@@ -323,6 +347,34 @@ class ChaosBladeCLI:
             else:
                 print(f"❌ 生成失败: {result.error_message}")
     
+    def benchmark_mode(self, args: List[str]):
+        """基准测试模式: 统计每条指令的解析耗时"""
+        import time
+        
+        instructions = [
+            "在节点 node-1 上添加文件 /root/test.log，内容为 hello world",
+            "在 Pod web-app-pod 上创建网络延迟，延迟 100ms，网卡 eth0",
+            "在容器 app-container 中创建 CPU 负载，负载 60%，核心数 2",
+            "在主机 192.168.1.100 上停止 nginx 服务"
+        ]
+        rounds = int(args[0]) if args and args[0].isdigit() else 1000
+        
+        print(f"⏱️  基准测试: {len(instructions)} 条指令 x {rounds} 轮")
+        
+        stats = benchmark_entities(instructions, rounds)
+        print(f"  实体提取: {stats['per_instruction_us']:.1f} µs/条")
+        
+        logging.disable(logging.INFO)
+        try:
+            start = time.perf_counter()
+            for _ in range(rounds):
+                for instruction in instructions:
+                    self.parser.parse_instruction(instruction)
+            elapsed = time.perf_counter() - start
+        finally:
+            logging.disable(logging.NOTSET)
+        print(f"  规则解析: {elapsed / (rounds * len(instructions)) * 1e6:.1f} µs/条")
+    
     def show_help(self):
         """显示帮助信息"""
         help_text = """
@@ -334,7 +386,10 @@ class ChaosBladeCLI:
   python chat.py --test                  # 运行测试
   python chat.py --demo                  # 演示模式
   python chat.py --generate <文件>        # 从文件批量生成
+  python chat.py --generate <文件> <输出>  # 流式生成到多文档YAML或NDJSON(.ndjson)
+  python chat.py --generate <文件> --workers N  # 规则解析时使用N个进程并行生成
   python chat.py --batch [指令...]        # 批量模式
+  python chat.py --bench [轮数]           # 解析性能基准测试
 
 🎯 支持的作用域:
   - node: Kubernetes节点
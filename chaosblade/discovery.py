@@ -0,0 +1,112 @@
+import time
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Dict, Any, Optional, Callable
+
+from .settings import get_setting
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DISCOVERY_TTL = 300
+
+
+@dataclass
+class CacheEntry:
+    """缓存条目，value为None表示负结果（如kubectl不存在）"""
+    value: Any
+    expires_at: float
+    refreshing: bool = False
+
+
+class DiscoveryCache:
+    """集群发现结果缓存
+
+    条目在TTL内直接返回；过期后先返回旧值，同时在后台线程刷新
+    (stale-while-revalidate)。负结果同样缓存，稳态下不会阻塞在子进程上。
+    """
+
+    def __init__(self, ttl: float = None):
+        self.ttl = ttl if ttl is not None else get_setting("DISCOVERY_CACHE_TTL", DEFAULT_DISCOVERY_TTL)
+        self._entries: Dict[str, CacheEntry] = {}
+        self._lock = threading.Lock()
+        self._load_locks: Dict[str, threading.Lock] = {}
+
+    def get(self, key: str, loader: Callable[[], Any]) -> Any:
+        """获取缓存值，不存在时同步加载，过期时后台刷新"""
+        if self.ttl <= 0:
+            return loader()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry.expires_at <= time.monotonic() and not entry.refreshing:
+                    entry.refreshing = True
+                    self._start_refresh(key, loader)
+                return entry.value
+            load_lock = self._load_locks.setdefault(key, threading.Lock())
+
+        # 首次加载: 同一key只由一个线程执行，其余线程等待结果
+        with load_lock:
+            with self._lock:
+                entry = self._entries.get(key)
+            if entry is not None:
+                return entry.value
+            value = loader()
+            self._store(key, value)
+            return value
+
+    def _start_refresh(self, key: str, loader: Callable[[], Any]):
+        thread = threading.Thread(
+            target=self._refresh,
+            args=(key, loader),
+            name=f"discovery-refresh-{key}",
+            daemon=True
+        )
+        thread.start()
+
+    def _refresh(self, key: str, loader: Callable[[], Any]):
+        """后台刷新，失败时保留旧值并在下个TTL周期重试"""
+        try:
+            value = loader()
+        except Exception as e:
+            logger.warning(f"后台刷新集群信息失败 ({key}): {e}")
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    entry.refreshing = False
+                    entry.expires_at = time.monotonic() + self.ttl
+            return
+        self._store(key, value)
+
+    def _store(self, key: str, value: Any):
+        with self._lock:
+            self._entries[key] = CacheEntry(value=value, expires_at=time.monotonic() + self.ttl)
+
+    def peek(self, key: str) -> Optional[CacheEntry]:
+        """查看缓存条目（不触发加载）"""
+        with self._lock:
+            return self._entries.get(key)
+
+    def invalidate(self, key: str = None):
+        """清除指定key或全部缓存"""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+
+_cache: Optional[DiscoveryCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_discovery_cache() -> DiscoveryCache:
+    """获取进程级共享的集群发现缓存"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = DiscoveryCache()
+    return _cache
@@ -0,0 +1,232 @@
+import functools
+from typing import Any, Dict, List, Optional, Tuple
+
+import yaml
+from yaml.nodes import ScalarNode
+from yaml.resolver import Resolver
+
+try:
+    from yaml import CSafeDumper as _FallbackDumper
+except ImportError:  # 未编译libyaml时回退到纯Python实现
+    from yaml import SafeDumper as _FallbackDumper
+
+
+# 与 yaml.dump 默认值一致: 超过该列数时在空格处折行
+BEST_WIDTH = 80
+# 出现在首字符时不能使用plain风格的字符
+_LEADING_INDICATORS = "#,[]{}&*!|>'\"%@`"
+_LINE_BREAKS = "\x85\u2028\u2029"
+
+_resolver = Resolver()
+
+
+class _Unsupported(Exception):
+    """快速路径无法保证与PyYAML输出一致"""
+
+
+def _is_printable(text: str) -> bool:
+    """与PyYAML在allow_unicode下的可打印字符判断一致（不含换行和制表符）"""
+    for ch in text:
+        if "\x20" <= ch <= "\x7e":
+            continue
+        if ("\xa0" <= ch <= "\ud7ff" or "\ue000" <= ch <= "\ufffd") and ch != "\ufeff" and ch not in _LINE_BREAKS:
+            continue
+        return False
+    return True
+
+
+def _allow_plain(text: str) -> bool:
+    """block上下文中能否使用plain风格，对应PyYAML的analyze_scalar"""
+    if not text or text[0] == " " or text[-1] == " ":
+        return False
+    if text.startswith("---") or text.startswith("..."):
+        return False
+    first = text[0]
+    if first in _LEADING_INDICATORS:
+        return False
+    if first in "?:-" and (len(text) == 1 or text[1] == " "):
+        return False
+    for index in range(1, len(text)):
+        ch = text[index]
+        if ch == ":" and (index + 1 == len(text) or text[index + 1] == " "):
+            return False
+        if ch == "#" and text[index - 1] == " ":
+            return False
+    return True
+
+
+@functools.lru_cache(maxsize=4096)
+def _format_scalar(text: str) -> str:
+    """返回plain或单引号形式；需要双引号或含换行时抛出_Unsupported"""
+    if not _is_printable(text):
+        raise _Unsupported(text)
+    if _allow_plain(text) and _resolver.resolve(ScalarNode, text, (True, False)) == Resolver.DEFAULT_SCALAR_TAG:
+        return text
+    return "'" + text.replace("'", "''") + "'"
+
+
+def _scalar(value: Any, column: int) -> str:
+    if not isinstance(value, str):
+        raise _Unsupported(value)
+    formatted = _format_scalar(value)
+    # 含空格的长字符串会被PyYAML折行，交给回退路径处理
+    if " " in value and column + len(formatted) > BEST_WIDTH:
+        raise _Unsupported(value)
+    return formatted
+
+
+def _key(key: Any) -> str:
+    if not isinstance(key, str) or _format_scalar(key) != key:
+        raise _Unsupported(key)
+    return key
+
+
+def _emit_mapping(mapping: Dict[str, Any], indent: int, out: List[str], inline: bool = False):
+    """inline为True时第一个键写在已输出的 "- " 之后"""
+    for position, key in enumerate(sorted(mapping)):
+        prefix = "" if inline and position == 0 else " " * indent
+        name = _key(key)
+        value = mapping[key]
+        if isinstance(value, dict):
+            if value:
+                out.append(f"{prefix}{name}:\n")
+                _emit_mapping(value, indent + 2, out)
+            else:
+                out.append(f"{prefix}{name}: {{}}\n")
+        elif isinstance(value, list):
+            if value:
+                out.append(f"{prefix}{name}:\n")
+                _emit_sequence(value, indent, out)
+            else:
+                out.append(f"{prefix}{name}: []\n")
+        else:
+            out.append(f"{prefix}{name}: {_scalar(value, indent + len(name) + 2)}\n")
+
+
+def _emit_sequence(sequence: List[Any], indent: int, out: List[str]):
+    """映射中的序列不缩进，与PyYAML的默认输出一致"""
+    for item in sequence:
+        if isinstance(item, dict):
+            if item:
+                out.append(" " * indent + "- ")
+                _emit_mapping(item, indent + 2, out, inline=True)
+            else:
+                out.append(" " * indent + "- {}\n")
+        elif isinstance(item, list):
+            raise _Unsupported(item)
+        else:
+            out.append(f"{' ' * indent}- {_scalar(item, indent + 2)}\n")
+
+
+def _has_unprintable(value: Any) -> bool:
+    """是否有需要双引号的字符串（libyaml对长双引号字符串的折行与PyYAML不同）"""
+    if isinstance(value, str):
+        return not _is_printable(value)
+    if isinstance(value, dict):
+        return any(_has_unprintable(key) or _has_unprintable(item) for key, item in value.items())
+    if isinstance(value, list):
+        return any(_has_unprintable(item) for item in value)
+    return False
+
+
+def dump_experiment(document: Dict[str, Any]) -> str:
+    """序列化ChaosBlade CR
+
+    输出与 yaml.dump(document, default_flow_style=False, allow_unicode=True) 逐字节一致；
+    只处理字符串、列表和映射，遇到非字符串值或会折行的字符串时整体回退到
+    CSafeDumper，含控制字符等需要双引号的字符串时回退到纯Python的yaml.dump。
+    """
+    if isinstance(document, dict) and document:
+        out: List[str] = []
+        try:
+            _emit_mapping(document, 0, out)
+            return "".join(out)
+        except (_Unsupported, TypeError):
+            pass
+    if _has_unprintable(document):
+        return yaml.dump(document, default_flow_style=False, allow_unicode=True)
+    return yaml.dump(document, Dumper=_FallbackDumper, default_flow_style=False, allow_unicode=True)
+
+
+class _Slot:
+    """模板中的动态值: 标量按列号检查折行，列表按缩进逐项输出"""
+
+    __slots__ = ("index", "column", "is_list")
+
+    def __init__(self, index: int, column: int, is_list: bool = False):
+        self.index = index
+        self.column = column
+        self.is_list = is_list
+
+    def render(self, values: List[Any]) -> str:
+        value = values[self.index]
+        if not self.is_list:
+            return _scalar(value, self.column)
+        if not isinstance(value, list):
+            raise _Unsupported(value)
+        if not value:
+            return " []\n"
+        pad = " " * self.column
+        return "\n" + "".join(f"{pad}- {_scalar(item, self.column + 2)}\n" for item in value)
+
+
+class CompiledTemplate:
+    """按实验形状编译的CR模板
+
+    静态部分（键名、scope/target/action、matcher/flag名称）在编译时转义好，
+    渲染时只格式化动态值并拼接。值的顺序为:
+    [name, namespace, desc, *flag值, *matcher值列表]
+    """
+
+    def __init__(self, shape: Tuple[str, str, str, Tuple[str, ...], Tuple[str, ...]]):
+        self.shape = shape
+        self.parts: List[Any] = []
+        self._compile()
+
+    def _compile(self):
+        scope, target, action, matcher_names, flag_names = self.shape
+        parts = self.parts
+        slot = iter(range(3 + len(flag_names) + len(matcher_names)))
+
+        parts.append("apiVersion: chaosblade.io/v1alpha1\nkind: ChaosBlade\nmetadata:\n  name: ")
+        parts.append(_Slot(next(slot), len("  name: ")))
+        parts.append("\n  namespace: ")
+        parts.append(_Slot(next(slot), len("  namespace: ")))
+        parts.append(f"\nspec:\n  experiments:\n  - action: {_key(action)}\n    desc: ")
+        parts.append(_Slot(next(slot), len("    desc: ")))
+        parts.append("\n")
+
+        if flag_names:
+            parts.append("    flags:\n")
+            for name in flag_names:
+                parts.append(f"    - name: {_scalar(name, len('    - name: '))}\n      value: ")
+                parts.append(_Slot(next(slot), len("      value: ")))
+                parts.append("\n")
+        else:
+            parts.append("    flags: []\n")
+
+        if matcher_names:
+            parts.append("    matchers:\n")
+            for name in matcher_names:
+                parts.append(f"    - name: {_scalar(name, len('    - name: '))}\n      value:")
+                parts.append(_Slot(next(slot), 6, is_list=True))
+        else:
+            parts.append("    matchers: []\n")
+
+        parts.append(f"    scope: {_key(scope)}\n    target: {_key(target)}\n")
+
+    def render(self, values: List[Any]) -> str:
+        """渲染模板，值无法按快速路径输出时抛出ValueError"""
+        try:
+            return "".join(part if part.__class__ is str else part.render(values) for part in self.parts)
+        except _Unsupported as e:
+            raise ValueError(f"模板无法渲染该值: {e}")
+
+
+def compile_experiment_template(scope: str, target: str, action: str,
+                                matcher_names: Tuple[str, ...], flag_names: Tuple[str, ...]) -> Optional[CompiledTemplate]:
+    """编译实验模板，静态部分需要特殊转义时返回None"""
+    try:
+        return CompiledTemplate((scope, target, action, tuple(matcher_names), tuple(flag_names)))
+    except _Unsupported:
+        return None
@@ -0,0 +1,167 @@
+import re
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Iterable
+
+
+# 关键词 -> 参数名
+KEYED_NUMBER_KEYS = {
+    "延迟": "delay",
+    "delay": "delay",
+    "负载": "load",
+    "load": "load"
+}
+
+_ASCII_BEFORE = r"(?<![A-Za-z0-9_.-])"
+_ASCII_AFTER = r"(?![A-Za-z0-9_])"
+
+# 按优先级排列的命名分组，同一位置先匹配的分组生效
+ENTITY_PATTERN = re.compile(
+    r"(?P<content>内容为\s*[\"'“]?(?P<content_value>.+?)[\"'”]?$)"
+    r"|(?P<namespace>(?:命名空间[为是]?\s*|(?i:namespace)\s+)[\"'“]?(?P<namespace_value>[a-zA-Z0-9][a-zA-Z0-9-]*))"
+    r"|(?P<interface>(?:网卡|(?i:interface))\s*(?P<interface_value>[a-zA-Z][\w.@-]*))"
+    r"|(?P<port>(?:端口|(?i:port))\s*(?P<port_value>\d{1,5}(?:-\d{1,5})?(?:,\d{1,5}(?:-\d{1,5})?)*))"
+    # 关键词与数字之间只允许空白和不超过3个连接字符（如 "为"、"of"），避免吞掉中间的其他实体
+    r"|(?P<keyed>(?P<key>延迟|负载|(?i:delay|load))\s*(?:[^\d\s，,；;]{1,3}\s*)?(?P<key_value>\d+)(?P<key_unit>ms|s|m|h|%)?)"
+    r"|(?P<ip>" + _ASCII_BEFORE + r"(?:\d{1,3}\.){3}\d{1,3}(?P<cidr_mask>/\d{1,2})?" + _ASCII_AFTER + r")"
+    r"|(?P<path>(?<![A-Za-z0-9])/[^\s，,；;]+)"
+    r"|(?P<duration>" + _ASCII_BEFORE + r"\d+(?:ms|s|m|h)" + _ASCII_AFTER + r")"
+    r"|(?P<size>" + _ASCII_BEFORE + r"\d+(?:\.\d+)?\s*(?:[KMGT]i?B|[KMGT])" + _ASCII_AFTER + r")"
+    r"|(?P<percentage>" + _ASCII_BEFORE + r"\d+(?:\.\d+)?%)"
+    r"|(?P<range>" + _ASCII_BEFORE + r"\d+-\d+" + _ASCII_AFTER + r")"
+    r"|(?P<number>" + _ASCII_BEFORE + r"\d+(?:\.\d+)?" + _ASCII_AFTER + r")"
+    r"|(?P<object>[a-zA-Z0-9](?:[a-zA-Z0-9.-]*[a-zA-Z0-9])?)"
+)
+
+# 分组名 -> (实体类型, 取值分组)
+_GROUP_KINDS = {
+    "content": ("content", "content_value"),
+    "namespace": ("namespace", "namespace_value"),
+    "interface": ("interface", "interface_value"),
+    "port": ("port", "port_value"),
+    "keyed": ("keyed_number", "key_value"),
+    "ip": ("ip", "ip"),
+    "path": ("path", "path"),
+    "duration": ("duration", "duration"),
+    "size": ("size", "size"),
+    "percentage": ("percentage", "percentage"),
+    "range": ("range", "range"),
+    "number": ("number", "number"),
+    "object": ("object", "object")
+}
+
+_POD_NAME_PATTERN = re.compile(r"[a-zA-Z0-9-]+-[a-zA-Z0-9]{5,10}")
+
+
+@dataclass
+class Entity:
+    """指令中的实体"""
+    kind: str
+    value: str
+    start: int
+    end: int
+    key: str = ""
+    unit: str = ""
+
+
+@dataclass
+class ExtractedEntities:
+    """实体提取结果"""
+    instruction: str
+    entities: List[Entity] = field(default_factory=list)
+
+    def all(self, kind: str) -> List[Entity]:
+        return [entity for entity in self.entities if entity.kind == kind]
+
+    def first(self, kind: str, key: str = None) -> Optional[Entity]:
+        for entity in self.entities:
+            if entity.kind == kind and (key is None or entity.key == key):
+                return entity
+        return None
+
+    def values(self, kind: str) -> List[str]:
+        return [entity.value for entity in self.entities if entity.kind == kind]
+
+
+class EntityExtractor:
+    """单次扫描的指令实体提取器
+
+    用一个由命名分组组成的预编译正则提取文件路径、IP/CIDR、端口、
+    时长、大小、百分比、网卡、命名空间和k8s对象名称。
+    """
+
+    def __init__(self, pattern: re.Pattern = ENTITY_PATTERN):
+        self.pattern = pattern
+
+    def extract(self, instruction: str) -> ExtractedEntities:
+        """提取实体"""
+        result = ExtractedEntities(instruction=instruction)
+        append = result.entities.append
+        for match in self.pattern.finditer(instruction):
+            # 外层分组最后闭合，lastgroup即为实体分组名
+            group = match.lastgroup
+            kind, value_group = _GROUP_KINDS[group]
+            entity = Entity(
+                kind=kind,
+                value=match.group(value_group),
+                start=match.start(),
+                end=match.end()
+            )
+            if group == "keyed":
+                entity.key = KEYED_NUMBER_KEYS[match.group("key").lower()]
+                entity.unit = match.group("key_unit") or ""
+            elif group == "ip" and match.group("cidr_mask"):
+                entity.kind = "cidr"
+            append(entity)
+        return result
+
+
+def pick_names(entities: ExtractedEntities, anchors: Iterable[str] = (),
+               stopwords: Iterable[str] = ()) -> List[str]:
+    """从实体中选出目标名称: IP > Pod格式名称 > 紧跟作用域关键词的名称 > 第一个对象名"""
+    ips = entities.values("ip")
+    if ips:
+        return ips
+
+    objects = entities.all("object")
+    pod_names = [obj.value for obj in objects if _POD_NAME_PATTERN.fullmatch(obj.value)]
+    if pod_names:
+        return pod_names
+
+    anchor_set = {anchor.lower() for anchor in anchors}
+    skip = anchor_set | {word.lower() for word in stopwords}
+    candidates = [obj for obj in objects if obj.value.lower() not in skip]
+    if not candidates:
+        return []
+
+    # 紧跟在作用域关键词（如 "Pod"、"host"）后面的名称优先
+    for previous, current in zip(objects, objects[1:]):
+        if (previous.value.lower() in anchor_set and current in candidates and
+                not entities.instruction[previous.end:current.start].strip()):
+            return [current.value]
+    return [candidates[0].value]
+
+
+def benchmark(instructions: List[str], rounds: int = 1000,
+              extractor: EntityExtractor = None) -> Dict[str, float]:
+    """测量每条指令的实体提取耗时（微秒）"""
+    extractor = extractor or EntityExtractor()
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for instruction in instructions:
+            extractor.extract(instruction)
+    elapsed = time.perf_counter() - start
+    total = rounds * len(instructions)
+    return {
+        "instructions": len(instructions),
+        "rounds": rounds,
+        "per_instruction_us": elapsed / total * 1e6 if total else 0.0
+    }
+
+
+_extractor = EntityExtractor()
+
+
+def extract_entities(instruction: str) -> ExtractedEntities:
+    """使用共享的提取器提取实体"""
+    return _extractor.extract(instruction)
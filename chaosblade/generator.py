@@ -1,12 +1,36 @@
-import yaml
+import asyncio
 import logging
-from typing import Dict, List, Any, Optional
+import datetime
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Dict, List, Any, Iterable, Iterator, Optional, Tuple
 from .models import ParsedResult, GenerationResult, TemplateConfig, ScopeConfig
 from .validator import SmartParameterOptimizer, BestPracticesAdvisor
+from .settings import get_setting
+from .cache import LRUCache
+from .emitter import CompiledTemplate, compile_experiment_template, dump_experiment
+from .spec_index import SpecIndex, get_spec_index, set_spec_index
+from .sinks import ResultSink
 
 
 logger = logging.getLogger(__name__)
 
+# 生成器版本，修改YAML输出格式时递增，使持久化的生成结果失效
+GENERATOR_VERSION = "1"
+
+# 批量调用大模型时的默认并发数（可被模型配置中的 concurrency 覆盖）
+DEFAULT_BATCH_CONCURRENCY = 8
+
+# 编译后实验模板的缓存条目数（按实验形状缓存）
+DEFAULT_TEMPLATE_CACHE_SIZE = 512
+
+# 打包模式下单个ChaosBlade资源包含的最大实验数
+DEFAULT_PACK_MAX_EXPERIMENTS = 20
+
+# 多进程批量生成时每个任务包含的指令数，用于摊薄进程间通信开销
+DEFAULT_WORKER_CHUNKSIZE = 64
+
 
 class YAMLGenerator:
     """YAML生成器"""
@@ -14,41 +38,35 @@ class YAMLGenerator:
     def __init__(self):
         self.optimizer = SmartParameterOptimizer()
         self.advisor = BestPracticesAdvisor()
+        self.renderer = TemplateRenderer()
     
     def generate_yaml(self, parsed_data: ParsedResult) -> GenerationResult:
         """生成YAML配置"""
         try:
             # 1. 优化参数
             optimized_params, warnings = self.optimizer.optimize_parameters(
-                parsed_data.parameters, parsed_data.scope
-            )
-            
-            # 2. 创建基础模板
-            yaml_doc = TemplateConfig.create_experiment_template(
-                parsed_data.scope,
-                parsed_data.target,
-                parsed_data.action,
-                [],  # matchers - 将在后续步骤中填充
-                []   # flags - 将在后续步骤中填充
+                parsed_data.parameters, parsed_data.scope,
+                parsed_data.target, parsed_data.action
             )
             
-            # 3. 设置基本信息
-            yaml_doc["metadata"]["name"] = parsed_data.name
-            yaml_doc["spec"]["experiments"][0]["desc"] = parsed_data.description
+            # 2. 分离matchers和flags
+            matchers, flags = self._split_parameters(optimized_params, parsed_data.scope)
             
-            # 4. 处理参数
-            experiment = yaml_doc["spec"]["experiments"][0]
-            self._process_parameters(experiment, optimized_params, parsed_data.scope)
-            
-            # 5. 添加最佳实践建议
+            # 3. 添加最佳实践建议
             best_practices = self.advisor.get_best_practices(
                 parsed_data.scope, parsed_data.target, parsed_data.action
             )
             
-            # 6. 生成YAML内容
-            yaml_content = yaml.dump(yaml_doc, default_flow_style=False, allow_unicode=True)
+            # 4. 按实验形状的编译模板生成YAML内容
+            yaml_content = self.renderer.render_experiment(
+                parsed_data.scope, parsed_data.target, parsed_data.action,
+                name=parsed_data.name,
+                description=parsed_data.description,
+                matchers=matchers,
+                flags=flags
+            )
             
-            # 7. 添加注释
+            # 5. 添加注释
             yaml_content = self._add_comments(yaml_content, best_practices)
             
             return GenerationResult(
@@ -66,8 +84,133 @@ class YAMLGenerator:
                 warnings=warnings if 'warnings' in locals() else []
             )
     
+    def generate_packed_yaml(self, parsed_list: List[ParsedResult], max_experiments: int = None,
+                             multi_document: bool = False, name_prefix: str = None) -> List[GenerationResult]:
+        """把多个解析结果打包生成
+        
+        命名空间（namespace matcher）和超时时间相同的实验合并为一个ChaosBlade资源，
+        每个资源最多包含 max_experiments 个实验，一次 kubectl apply 即可提交整组实验；
+        资源的 metadata.namespace 取组内唯一的命名空间，没有或有多个时为 default；
+        multi_document 为True时每个实验仍是独立资源，同组资源输出为一个多文档YAML流。
+        
+        Args:
+            parsed_list: 解析结果列表
+            max_experiments: 每组最大实验数，默认取 PACK_MAX_EXPERIMENTS
+            multi_document: 是否输出多文档YAML流
+            name_prefix: 打包资源的名称前缀，默认带时间戳
+        """
+        limit = max(1, int(max_experiments or get_setting("PACK_MAX_EXPERIMENTS", DEFAULT_PACK_MAX_EXPERIMENTS)))
+        if name_prefix is None:
+            name_prefix = f"chaosblade-batch-{datetime.datetime.now().strftime('%Y%m%d%H%M%S')}"
+        
+        groups: "OrderedDict[Tuple[Tuple[str, ...], Any], List[Dict[str, Any]]]" = OrderedDict()
+        failures = []
+        for parsed_data in parsed_list:
+            try:
+                optimized_params, warnings = self.optimizer.optimize_parameters(
+                    parsed_data.parameters, parsed_data.scope,
+                    parsed_data.target, parsed_data.action
+                )
+                matchers, flags = self._split_parameters(optimized_params, parsed_data.scope)
+            except Exception as e:
+                logger.error(f"生成YAML失败 ({parsed_data.name}): {e}")
+                failures.append(GenerationResult(success=False, error_message=str(e)))
+                continue
+            
+            namespaces = optimized_params.get("namespace") or []
+            if not isinstance(namespaces, list):
+                namespaces = [namespaces]
+            key = (tuple(sorted(str(namespace) for namespace in namespaces)), optimized_params.get("timeout"))
+            groups.setdefault(key, []).append({
+                "parsed": parsed_data,
+                "matchers": matchers,
+                "flags": flags,
+                "warnings": [f"{parsed_data.name}: {warning}" for warning in warnings]
+            })
+        
+        results = []
+        for (namespaces, _), members in groups.items():
+            namespace = namespaces[0] if len(namespaces) == 1 else "default"
+            for start in range(0, len(members), limit):
+                chunk = members[start:start + limit]
+                try:
+                    results.append(self._generate_pack(
+                        chunk, namespace, f"{name_prefix}-{len(results) + 1}", multi_document
+                    ))
+                except Exception as e:
+                    logger.error(f"生成打包YAML失败: {e}")
+                    results.append(GenerationResult(success=False, error_message=str(e)))
+        
+        return results + failures
+    
+    def _generate_pack(self, members: List[Dict[str, Any]], namespace: str, name: str,
+                       multi_document: bool) -> GenerationResult:
+        """生成一组实验的YAML"""
+        best_practices = []
+        for member in members:
+            parsed_data = member["parsed"]
+            for practice in self.advisor.get_best_practices(
+                parsed_data.scope, parsed_data.target, parsed_data.action
+            ):
+                if practice not in best_practices:
+                    best_practices.append(practice)
+        
+        if multi_document:
+            documents = []
+            seen_names = set()
+            for member in members:
+                parsed_data = member["parsed"]
+                # 同一秒内解析的指令名称相同，同一个YAML流中的资源名称必须唯一
+                doc_name = parsed_data.name
+                suffix = 1
+                while doc_name in seen_names:
+                    suffix += 1
+                    doc_name = f"{parsed_data.name}-{suffix}"
+                seen_names.add(doc_name)
+                documents.append(self.renderer.render_experiment(
+                    parsed_data.scope, parsed_data.target, parsed_data.action,
+                    name=doc_name,
+                    description=parsed_data.description,
+                    matchers=member["matchers"],
+                    flags=member["flags"],
+                    namespace=namespace
+                ))
+            yaml_content = "---\n".join(documents)
+        else:
+            yaml_doc = {
+                "apiVersion": "chaosblade.io/v1alpha1",
+                "kind": "ChaosBlade",
+                "metadata": {"name": name, "namespace": namespace},
+                "spec": {
+                    "experiments": [
+                        {
+                            "scope": member["parsed"].scope,
+                            "target": member["parsed"].target,
+                            "action": member["parsed"].action,
+                            "desc": member["parsed"].description,
+                            "matchers": member["matchers"],
+                            "flags": member["flags"]
+                        }
+                        for member in members
+                    ]
+                }
+            }
+            yaml_content = dump_experiment(yaml_doc)
+        
+        return GenerationResult(
+            success=True,
+            yaml_content=self._add_comments(yaml_content, best_practices),
+            warnings=[warning for member in members for warning in member["warnings"]],
+            generated_files=[]
+        )
+    
     def _process_parameters(self, experiment: Dict[str, Any], params: Dict[str, Any], scope: str):
         """处理参数"""
+        experiment["matchers"], experiment["flags"] = self._split_parameters(params, scope)
+    
+    @staticmethod
+    def _split_parameters(params: Dict[str, Any], scope: str) -> Tuple[List[Dict], List[Dict]]:
+        """按作用域配置把参数分为matchers和flags"""
         matchers = []
         flags = []
         
@@ -88,9 +231,7 @@ class YAMLGenerator:
                 # 处理flags
                 flags.append({"name": param_name, "value": str(param_value)})
         
-        # 添加到实验配置
-        experiment["matchers"] = matchers
-        experiment["flags"] = flags
+        return matchers, flags
     
     def _add_comments(self, yaml_content: str, best_practices: List[str]) -> str:
         """添加注释"""
@@ -180,43 +321,259 @@ class FileGenerator:
 class BatchGenerator:
     """批量生成器"""
     
-    def __init__(self):
+    def __init__(self, output_dir: str = "./generated-yamls"):
         self.yaml_generator = YAMLGenerator()
-        self.file_generator = FileGenerator()
+        self.file_generator = FileGenerator(output_dir)
+    
+    def generate_from_instructions(self, instructions: List[str], model: str = None, workers: int = None,
+                                   chunksize: int = None) -> List[GenerationResult]:
+        """从指令列表批量生成，需要调用大模型时并发请求，规则解析时可用多进程"""
+        results: List[Optional[GenerationResult]] = [None] * len(instructions)
+        for index, _, result in self.iter_generate(instructions, model, workers=workers, chunksize=chunksize):
+            results[index] = result
+        return results
     
-    def generate_from_instructions(self, instructions: List[str]) -> List[GenerationResult]:
-        """从指令列表批量生成"""
+    def iter_generate(self, instructions: Iterable[str], model: str = None, concurrency: int = None,
+                      save_files: bool = True, workers: int = None,
+                      chunksize: int = None) -> Iterator[Tuple[int, str, GenerationResult]]:
+        """逐条产出 (序号, 指令, 结果)
+        
+        指令可以是惰性的迭代器（如逐行读取的文件）；需要调用大模型时同时处理的指令
+        不超过 concurrency 条，按完成顺序产出，内存占用与批量大小无关。
+        规则解析且 workers 大于1时，指令按 chunksize 分块交给进程池，按输入顺序产出。
+        
+        Args:
+            instructions: 指令序列
+            model: 模型名称
+            concurrency: 最大并发请求数，默认取模型配置 concurrency 或 BATCH_CONCURRENCY
+            save_files: 是否为每条结果单独保存YAML文件
+            workers: 规则解析的进程数，默认取 BATCH_WORKERS（1表示不使用进程池）
+            chunksize: 每个进程任务包含的指令数，默认取 BATCH_CHUNKSIZE
+        """
         from .parser import NaturalLanguageParser
         
-        parser = NaturalLanguageParser()
+        parser = NaturalLanguageParser(model=model)
+        if parser.mode == "rule":
+            workers = int(workers or get_setting("BATCH_WORKERS", 1))
+            if workers > 1:
+                yield from self._iter_generate_processes(instructions, model, workers, chunksize, save_files)
+                return
+            for index, instruction in enumerate(instructions):
+                yield index, instruction, self._generate_one(instruction, parser.parse_instruction, save_files)
+            return
+        
+        yield from self._iter_generate_async(instructions, parser, concurrency, save_files)
+    
+    def _iter_generate_async(self, instructions: Iterable[str], parser, concurrency: Optional[int],
+                             save_files: bool) -> Iterator[Tuple[int, str, GenerationResult]]:
+        """滑动窗口并发解析: 每完成一条就补充一条新指令"""
+        from .parser import AsyncClientPool
+        
+        limit = concurrency or self._get_concurrency(parser)
+        loop = asyncio.new_event_loop()
+        clients = AsyncClientPool()
+        source = enumerate(instructions)
+        pending = set()
+        
+        async def parse(index: int, instruction: str):
+            try:
+                return index, instruction, await parser.aparse_instruction(instruction, clients)
+            except Exception as e:
+                return index, instruction, e
+        
+        def fill():
+            while len(pending) < limit:
+                item = next(source, None)
+                if item is None:
+                    return
+                pending.add(loop.create_task(parse(*item)))
+        
+        try:
+            fill()
+            while pending:
+                done, _ = loop.run_until_complete(asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED))
+                pending.difference_update(done)
+                fill()
+                for task in done:
+                    index, instruction, parsed_data = task.result()
+                    if isinstance(parsed_data, Exception):
+                        logger.error(f"生成失败 ({instruction}): {parsed_data}")
+                        result = GenerationResult(success=False, error_message=str(parsed_data))
+                    else:
+                        result = self._generate_one(instruction, lambda _: parsed_data, save_files)
+                    yield index, instruction, result
+        finally:
+            # 调用方提前停止迭代时取消未完成的请求
+            for task in pending:
+                task.cancel()
+            if pending:
+                loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+            loop.run_until_complete(clients.aclose())
+            loop.close()
+    
+    def _iter_generate_processes(self, instructions: Iterable[str], model: Optional[str], workers: int,
+                                 chunksize: Optional[int], save_files: bool) -> Iterator[Tuple[int, str, GenerationResult]]:
+        """多进程规则解析和YAML生成，按输入顺序产出
+        
+        子进程启动时接收父进程已构建的规格索引；同时提交的分块不超过进程数的两倍。
+        """
+        chunksize = max(1, int(chunksize or get_setting("BATCH_CHUNKSIZE", DEFAULT_WORKER_CHUNKSIZE)))
+        source = iter(instructions)
+        pending = deque()
+        index = 0
+        
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_generation_worker,
+            initargs=(get_spec_index(), model, self.file_generator.output_dir, save_files)
+        ) as executor:
+            def submit() -> bool:
+                chunk = list(islice(source, chunksize))
+                if not chunk:
+                    return False
+                pending.append((chunk, executor.submit(_generate_chunk, chunk)))
+                return True
+            
+            try:
+                while len(pending) < workers * 2 and submit():
+                    pass
+                while pending:
+                    chunk, future = pending.popleft()
+                    results = future.result()
+                    submit()
+                    for instruction, result in zip(chunk, results):
+                        yield index, instruction, result
+                        index += 1
+            finally:
+                # 调用方提前停止迭代时不再执行排队中的分块
+                for _, future in pending:
+                    future.cancel()
+    
+    def generate_to_sink(self, instructions: Iterable[str], sink: ResultSink, model: str = None,
+                         concurrency: int = None, save_files: bool = False, workers: int = None,
+                         chunksize: int = None) -> Dict[str, Any]:
+        """流式批量生成，每完成一条就写入输出（多文档YAML或NDJSON），返回统计"""
+        with sink:
+            for index, instruction, result in self.iter_generate(instructions, model, concurrency, save_files,
+                                                                 workers, chunksize):
+                sink.write(index, instruction, result)
+        return sink.get_summary()
+    
+    async def agenerate_from_instructions(self, instructions: List[str], model: str = None,
+                                          concurrency: int = None, parser=None) -> List[GenerationResult]:
+        """异步批量生成，结果顺序与输入一致
+        
+        Args:
+            instructions: 指令列表
+            model: 模型名称
+            concurrency: 最大并发请求数，默认取模型配置 concurrency 或 BATCH_CONCURRENCY
+            parser: 复用的解析器（可选）
+        """
+        parsed = await self.aparse_instructions(instructions, model, concurrency, parser)
+        
         results = []
+        for instruction, parsed_data in zip(instructions, parsed):
+            if isinstance(parsed_data, Exception):
+                logger.error(f"生成失败 ({instruction}): {parsed_data}")
+                results.append(GenerationResult(success=False, error_message=str(parsed_data)))
+            else:
+                results.append(self._generate_one(instruction, lambda _: parsed_data))
+        return results
+    
+    def parse_instructions(self, instructions: List[str], model: str = None) -> List[Any]:
+        """批量解析指令，解析失败的位置为异常对象，顺序与输入一致"""
+        from .parser import NaturalLanguageParser
         
+        parser = NaturalLanguageParser(model=model)
+        if parser.mode != "rule":
+            return asyncio.run(self.aparse_instructions(instructions, parser=parser))
+        
+        parsed = []
         for instruction in instructions:
             try:
-                # 解析指令
-                parsed_data = parser.parse_instruction(instruction)
-                
-                # 生成YAML
-                result = self.yaml_generator.generate_yaml(parsed_data)
-                
-                # 保存文件
-                if result.success:
-                    filename = self.file_generator.generate_filename(
-                        parsed_data.scope, parsed_data.target, parsed_data.action
-                    )
-                    filepath = self.file_generator.save_yaml(result.yaml_content, filename)
-                    result.generated_files = [filepath]
-                
-                results.append(result)
-                
+                parsed.append(parser.parse_instruction(instruction))
             except Exception as e:
-                logger.error(f"生成失败 ({instruction}): {e}")
-                results.append(GenerationResult(
-                    success=False,
-                    error_message=str(e)
-                ))
+                parsed.append(e)
+        return parsed
+    
+    async def aparse_instructions(self, instructions: List[str], model: str = None,
+                                  concurrency: int = None, parser=None) -> List[Any]:
+        """异步批量解析，并发数受 concurrency 限制，解析失败的位置为异常对象"""
+        from .parser import AsyncClientPool, NaturalLanguageParser
         
-        return results
+        parser = parser or NaturalLanguageParser(model=model)
+        limit = concurrency or self._get_concurrency(parser)
+        semaphore = asyncio.Semaphore(limit)
+        clients = AsyncClientPool()
+        
+        async def parse(instruction: str) -> ParsedResult:
+            async with semaphore:
+                return await parser.aparse_instruction(instruction, clients)
+        
+        try:
+            return await asyncio.gather(*(parse(instruction) for instruction in instructions),
+                                        return_exceptions=True)
+        finally:
+            await clients.aclose()
+    
+    def generate_packed(self, instructions: List[str], model: str = None, max_experiments: int = None,
+                        multi_document: bool = False) -> List[GenerationResult]:
+        """批量生成并把兼容的实验打包到同一个资源（或多文档YAML）中，每组保存为一个文件
+        
+        解析失败的指令各自返回一个失败结果，排在打包结果之后。
+        """
+        parsed = self.parse_instructions(instructions, model)
+        
+        succeeded = []
+        failures = []
+        for instruction, parsed_data in zip(instructions, parsed):
+            if isinstance(parsed_data, Exception):
+                logger.error(f"生成失败 ({instruction}): {parsed_data}")
+                failures.append(GenerationResult(success=False, error_message=str(parsed_data)))
+            else:
+                succeeded.append(parsed_data)
+        
+        results = self.yaml_generator.generate_packed_yaml(succeeded, max_experiments, multi_document)
+        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+        for index, result in enumerate(results):
+            if result.success:
+                filepath = self.file_generator.save_yaml(result.yaml_content,
+                                                         f"chaosblade-pack-{timestamp}-{index + 1}.yaml")
+                result.generated_files = [filepath]
+        
+        return results + failures
+    
+    @staticmethod
+    def _get_concurrency(parser) -> int:
+        """模型配置中的并发上限优先，其次为全局 BATCH_CONCURRENCY"""
+        limit = parser.model_config.get("concurrency") or get_setting("BATCH_CONCURRENCY", DEFAULT_BATCH_CONCURRENCY)
+        return max(1, int(limit))
+    
+    def _generate_one(self, instruction: str, parse, save_file: bool = True) -> GenerationResult:
+        """解析并生成单条指令的YAML，保存文件"""
+        try:
+            # 解析指令
+            parsed_data = parse(instruction)
+            
+            # 生成YAML
+            result = self.yaml_generator.generate_yaml(parsed_data)
+            
+            # 保存文件
+            if result.success and save_file:
+                filename = self.file_generator.generate_filename(
+                    parsed_data.scope, parsed_data.target, parsed_data.action
+                )
+                filepath = self.file_generator.save_yaml(result.yaml_content, filename)
+                result.generated_files = [filepath]
+            
+            return result
+            
+        except Exception as e:
+            logger.error(f"生成失败 ({instruction}): {e}")
+            return GenerationResult(
+                success=False,
+                error_message=str(e)
+            )
     
     def generate_all_scopes(self, instruction: str) -> List[GenerationResult]:
         """生成所有作用域的配置"""
@@ -231,11 +588,42 @@ class BatchGenerator:
         return self.yaml_generator.generate_multiple_yamls(parsed_data, scopes)
 
 
+_worker_batch: Optional[BatchGenerator] = None
+_worker_parser = None
+_worker_save_files = True
+
+
+def _init_generation_worker(spec_index: SpecIndex, model: Optional[str], output_dir: str, save_files: bool):
+    """进程池初始化: 安装父进程构建的规格索引，创建本进程复用的解析器和生成器"""
+    global _worker_batch, _worker_parser, _worker_save_files
+    from .parser import NaturalLanguageParser
+    
+    set_spec_index(spec_index)
+    _worker_batch = BatchGenerator(output_dir)
+    _worker_parser = NaturalLanguageParser(model=model)
+    _worker_save_files = save_files
+
+
+def _generate_chunk(instructions: List[str]) -> List[GenerationResult]:
+    """在子进程中生成一个分块的指令"""
+    return [_worker_batch._generate_one(instruction, _worker_parser.parse_instruction, _worker_save_files)
+            for instruction in instructions]
+
+
 class TemplateRenderer:
-    """模板渲染器"""
+    """模板渲染器
     
-    def __init__(self):
+    除内置的字符串模板外，规格索引中的每个 (scope, target, action) 都可作为模板，
+    名称为 "scope-target-action"。实验按形状（scope、target、action、matcher和flag名称）
+    编译成静态片段和值槽位，编译结果放在LRU缓存中，渲染时只格式化值并拼接，
+    省去构建字典再序列化的开销；输出与 dump_experiment 逐字节一致。
+    """
+    
+    def __init__(self, cache_size: int = None):
         self.templates = self._load_templates()
+        if cache_size is None:
+            cache_size = get_setting("TEMPLATE_CACHE_SIZE", DEFAULT_TEMPLATE_CACHE_SIZE)
+        self._compiled = LRUCache(cache_size)
     
     def _load_templates(self) -> Dict[str, str]:
         """加载模板"""
@@ -291,13 +679,85 @@ spec:
         }
     
     def render_template(self, template_name: str, **kwargs) -> str:
-        """渲染模板"""
+        """渲染模板
+        
+        规格模板接受 name、namespace、description 以及该实验的matcher/flag，
+        参数名中的 "-" 写作 "_"。
+        """
         template = self.templates.get(template_name)
-        if not template:
+        if template:
+            return template.format(**kwargs)
+        
+        spec = self._find_spec(template_name)
+        if spec is None:
             raise ValueError(f"模板 {template_name} 不存在")
         
-        return template.format(**kwargs)
+        params = {key.replace("_", "-"): value for key, value in kwargs.items()}
+        matchers = []
+        flags = []
+        for param_name, param_value in params.items():
+            if param_name in spec.matchers:
+                value = param_value if isinstance(param_value, list) else [param_value]
+                matchers.append({"name": param_name, "value": value})
+            elif param_name in spec.flags:
+                if isinstance(param_value, list):
+                    param_value = ",".join(str(item) for item in param_value)
+                flags.append({"name": param_name, "value": str(param_value)})
+        
+        return self.render_experiment(
+            spec.scope, spec.target, spec.action,
+            name=params.get("name", template_name),
+            description=params.get("description", f"{spec.scope} {spec.target} {spec.action} experiment"),
+            matchers=matchers,
+            flags=flags,
+            namespace=params.get("namespace", "default")
+        )
+    
+    @staticmethod
+    def _find_spec(template_name: str):
+        """按 "scope-target-action" 查找规格，action本身可能包含连字符"""
+        parts = template_name.split("-", 2)
+        if len(parts) != 3:
+            return None
+        return get_spec_index().get(*parts)
+    
+    def get_compiled(self, scope: str, target: str, action: str,
+                     matcher_names: Tuple[str, ...], flag_names: Tuple[str, ...]) -> Optional[CompiledTemplate]:
+        """获取实验形状对应的编译模板，无法编译时返回None"""
+        shape = (scope, target, action, matcher_names, flag_names)
+        compiled = self._compiled.get(shape)
+        if compiled is None:
+            # 无法编译的形状也缓存（记为False），避免重复尝试
+            compiled = compile_experiment_template(*shape) or False
+            self._compiled.set(shape, compiled)
+        return compiled or None
+    
+    def render_experiment(self, scope: str, target: str, action: str, name: str, description: str,
+                          matchers: List[Dict], flags: List[Dict], namespace: str = "default") -> str:
+        """渲染单个实验的CR，值无法走快速路径时回退到构建字典再序列化"""
+        compiled = self.get_compiled(
+            scope, target, action,
+            tuple(matcher["name"] for matcher in matchers),
+            tuple(flag["name"] for flag in flags)
+        )
+        if compiled is not None:
+            values = [name, namespace, description]
+            values.extend(flag["value"] for flag in flags)
+            values.extend(matcher["value"] for matcher in matchers)
+            try:
+                return compiled.render(values)
+            except ValueError:
+                pass
+        
+        yaml_doc = TemplateConfig.create_experiment_template(scope, target, action, matchers, flags,
+                                                             timeout=None, namespace=namespace)
+        yaml_doc["metadata"]["name"] = name
+        yaml_doc["spec"]["experiments"][0]["desc"] = description
+        return dump_experiment(yaml_doc)
     
     def get_available_templates(self) -> List[str]:
-        """获取可用模板列表"""
-        return list(self.templates.keys())
\ No newline at end of file
+        """获取可用模板列表（内置模板和规格索引中的全部实验）"""
+        names = list(self.templates.keys())
+        names.extend(f"{spec.scope}-{spec.target}-{spec.action}" for spec in get_spec_index()
+                     if f"{spec.scope}-{spec.target}-{spec.action}" not in self.templates)
+        return names
\ No newline at end of file
@@ -0,0 +1,155 @@
+import os
+import json
+import logging
+import subprocess
+from typing import Dict, List, Any, Optional, Tuple
+
+from .kubeconfig import read_current_namespace
+from .settings import get_setting
+
+
+logger = logging.getLogger(__name__)
+
+KUBECTL_INVENTORY_COMMAND = ["kubectl", "get", "nodes,pods", "--all-namespaces", "-o", "json"]
+# 没有集群级list权限（只有命名空间内RBAC）时，分别获取节点和当前命名空间的Pod
+KUBECTL_NODES_COMMAND = ["kubectl", "get", "nodes", "-o", "json"]
+KUBECTL_PODS_COMMAND = ["kubectl", "get", "pods", "-o", "json"]
+SNAPSHOT_ENV = "CHAOSBLADE_CLUSTER_SNAPSHOT"
+
+
+class ClusterInventory:
+    """集群资源清单
+
+    由一次 `kubectl get nodes,pods --all-namespaces -o json` 的输出
+    （或同格式的离线快照文件）构建节点、Pod、容器的内存索引。
+    权限不足时清单可能只包含部分资源: nodes_listed 表示是否列出了节点，
+    namespaces 为已列出Pod的命名空间（None表示全部命名空间）。
+    """
+
+    def __init__(self, document: Dict[str, Any], source: str = "", nodes_listed: bool = True,
+                 namespaces: Optional[List[str]] = None):
+        self.source = source
+        self.nodes_listed = nodes_listed
+        self.namespaces = set(namespaces) if namespaces is not None else None
+        self.node_names: List[str] = []
+        self.pods_by_namespace: Dict[str, List[str]] = {}
+        self.containers_by_pod: Dict[Tuple[str, str], List[str]] = {}
+        self._nodes = set()
+        self._build(document)
+
+    def _build(self, document: Dict[str, Any]):
+        """构建索引"""
+        items = document.get("items", []) if document.get("kind", "List") == "List" else [document]
+        for item in items:
+            kind = item.get("kind")
+            metadata = item.get("metadata", {})
+            name = metadata.get("name")
+            if not name:
+                continue
+
+            if kind == "Node":
+                self.node_names.append(name)
+                self._nodes.add(name)
+            elif kind == "Pod":
+                namespace = metadata.get("namespace", "default")
+                self.pods_by_namespace.setdefault(namespace, []).append(name)
+                containers = [c.get("name") for c in item.get("spec", {}).get("containers", [])]
+                self.containers_by_pod[(namespace, name)] = [c for c in containers if c]
+
+    @staticmethod
+    def from_kubectl(timeout: int = 10) -> Optional["ClusterInventory"]:
+        """通过一次kubectl调用获取集群清单
+
+        没有跨命名空间的权限时，改为获取当前命名空间的Pod和节点列表，
+        其中一项失败时保留另一项的结果。
+        """
+        try:
+            document = _run_kubectl(KUBECTL_INVENTORY_COMMAND, timeout)
+        except (subprocess.TimeoutExpired, FileNotFoundError) as e:
+            logger.info(f"无法获取集群清单: {e}")
+            return None
+        if document is not None:
+            return ClusterInventory(document, source="kubectl")
+
+        logger.info("改为获取当前命名空间的Pod和节点列表")
+        namespace = read_current_namespace()
+        try:
+            pods = _run_kubectl(KUBECTL_PODS_COMMAND + (["-n", namespace] if namespace else []), timeout)
+            nodes = _run_kubectl(KUBECTL_NODES_COMMAND, timeout)
+        except (subprocess.TimeoutExpired, FileNotFoundError) as e:
+            logger.info(f"无法获取集群清单: {e}")
+            return None
+        if pods is None and nodes is None:
+            return None
+
+        pod_items = pods.get("items", []) if pods is not None else []
+        if pods is None:
+            namespaces = []
+        elif namespace:
+            namespaces = [namespace]
+        else:
+            # kubeconfig不可读时不知道kubectl使用的命名空间，只信任实际列出的命名空间
+            namespaces = [item.get("metadata", {}).get("namespace", "default") for item in pod_items]
+        items = (nodes.get("items", []) if nodes is not None else []) + pod_items
+        return ClusterInventory({"kind": "List", "items": items}, source="kubectl",
+                                nodes_listed=nodes is not None, namespaces=namespaces)
+
+    @staticmethod
+    def from_snapshot(path: str) -> Optional["ClusterInventory"]:
+        """从离线快照文件加载集群清单"""
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return ClusterInventory(json.load(f), source=path)
+        except (OSError, ValueError) as e:
+            logger.warning(f"集群快照读取失败 ({path}): {e}")
+            return None
+
+    def covers_namespace(self, namespace: str) -> bool:
+        """清单是否包含该命名空间的Pod"""
+        return self.namespaces is None or namespace in self.namespaces
+
+    def has_node(self, name: str) -> bool:
+        return name in self._nodes
+
+    def has_pod(self, name: str, namespace: str = None) -> bool:
+        if namespace is not None:
+            return (namespace, name) in self.containers_by_pod
+        return any(pod == name for _, pod in self.containers_by_pod)
+
+    def get_pods(self, namespace: str) -> List[str]:
+        return self.pods_by_namespace.get(namespace, [])
+
+    def get_containers(self, pod: str, namespace: str) -> List[str]:
+        return self.containers_by_pod.get((namespace, pod), [])
+
+    def get_namespace_containers(self, namespace: str) -> set:
+        """获取命名空间下所有容器名称"""
+        return {container
+                for pod in self.get_pods(namespace)
+                for container in self.containers_by_pod[(namespace, pod)]}
+
+
+def _run_kubectl(command: List[str], timeout: int) -> Optional[Dict[str, Any]]:
+    """执行kubectl并解析JSON输出，命令失败（如权限不足）时返回None"""
+    result = subprocess.run(command, capture_output=True, text=True, timeout=timeout)
+    if result.returncode != 0:
+        logger.info(f"kubectl获取集群清单失败 ({' '.join(command[1:3])}): {result.stderr.strip()}")
+        return None
+    try:
+        return json.loads(result.stdout)
+    except ValueError as e:
+        logger.warning(f"集群清单解析失败: {e}")
+        return None
+
+
+def get_snapshot_path() -> Optional[str]:
+    """离线快照路径: 环境变量优先，其次config"""
+    return os.environ.get(SNAPSHOT_ENV) or get_setting("CLUSTER_SNAPSHOT_FILE")
+
+
+def load_inventory() -> Optional[ClusterInventory]:
+    """加载集群清单，配置了快照文件时不访问集群"""
+    snapshot = get_snapshot_path()
+    if snapshot:
+        return ClusterInventory.from_snapshot(snapshot)
+    return ClusterInventory.from_kubectl()
@@ -0,0 +1,85 @@
+import os
+import logging
+import threading
+from typing import Dict, List, Any, Optional, Tuple
+
+import yaml
+
+try:
+    from yaml import CSafeLoader as _KubeconfigLoader
+except ImportError:  # 未编译libyaml时回退到纯Python实现
+    from yaml import SafeLoader as _KubeconfigLoader
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_KUBECONFIG = os.path.join(os.path.expanduser("~"), ".kube", "config")
+
+# (路径, mtime) 元组 -> 当前命名空间
+_namespace_memo: Dict[Tuple[Tuple[str, float], ...], str] = {}
+_memo_lock = threading.Lock()
+
+
+def get_kubeconfig_paths() -> List[str]:
+    """按kubectl规则获取kubeconfig文件列表"""
+    env = os.environ.get("KUBECONFIG")
+    if env:
+        return [path for path in env.split(os.pathsep) if path]
+    return [DEFAULT_KUBECONFIG]
+
+
+def _stat_files(paths: List[str]) -> Optional[Tuple[Tuple[str, float], ...]]:
+    """获取存在文件的mtime，全部不存在时返回None"""
+    stats = []
+    for path in paths:
+        try:
+            stats.append((path, os.stat(path).st_mtime))
+        except OSError:
+            continue
+    return tuple(stats) or None
+
+
+def _load_merged(paths: List[str]) -> Dict[str, Any]:
+    """合并多个kubeconfig: current-context与context均以先出现的为准"""
+    current_context = None
+    contexts: Dict[str, Dict[str, Any]] = {}
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as f:
+            document = yaml.load(f, Loader=_KubeconfigLoader) or {}
+        current_context = current_context or document.get("current-context")
+        for item in document.get("contexts") or []:
+            name = item.get("name")
+            if name and name not in contexts:
+                contexts[name] = item.get("context") or {}
+    return {"current-context": current_context, "contexts": contexts}
+
+
+def read_current_namespace() -> Optional[str]:
+    """读取当前context的命名空间
+
+    未设置命名空间时返回 "default"；kubeconfig不可读时返回None，
+    由调用方回退到kubectl。结果按文件mtime缓存。
+    """
+    paths = get_kubeconfig_paths()
+    stats = _stat_files(paths)
+    if stats is None:
+        return None
+
+    with _memo_lock:
+        namespace = _namespace_memo.get(stats)
+    if namespace is not None:
+        return namespace
+
+    try:
+        merged = _load_merged([path for path, _ in stats])
+    except (OSError, yaml.YAMLError, AttributeError) as e:
+        logger.info(f"kubeconfig读取失败: {e}")
+        return None
+
+    context = merged["contexts"].get(merged["current-context"]) or {}
+    namespace = context.get("namespace") or "default"
+
+    with _memo_lock:
+        _namespace_memo.clear()
+        _namespace_memo[stats] = namespace
+    return namespace
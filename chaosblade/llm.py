@@ -0,0 +1,109 @@
+import os
+import re
+import json
+import logging
+import threading
+import unicodedata
+from typing import Dict, List, Any, Optional
+
+from .cache import LRUCache, SQLiteCache, TwoLevelCache, make_cache_key
+from .settings import get_setting
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LLM_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".cache", "chaosblade-mcp", "llm-cache.sqlite3")
+DEFAULT_LLM_CACHE_SIZE = 1024
+DEFAULT_LLM_CACHE_MAX_ENTRIES = 100000
+
+SYSTEM_PROMPT = """你是ChaosBlade混沌实验助手，负责把自然语言指令解析为实验参数。
+只返回一个JSON对象，不要输出其他内容，格式如下:
+{"scope": "node|pod|container|host|cri", "target": "实验目标", "action": "实验动作",
+ "parameters": {"参数名": "参数值"}, "description": "简短描述"}
+参数名使用ChaosBlade的matcher/flag名称，例如 names、namespace、filepath、content、time、interface。
+names 和 namespace 的值为字符串列表，其余参数值为字符串。"""
+
+# 提示词格式版本，修改提示词或缓存键的规范化方式时递增使旧的缓存失效
+PROMPT_VERSION = 3
+
+_JSON_BLOCK_PATTERN = re.compile(r"\{.*\}", re.DOTALL)
+_WHITESPACE_PATTERN = re.compile(r"\s+")
+
+REQUIRED_FIELDS = ("scope", "target", "action")
+
+
+class LLMResponseError(ValueError):
+    """LLM返回内容无法解析"""
+
+
+def normalize_instruction(instruction: str) -> str:
+    """规范化指令: 全角转半角、合并空白，保留大小写（名称、路径区分大小写）"""
+    text = unicodedata.normalize("NFKC", instruction)
+    return _WHITESPACE_PATTERN.sub(" ", text).strip()
+
+
+def build_messages(instruction: str, spec_context: str = "") -> List[Dict[str, str]]:
+    """构建对话消息"""
+    system = SYSTEM_PROMPT
+    if spec_context:
+        system = f"{system}\n\n可用的实验规格:\n{spec_context}"
+    return [
+        {"role": "system", "content": system},
+        {"role": "user", "content": instruction}
+    ]
+
+
+def parse_response(content: str) -> Dict[str, Any]:
+    """从模型输出中提取结构化结果"""
+    if not content:
+        raise LLMResponseError("LLM返回内容为空")
+
+    match = _JSON_BLOCK_PATTERN.search(content)
+    if not match:
+        raise LLMResponseError("LLM返回内容中没有JSON对象")
+
+    try:
+        data = json.loads(match.group())
+    except ValueError as e:
+        raise LLMResponseError(f"LLM返回的JSON无效: {e}")
+
+    missing = [name for name in REQUIRED_FIELDS if not data.get(name)]
+    if missing:
+        raise LLMResponseError(f"LLM返回结果缺少字段: {', '.join(missing)}")
+
+    parameters = data.get("parameters") or {}
+    if not isinstance(parameters, dict):
+        raise LLMResponseError("LLM返回的parameters不是对象")
+
+    return {
+        "scope": str(data["scope"]).lower(),
+        "target": str(data["target"]),
+        "action": str(data["action"]),
+        "parameters": parameters,
+        "description": str(data.get("description") or "")
+    }
+
+
+def response_cache_key(model: str, instruction: str, spec_version: str) -> str:
+    """LLM响应缓存键: (模型, 规范化指令, 规格版本, 提示词版本)"""
+    return make_cache_key("llm-parse", model, normalize_instruction(instruction), spec_version, PROMPT_VERSION)
+
+
+_response_cache: Optional[TwoLevelCache] = None
+_response_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> TwoLevelCache:
+    """获取进程级共享的LLM响应缓存（内存LRU + 磁盘SQLite）"""
+    global _response_cache
+    if _response_cache is None:
+        with _response_cache_lock:
+            if _response_cache is None:
+                path = get_setting("LLM_CACHE_PATH", DEFAULT_LLM_CACHE_PATH)
+                _response_cache = TwoLevelCache(
+                    LRUCache(get_setting("LLM_CACHE_SIZE", DEFAULT_LLM_CACHE_SIZE)),
+                    SQLiteCache(os.path.expanduser(path), table="llm_responses",
+                                max_entries=get_setting("LLM_CACHE_MAX_ENTRIES", DEFAULT_LLM_CACHE_MAX_ENTRIES))
+                    if path else None
+                )
+    return _response_cache
@@ -0,0 +1,265 @@
+import threading
+from dataclasses import dataclass
+from typing import Dict, List, Any, Optional, Iterator, Tuple
+
+from .spec_index import SpecIndex, get_spec_index
+
+
+# 作用域关键词 - 顺序即返回顺序
+SCOPE_KEYWORDS = {
+    "node": ["节点", "node"],
+    "pod": ["pod", "容器组"],
+    "container": ["容器", "container"],
+    "host": ["主机", "host", "服务器"],
+    "cri": ["cri", "运行时"]
+}
+
+# 目标关键词 - 优先级从高到低
+TARGET_KEYWORDS = {
+    "cpu": ["cpu", "处理器", "中央处理器", "核心"],
+    "network": ["网络", "network", "网卡", "端口", "延迟", "丢包", "带宽"],
+    "process": ["进程", "process", "杀死", "停止", "进程名"],
+    "disk": ["磁盘", "disk", "硬盘", "io", "读写", "占用"],
+    "mem": ["内存", "memory", "ram", "内存负载"],
+    "file": ["文件", "file", "创建文件", "修改文件", "删除文件"],
+    "script": ["脚本", "script", "shell", "bash"],
+    "strace": ["系统调用", "strace", "syscall"],
+    "systemd": ["服务", "service", "systemd", "守护进程"],
+    "time": ["时间", "time", "时钟", "ntp"]
+}
+
+# 动作关键词 - 优先级从高到低
+ACTION_KEYWORDS = {
+    "delay": ["延迟", "delay", "慢", "网络延迟"],
+    "loss": ["丢包", "loss", "丢失"],
+    "load": ["负载", "load", "满载"],
+    "kill": ["杀死", "kill", "停止", "终止"],
+    "occupy": ["占用", "occupy", "使用"],
+    "pause": ["暂停", "pause"],
+    "restart": ["重启", "restart", "重新启动"],
+    "add": ["添加", "创建", "新增", "add", "create"],
+    "delete": ["删除", "移除", "delete", "remove"],
+    "modify": ["修改", "更改", "modify", "change"]
+}
+
+# 规格词表优先级: 排在人工词表之后
+SPEC_PRIORITY_OFFSET = 1000
+SPEC_KEYWORD_MIN_LENGTH = 3
+
+
+@dataclass
+class KeywordMatch:
+    """关键词命中结果"""
+    category: str
+    value: str
+    keyword: str
+    start: int
+    end: int
+    priority: int
+
+
+@dataclass
+class _Pattern:
+    category: str
+    value: str
+    keyword: str
+    priority: int
+    word_boundary: bool
+
+
+def _is_word_char(char: str) -> bool:
+    return char.isascii() and (char.isalnum() or char == "_")
+
+
+def _joins_word(text: str, index: int, step: int) -> bool:
+    """text[index] 是否把关键词连到相邻的单词上
+
+    "-" 和 "." 属于k8s资源名称（如 mysql-primary、web-dns-1）的一部分；
+    "." 后面不是字母数字时视为句号。
+    """
+    char = text[index]
+    if _is_word_char(char) or char == "-":
+        return True
+    if char == ".":
+        neighbour = index + step
+        return 0 <= neighbour < len(text) and _is_word_char(text[neighbour])
+    return False
+
+
+class AhoCorasick:
+    """Aho-Corasick多模式匹配自动机"""
+
+    def __init__(self):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[int]] = [[]]
+        self._patterns: List[Any] = []
+        self._lengths: List[int] = []
+        self._built = False
+
+    def add(self, keyword: str, payload: Any):
+        """添加模式串"""
+        if not keyword:
+            return
+        state = 0
+        for char in keyword:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            state = next_state
+        self._output[state].append(len(self._patterns))
+        self._patterns.append(payload)
+        self._lengths.append(len(keyword))
+        self._built = False
+
+    def build(self):
+        """按BFS构建失败指针，并合并输出集合"""
+        queue = list(self._goto[0].values())
+        for state in queue:
+            self._fail[state] = 0
+        head = 0
+        while head < len(queue):
+            state = queue[head]
+            head += 1
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                candidate = self._goto[fail].get(char, 0)
+                self._fail[next_state] = candidate if candidate != next_state else 0
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+        self._built = True
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, int, Any]]:
+        """单次扫描文本，产出 (start, end, payload)"""
+        if not self._built:
+            self.build()
+        goto, fail, output = self._goto, self._fail, self._output
+        state = 0
+        for index, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for pattern_id in output[state]:
+                end = index + 1
+                yield end - self._lengths[pattern_id], end, self._patterns[pattern_id]
+
+    def __len__(self) -> int:
+        return len(self._patterns)
+
+
+class KeywordMatcher:
+    """作用域/目标/动作关键词匹配器
+
+    所有词表编译进同一个自动机，一次扫描得到全部命中及位置；
+    同类别按优先级（越小越高）取值，优先级相同时取最先出现的。
+    """
+
+    def __init__(self):
+        self._automaton = AhoCorasick()
+
+    def build(self):
+        """构建自动机，构建后可被多线程并发读取"""
+        self._automaton.build()
+
+    def add_vocabulary(self, category: str, vocabulary: Dict[str, List[str]],
+                       priority_offset: int = 0, word_boundary: bool = False):
+        """添加词表，字典顺序决定优先级"""
+        for priority, (value, keywords) in enumerate(vocabulary.items(), start=priority_offset):
+            for keyword in keywords:
+                self._automaton.add(keyword.lower(), _Pattern(
+                    category, value, keyword.lower(), priority, word_boundary
+                ))
+
+    def find(self, instruction: str) -> List[KeywordMatch]:
+        """查找所有命中的关键词"""
+        text = instruction.lower()
+        matches = []
+        for start, end, pattern in self._automaton.iter_matches(text):
+            if pattern.word_boundary and (
+                (start > 0 and _joins_word(text, start - 1, -1)) or
+                (end < len(text) and _joins_word(text, end, 1))
+            ):
+                continue
+            matches.append(KeywordMatch(
+                category=pattern.category,
+                value=pattern.value,
+                keyword=pattern.keyword,
+                start=start,
+                end=end,
+                priority=pattern.priority
+            ))
+        return matches
+
+    @staticmethod
+    def select(matches: List[KeywordMatch], category: str) -> Optional[str]:
+        """选出指定类别优先级最高的值"""
+        best = None
+        for match in matches:
+            if match.category != category:
+                continue
+            if best is None or (match.priority, match.start) < (best.priority, best.start):
+                best = match
+        return best.value if best else None
+
+    @staticmethod
+    def select_all(matches: List[KeywordMatch], category: str) -> List[str]:
+        """按优先级列出指定类别命中的全部值（去重）"""
+        ranked = sorted((m.priority, m.value) for m in matches if m.category == category)
+        values = []
+        for _, value in ranked:
+            if value not in values:
+                values.append(value)
+        return values
+
+
+def _spec_vocabulary(index: SpecIndex) -> Tuple[Dict[str, List[str]], Dict[str, List[str]]]:
+    """从规格索引提取英文目标/动作词表"""
+    targets: Dict[str, List[str]] = {}
+    actions: Dict[str, List[str]] = {}
+    for spec in index:
+        if len(spec.target) >= SPEC_KEYWORD_MIN_LENGTH:
+            targets.setdefault(spec.target, [spec.target])
+        for name in [spec.action] + spec.aliases:
+            if len(name) >= SPEC_KEYWORD_MIN_LENGTH:
+                keywords = actions.setdefault(spec.action, [])
+                if name not in keywords:
+                    keywords.append(name)
+    return targets, actions
+
+
+def build_instruction_matcher(index: SpecIndex = None) -> KeywordMatcher:
+    """构建指令匹配器: 人工词表优先，规格词表兜底"""
+    matcher = KeywordMatcher()
+    matcher.add_vocabulary("scope", SCOPE_KEYWORDS)
+    matcher.add_vocabulary("target", TARGET_KEYWORDS)
+    matcher.add_vocabulary("action", ACTION_KEYWORDS)
+
+    if index is not None:
+        spec_targets, spec_actions = _spec_vocabulary(index)
+        matcher.add_vocabulary("target", spec_targets, SPEC_PRIORITY_OFFSET, word_boundary=True)
+        matcher.add_vocabulary("action", spec_actions, SPEC_PRIORITY_OFFSET, word_boundary=True)
+    return matcher
+
+
+_matcher: Optional[KeywordMatcher] = None
+_matcher_version: Optional[str] = None
+_matcher_lock = threading.Lock()
+
+
+def get_instruction_matcher() -> KeywordMatcher:
+    """获取进程级共享的指令匹配器，规格版本变化时重建"""
+    global _matcher, _matcher_version
+    index = get_spec_index()
+    if _matcher is None or _matcher_version != index.version:
+        with _matcher_lock:
+            if _matcher is None or _matcher_version != index.version:
+                matcher = build_instruction_matcher(index)
+                matcher.build()
+                _matcher, _matcher_version = matcher, index.version
+    return _matcher
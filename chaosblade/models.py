@@ -1,5 +1,8 @@
+import re
+import ipaddress
+import threading
 from dataclasses import dataclass, field
-from typing import Dict, List, Any, Optional, Union
+from typing import Dict, List, Any, Optional, Union, ClassVar
 
 
 @dataclass
@@ -13,6 +16,7 @@ class ParsedResult:
     description: str
     confidence: float = 0.0
     warnings: List[str] = field(default_factory=list)
+    fallback: bool = False  # 大模型不可用，结果来自规则解析
     
     def __post_init__(self):
         if self.warnings is None:
@@ -55,19 +59,10 @@ class ScopeConfig:
     @staticmethod
     def get_scope_by_keywords(instruction: str) -> List[str]:
         """根据关键词检测作用域"""
-        scopes = []
-        instruction_lower = instruction.lower()
+        from .matcher import KeywordMatcher, get_instruction_matcher
         
-        if any(keyword in instruction_lower for keyword in ["节点", "node"]):
-            scopes.append("node")
-        if any(keyword in instruction_lower for keyword in ["pod", "容器组"]):
-            scopes.append("pod")
-        if any(keyword in instruction_lower for keyword in ["容器", "container"]):
-            scopes.append("container")
-        if any(keyword in instruction_lower for keyword in ["主机", "host", "服务器"]):
-            scopes.append("host")
-        if any(keyword in instruction_lower for keyword in ["cri", "运行时"]):
-            scopes.append("cri")
+        matches = get_instruction_matcher().find(instruction)
+        scopes = KeywordMatcher.select_all(matches, "scope")
             
         return scopes or ["host"]  # 默认返回host
     
@@ -138,9 +133,88 @@ class TargetConfig:
         return target_scopes.get(target, "host")
 
 
+_DURATION_PATTERN = re.compile(r"^\d+(ms|s|m|h)?$")
+_SIZE_PATTERN = re.compile(r"^\d+(\.\d+)?([KMGT]i?)?B?$", re.IGNORECASE)
+_PORT_RANGE_PATTERN = re.compile(r"^(\d{1,5})(?:-(\d{1,5}))?$")
+
+
+def _split_values(value: Any) -> List[str]:
+    """拆分逗号分隔或列表形式的多值参数"""
+    if isinstance(value, (list, tuple)):
+        items = value
+    else:
+        items = str(value).split(",")
+    return [str(item).strip() for item in items]
+
+
+def _check_duration(value: Any) -> bool:
+    return bool(_DURATION_PATTERN.match(str(value)))
+
+
+def _check_size(value: Any) -> bool:
+    return bool(_SIZE_PATTERN.match(str(value)))
+
+
+def _check_percentage(value: Any) -> bool:
+    text = str(value).rstrip("%")
+    return text.isdigit() and 0 <= int(text) <= 100
+
+
+def _check_ip(value: Any) -> bool:
+    try:
+        for item in _split_values(value):
+            ipaddress.ip_address(item)
+    except ValueError:
+        return False
+    return True
+
+
+def _check_cidr(value: Any) -> bool:
+    try:
+        for item in _split_values(value):
+            ipaddress.ip_network(item, strict=False)
+    except ValueError:
+        return False
+    return True
+
+
+def _check_port_range(value: Any) -> bool:
+    for item in _split_values(value):
+        match = _PORT_RANGE_PATTERN.match(item)
+        if not match:
+            return False
+        start = int(match.group(1))
+        end = int(match.group(2) or start)
+        if not (0 < start <= end <= 65535):
+            return False
+    return True
+
+
 @dataclass
 class ValidationConfig:
-    """验证配置"""
+    """验证配置（进程内只加载一次，正则预编译）"""
+    
+    # 参数名 -> 规则类型
+    PARAMETER_TYPES: ClassVar[Dict[str, str]] = {
+        "timeout": "timeout",
+        "time": "duration",
+        "delay": "duration",
+        "offset": "duration",
+        "percent": "percentage",
+        "load": "percentage",
+        "cpu-percent": "percentage",
+        "mem-percent": "percentage",
+        "size": "size",
+        "reserve": "size",
+        "destination-ip": "cidr",
+        "exclude-ip": "cidr",
+        "local-port": "port-range",
+        "remote-port": "port-range",
+        "exclude-port": "port-range"
+    }
+    
+    _instance: ClassVar[Optional["ValidationConfig"]] = None
+    _instance_lock: ClassVar[threading.Lock] = threading.Lock()
     
     def __init__(self):
         self.rules = self._load_validation_rules()
@@ -149,29 +223,51 @@ class ValidationConfig:
         """加载验证规则"""
         return {
             "timeout": {
-                "pattern": r"^\d+[smh]?$",
+                "pattern": re.compile(r"^\d+[smh]?$"),
                 "description": "超时时间格式: 数字+单位(s/m/h)"
             },
+            "duration": {
+                "checker": _check_duration,
+                "description": "时长格式: 数字+单位(ms/s/m/h)"
+            },
             "percentage": {
-                "pattern": r"^\d{1,3}$",
+                "checker": _check_percentage,
                 "range": [0, 100],
                 "description": "百分比: 0-100的整数"
             },
             "size": {
-                "pattern": r"^\d+[KMGT]?B?$",
+                "checker": _check_size,
                 "description": "大小格式: 数字+单位(K/M/G/T)B"
             },
             "ip": {
-                "pattern": r"^\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}$",
+                "checker": _check_ip,
                 "description": "IP地址格式: xxx.xxx.xxx.xxx"
+            },
+            "cidr": {
+                "checker": _check_cidr,
+                "description": "IP或网段格式: 10.0.0.1 或 192.168.1.0/24，多个用逗号分隔"
+            },
+            "port-range": {
+                "checker": _check_port_range,
+                "description": "端口格式: 80 或 8000-8080，多个用逗号分隔"
             }
         }
     
+    @classmethod
+    def get_instance(cls) -> "ValidationConfig":
+        """获取进程内共享实例"""
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    cls._instance = cls()
+        return cls._instance
+    
     @staticmethod 
     def get_validation_rules(param_name: str) -> Dict[str, Any]:
         """获取参数验证规则"""
-        config = ValidationConfig()
-        return config.rules.get(param_name, {})
+        config = ValidationConfig.get_instance()
+        rule_type = ValidationConfig.PARAMETER_TYPES.get(param_name, param_name)
+        return config.rules.get(rule_type, {})
 
 
 @dataclass
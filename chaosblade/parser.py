@@ -1,26 +1,70 @@
 import re
+import json
 import logging
-from typing import Dict, List, Any, Optional, Tuple
-from openai import OpenAI
-import sys
-import os
-
-# 添加父目录到路径以导入config
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-import config
+import threading
+from collections import Counter
+from typing import Dict, List, Any, Optional, Tuple, Iterator
+from openai import OpenAI, AsyncOpenAI
 
+from .settings import config
 from .models import ParsedResult, ScopeConfig, TargetConfig
+from .spec_index import SpecIndex, get_spec_index
+from .matcher import (
+    KeywordMatch, KeywordMatcher, get_instruction_matcher,
+    SCOPE_KEYWORDS, TARGET_KEYWORDS, ACTION_KEYWORDS
+)
+from .entities import ExtractedEntities, extract_entities, pick_names
+from .prompt import get_prompt_builder, get_token_budget
+from .router import get_model_router
+from .breaker import OPEN, CircuitOpenError, get_circuit_breaker
+from .canonical import canonicalize, skeleton_cache_key, get_skeleton_cache
+from .llm import (
+    LLMResponseError, build_messages, parse_response,
+    response_cache_key, get_response_cache
+)
+from .settings import get_setting
 
 
 logger = logging.getLogger(__name__)
 
+# 名称提取时: 紧跟作用域关键词的名称优先，英文关键词本身不作为名称
+NAME_ANCHORS = [keyword for keywords in SCOPE_KEYWORDS.values() for keyword in keywords if keyword.isascii()]
+NAME_STOPWORDS = [keyword for vocabulary in (TARGET_KEYWORDS, ACTION_KEYWORDS)
+                  for keywords in vocabulary.values() for keyword in keywords if keyword.isascii()]
+
+# 解析规则版本，修改规则解析或参数提取逻辑时递增，使已缓存的解析结果失效
+PARSER_VERSION = "1"
+# 解析模式: rule 仅规则解析, llm 使用大模型解析, tiered 低置信度时才调用大模型
+PARSER_MODES = ["rule", "llm", "tiered"]
+DEFAULT_TIERED_THRESHOLD = 0.8
+# 模型名为 auto 时按延迟和错误率在 AVAILABLE_MODELS 之间路由
+AUTO_MODEL_KEY = "auto"
+# 值为列表的参数
+LIST_PARAMETERS = ["names", "namespace", "labels", "container-names"]
+
+# 进程内全部解析器的分层统计，各解析器实例另有自己的计数
+_tier_stats = Counter()
+_tier_stats_lock = threading.Lock()
+
+
+def get_tier_stats() -> Dict[str, int]:
+    """进程内各解析层级处理的请求数（所有模型的解析器合计）"""
+    with _tier_stats_lock:
+        return dict(_tier_stats)
+
 
 class NaturalLanguageParser:
     """自然语言解析器"""
     
-    def __init__(self, base_url: str = None, model: str = None):
+    def __init__(self, base_url: str = None, model: str = None, mode: str = None):
+        # 设置解析模式
+        self.mode = mode or get_setting("PARSER_MODE", "rule")
+        if self.mode not in PARSER_MODES:
+            raise ValueError(f"不支持的解析模式: {self.mode}")
+        
         # 设置模型
-        self.model_key = model or "llama3.1"
+        self.routing = model == AUTO_MODEL_KEY or (model is None and get_setting("LLM_ROUTING", False))
+        self.model_key = model if model and model != AUTO_MODEL_KEY else "llama3.1"
         self.model_name = config.get_model_name(self.model_key)
         self.model_config = config.get_model_config(self.model_key)
         
@@ -32,39 +76,79 @@ class NaturalLanguageParser:
             api_config["base_url"] = base_url
             
         # 创建OpenAI客户端，使用模型特定的配置
+        self.api_config = api_config
         self.client = OpenAI(
             base_url=api_config["base_url"], 
             api_key=api_config["api_key"],
             default_headers=api_config["headers"]
         )
         
-        self.specifications = self._load_yaml_specifications()
+        self.response_cache = get_response_cache()
+        self.skeleton_cache = get_skeleton_cache()
+        
+        # 分层解析: 规则解析置信度达到阈值时直接返回
+        self.confidence_threshold = get_setting("TIERED_CONFIDENCE_THRESHOLD", DEFAULT_TIERED_THRESHOLD)
+        self._tier_stats = Counter()
+        self._stats_lock = threading.Lock()
     
-    def _load_yaml_specifications(self) -> Dict[str, Any]:
-        """加载YAML规格说明"""
-        # 这里应该从文件加载，暂时返回空字典
-        return {}
+    @property
+    def specifications(self) -> SpecIndex:
+        """YAML规格索引（进程内共享，热更新后自动使用新版本）"""
+        return get_spec_index()
     
     def parse_instruction(self, instruction: str) -> ParsedResult:
         """解析自然语言指令"""
         logger.info(f"解析指令: {instruction}")
         
-        # 1. 提取基本信息
-        scope = self._extract_scope(instruction)
-        target = self._extract_target(instruction)
-        action = self._extract_action(instruction)
+        if self.mode == "llm":
+            return self.parse_with_llm(instruction)
+        if self.mode == "tiered":
+            return self.parse_tiered(instruction)
+        
+        self._record_tier("rule")
+        return self.parse_with_rules(instruction)
+    
+    def parse_tiered(self, instruction: str) -> ParsedResult:
+        """分层解析: 规则解析置信度不足时升级到大模型"""
+        result = self.parse_with_rules(instruction)
+        if result.confidence >= self.confidence_threshold:
+            self._record_tier("rule")
+            return result
+        
+        logger.info(f"规则解析置信度 {result.confidence:.2f} 低于阈值 {self.confidence_threshold}，升级到LLM")
+        return self.parse_with_llm(instruction, fallback=result)
+    
+    def _record_tier(self, tier: str):
+        with self._stats_lock:
+            self._tier_stats[tier] += 1
+        with _tier_stats_lock:
+            _tier_stats[tier] += 1
+    
+    def get_tier_stats(self) -> Dict[str, int]:
+        """各解析层级处理的请求数: rule / llm_cache / llm_skeleton / llm / llm_fallback / llm_circuit_open"""
+        with self._stats_lock:
+            return dict(self._tier_stats)
+    
+    def parse_with_rules(self, instruction: str) -> ParsedResult:
+        """基于关键词和正则的规则解析"""
+        # 1. 提取基本信息（单次扫描匹配全部关键词）
+        matches = self._match_keywords(instruction)
+        scope = self._extract_scope(instruction, matches)
+        target = self._extract_target(instruction, matches)
+        action = self._extract_action(instruction, matches)
         
         # 2. 生成实验名称
         name = self._generate_name(instruction, scope, target, action)
         
-        # 3. 提取参数
-        parameters = self._extract_parameters(instruction, target, action)
+        # 3. 提取参数（单次扫描提取全部实体）
+        entities = extract_entities(instruction)
+        parameters = self._extract_parameters(instruction, target, action, entities)
         
         # 4. 生成描述
         description = self._generate_description(instruction, scope, target, action)
         
         # 5. 计算置信度
-        confidence = self._calculate_confidence(scope, target, action, parameters)
+        confidence = self._calculate_confidence(scope, target, action, parameters, matches)
         
         # 6. 生成警告
         warnings = self._generate_warnings(scope, target, action, parameters)
@@ -80,60 +164,246 @@ class NaturalLanguageParser:
             warnings=warnings
         )
     
-    def _extract_scope(self, instruction: str) -> str:
-        """提取作用域"""
-        scopes = ScopeConfig.get_scope_by_keywords(instruction)
-        return scopes[0] if scopes else "host"
+    def parse_with_llm(self, instruction: str, fallback: ParsedResult = None) -> ParsedResult:
+        """使用大模型解析，结果按 (实际应答的模型, 规范化指令, 规格版本) 缓存
+        
+        Args:
+            instruction: 自然语言指令
+            fallback: 大模型不可用时返回的规则解析结果（可选）
+        """
+        data = self._lookup_llm_cache(instruction)
+        if data is None:
+            try:
+                model_name, data = self._request_llm(instruction)
+            except Exception as e:
+                return self._llm_fallback(instruction, e, fallback)
+            self._store_llm_result(instruction, model_name, data)
+        
+        return self._build_llm_result(instruction, data)
     
-    def _extract_target(self, instruction: str) -> str:
-        """提取目标"""
-        instruction_lower = instruction.lower()
-        
-        # 目标关键词映射
-        target_keywords = {
-            "cpu": ["cpu", "处理器", "中央处理器", "核心"],
-            "network": ["网络", "network", "网卡", "端口", "延迟", "丢包", "带宽"],
-            "process": ["进程", "process", "杀死", "停止", "进程名"],
-            "disk": ["磁盘", "disk", "硬盘", "io", "读写", "占用"],
-            "mem": ["内存", "memory", "ram", "内存负载"],
-            "file": ["文件", "file", "创建文件", "修改文件", "删除文件"],
-            "script": ["脚本", "script", "shell", "bash"],
-            "strace": ["系统调用", "strace", "syscall"],
-            "systemd": ["服务", "service", "systemd", "守护进程"],
-            "time": ["时间", "time", "时钟", "ntp"]
-        }
+    def stream_instruction(self, instruction: str) -> Iterator[Tuple[str, Any]]:
+        """流式解析，依次产出:
         
-        for target, keywords in target_keywords.items():
-            for keyword in keywords:
-                if keyword in instruction_lower:
-                    return target
+        ("rule", 规则解析结果) -> ("token", 大模型增量文本)... -> ("parsed", 最终解析结果)
+        不需要调用大模型或命中缓存时没有token事件。
+        """
+        logger.info(f"解析指令: {instruction}")
         
-        return "file"  # 默认目标
+        result = self.parse_with_rules(instruction)
+        yield "rule", result
+        if self.mode == "rule" or (self.mode == "tiered" and result.confidence >= self.confidence_threshold):
+            self._record_tier("rule")
+            yield "parsed", result
+            return
+        
+        data = self._lookup_llm_cache(instruction)
+        if data is None:
+            try:
+                model_name, data = yield from self._stream_llm(instruction)
+            except Exception as e:
+                yield "parsed", self._llm_fallback(instruction, e, result)
+                return
+            self._store_llm_result(instruction, model_name, data)
+        
+        yield "parsed", self._build_llm_result(instruction, data)
     
-    def _extract_action(self, instruction: str) -> str:
-        """提取动作"""
-        instruction_lower = instruction.lower()
-        
-        # 动作关键词映射 - 优先级从高到低
-        action_keywords = {
-            "delay": ["延迟", "delay", "慢", "网络延迟"],
-            "loss": ["丢包", "loss", "丢失"],
-            "load": ["负载", "load", "满载"],
-            "kill": ["杀死", "kill", "停止", "终止"],
-            "occupy": ["占用", "occupy", "使用"],
-            "pause": ["暂停", "pause"],
-            "restart": ["重启", "restart", "重新启动"],
-            "add": ["添加", "创建", "新增", "add", "create"],
-            "delete": ["删除", "移除", "delete", "remove"],
-            "modify": ["修改", "更改", "modify", "change"]
+    async def aparse_instruction(self, instruction: str, clients: "AsyncClientPool") -> ParsedResult:
+        """异步解析自然语言指令，大模型请求使用调用方事件循环内的异步客户端"""
+        logger.info(f"解析指令: {instruction}")
+        
+        if self.mode == "llm":
+            return await self.aparse_with_llm(instruction, clients)
+        
+        result = self.parse_with_rules(instruction)
+        if self.mode == "tiered" and result.confidence < self.confidence_threshold:
+            return await self.aparse_with_llm(instruction, clients, fallback=result)
+        
+        self._record_tier("rule")
+        return result
+    
+    async def aparse_with_llm(self, instruction: str, clients: "AsyncClientPool",
+                              fallback: ParsedResult = None) -> ParsedResult:
+        """parse_with_llm 的异步版本"""
+        data = self._lookup_llm_cache(instruction)
+        if data is None:
+            try:
+                model_name, data = await self._arequest_llm(instruction, clients)
+            except Exception as e:
+                return self._llm_fallback(instruction, e, fallback)
+            self._store_llm_result(instruction, model_name, data)
+        
+        return self._build_llm_result(instruction, data)
+    
+    def create_async_client(self) -> AsyncOpenAI:
+        """创建与同步客户端配置一致的异步客户端（绑定调用方的事件循环）"""
+        return AsyncOpenAI(
+            base_url=self.api_config["base_url"],
+            api_key=self.api_config["api_key"],
+            default_headers=self.api_config["headers"]
+        )
+    
+    def _cache_model_names(self) -> List[str]:
+        """查找缓存时使用的模型: 开启路由时任一候选模型的结果都可复用"""
+        if self.routing:
+            return [config.get_model_name(key) for key in get_model_router().rank()]
+        return [self.model_name]
+    
+    def _lookup_llm_cache(self, instruction: str) -> Optional[Dict[str, Any]]:
+        version = self.specifications.version
+        model_names = self._cache_model_names()
+        for model_name in model_names:
+            data = self.response_cache.get(response_cache_key(model_name, instruction, version))
+            if data is not None:
+                self._record_tier("llm_cache")
+                return data
+        
+        # 只有名称/数值不同的指令共用一个解析骨架
+        canonical = canonicalize(instruction)
+        if canonical.slots:
+            for model_name in model_names:
+                skeleton = self.skeleton_cache.get(skeleton_cache_key(model_name, canonical, version))
+                if skeleton is not None:
+                    self._record_tier("llm_skeleton")
+                    return canonical.fill(skeleton)
+        return None
+    
+    def _store_llm_result(self, instruction: str, model_name: str, data: Dict[str, Any]):
+        """按实际应答的模型缓存结果和骨架"""
+        self._record_tier("llm")
+        version = self.specifications.version
+        self.response_cache.set(response_cache_key(model_name, instruction, version), data)
+        
+        canonical = canonicalize(instruction)
+        if canonical.slots:
+            skeleton = canonical.build_skeleton(data)
+            if skeleton is not None:
+                self.skeleton_cache.set(skeleton_cache_key(model_name, canonical, version), skeleton)
+    
+    def _llm_fallback(self, instruction: str, error: Exception, fallback: ParsedResult = None) -> ParsedResult:
+        """大模型失败时回退到规则解析"""
+        logger.warning(f"LLM解析失败，回退到规则解析: {error}")
+        self._record_tier("llm_circuit_open" if isinstance(error, CircuitOpenError) else "llm_fallback")
+        result = fallback or self.parse_with_rules(instruction)
+        result.warnings.append(f"LLM解析失败，已使用规则解析: {error}")
+        result.fallback = True
+        return result
+    
+    def _llm_request_kwargs(self, instruction: str) -> Dict[str, Any]:
+        """构建chat.completions请求参数"""
+        return {
+            "model": self.model_name,
+            "messages": build_messages(instruction, self._build_spec_context(instruction)),
+            "temperature": self.model_config.get("temperature", 0.1),
+            "max_tokens": self.model_config.get("max_tokens", 4096),
+            "timeout": self.model_config.get("timeout", 30)
         }
+    
+    def _build_spec_context(self, instruction: str) -> str:
+        """只把关键词命中的候选实验规格放进提示词"""
+        return get_prompt_builder().build(instruction, get_token_budget(self.model_config))
+    
+    def _request_llm(self, instruction: str) -> Tuple[str, Dict[str, Any]]:
+        """调用大模型并解析返回的JSON，返回 (应答的模型, 结果)；开启路由时由路由器选择模型"""
+        if self.routing:
+            from .registry import get_parser
+            return get_model_router().request(
+                lambda key: get_parser(model=key)._request_model(instruction),
+                exclude=lambda key: get_circuit_breaker(key).state == OPEN
+            )
+        return self._request_model(instruction)
+    
+    def _stream_llm(self, instruction: str) -> Iterator[Tuple[str, Any]]:
+        """流式调用大模型，产出 ("token", 增量文本)，返回 (应答的模型, 结果)；开启路由时由路由器选择模型"""
+        if self.routing:
+            from .registry import get_parser
+            return (yield from get_model_router().stream(
+                lambda key: get_parser(model=key)._stream_model(instruction),
+                exclude=lambda key: get_circuit_breaker(key).state == OPEN
+            ))
+        return (yield from self._stream_model(instruction))
+    
+    def _stream_model(self, instruction: str) -> Iterator[Tuple[str, Any]]:
+        """流式调用本解析器对应的模型，熔断期间直接失败"""
+        chunks = []
+        with get_circuit_breaker(self.model_key).protect(neutral=(LLMResponseError,)):
+            stream = self.client.chat.completions.create(stream=True, **self._llm_request_kwargs(instruction))
+            for chunk in stream:
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if delta:
+                    chunks.append(delta)
+                    yield "token", delta
+            return self.model_name, parse_response("".join(chunks))
+    
+    def _request_model(self, instruction: str) -> Tuple[str, Dict[str, Any]]:
+        """调用本解析器对应的模型，熔断期间直接失败"""
+        with get_circuit_breaker(self.model_key).protect(neutral=(LLMResponseError,)):
+            response = self.client.chat.completions.create(**self._llm_request_kwargs(instruction))
+            return self.model_name, parse_response(response.choices[0].message.content)
+    
+    async def _arequest_llm(self, instruction: str, clients: "AsyncClientPool") -> Tuple[str, Dict[str, Any]]:
+        """_request_llm 的异步版本"""
+        if self.routing:
+            from .registry import get_parser
+            return await get_model_router().arequest(
+                lambda key: get_parser(model=key)._arequest_model(instruction, clients),
+                exclude=lambda key: get_circuit_breaker(key).state == OPEN
+            )
+        return await self._arequest_model(instruction, clients)
+    
+    async def _arequest_model(self, instruction: str, clients: "AsyncClientPool") -> Tuple[str, Dict[str, Any]]:
+        """_request_model 的异步版本"""
+        with get_circuit_breaker(self.model_key).protect(neutral=(LLMResponseError,)):
+            response = await clients.get(self).chat.completions.create(**self._llm_request_kwargs(instruction))
+            return self.model_name, parse_response(response.choices[0].message.content)
+    
+    def _build_llm_result(self, instruction: str, data: Dict[str, Any]) -> ParsedResult:
+        """由大模型结构化结果构建ParsedResult"""
+        scope, target, action = data["scope"], data["target"], data["action"]
         
-        for action, keywords in action_keywords.items():
-            for keyword in keywords:
-                if keyword in instruction_lower:
-                    return action
+        parameters = {}
+        for name, value in data["parameters"].items():
+            # 模型对未提及的参数常返回null，不能当作字符串 "None" 传给实验
+            if value is None:
+                continue
+            if name in LIST_PARAMETERS:
+                items = [str(item) for item in (value if isinstance(value, list) else [value]) if item is not None]
+                if items:
+                    parameters[name] = items
+            else:
+                parameters[name] = value if isinstance(value, str) else json.dumps(value, ensure_ascii=False)
         
-        return "add"  # 默认动作
+        return ParsedResult(
+            name=self._generate_name(instruction, scope, target, action),
+            scope=scope,
+            target=target,
+            action=action,
+            parameters=parameters,
+            description=data["description"] or self._generate_description(instruction, scope, target, action),
+            confidence=self._calculate_confidence(scope, target, action, parameters),
+            warnings=self._generate_warnings(scope, target, action, parameters)
+        )
+    
+    def _match_keywords(self, instruction: str) -> List[KeywordMatch]:
+        """匹配作用域/目标/动作关键词"""
+        return get_instruction_matcher().find(instruction)
+    
+    def _extract_scope(self, instruction: str, matches: List[KeywordMatch] = None) -> str:
+        """提取作用域"""
+        if matches is None:
+            matches = self._match_keywords(instruction)
+        return KeywordMatcher.select(matches, "scope") or "host"
+    
+    def _extract_target(self, instruction: str, matches: List[KeywordMatch] = None) -> str:
+        """提取目标"""
+        if matches is None:
+            matches = self._match_keywords(instruction)
+        return KeywordMatcher.select(matches, "target") or "file"  # 默认目标
+    
+    def _extract_action(self, instruction: str, matches: List[KeywordMatch] = None) -> str:
+        """提取动作"""
+        if matches is None:
+            matches = self._match_keywords(instruction)
+        return KeywordMatcher.select(matches, "action") or "add"  # 默认动作
     
     def _generate_name(self, instruction: str, scope: str, target: str, action: str) -> str:
         """生成实验名称"""
@@ -141,93 +411,91 @@ class NaturalLanguageParser:
         timestamp = self._get_timestamp()
         return f"{scope}-{target}-{action}-{timestamp}"
     
-    def _extract_parameters(self, instruction: str, target: str, action: str) -> Dict[str, Any]:
+    def _extract_parameters(self, instruction: str, target: str, action: str,
+                            entities: ExtractedEntities = None) -> Dict[str, Any]:
         """提取参数"""
+        if entities is None:
+            entities = extract_entities(instruction)
         parameters = {}
         
         # 提取文件路径
-        file_path_match = re.search(r'[/][^\s]+', instruction)
-        if file_path_match:
-            parameters["filepath"] = file_path_match.group()
+        path = entities.first("path")
+        if path:
+            parameters["filepath"] = path.value
         
         # 提取内容
-        content_match = re.search(r'内容为[\"\'"]?(.+?)[\"\'"]?$', instruction)
-        if content_match:
-            parameters["content"] = content_match.group(1)
-        
-        # 提取数字参数
-        if "延迟" in instruction or "delay" in instruction.lower():
-            # 特殊处理延迟参数，查找延迟关键词附近的数字
-            delay_match = re.search(r'延迟[^\d]*(\d+)', instruction)
-            if not delay_match:
-                delay_match = re.search(r'delay[^\d]*(\d+)', instruction.lower())
-            if delay_match:
-                parameters["delay"] = delay_match.group(1)
-        elif "负载" in instruction or "load" in instruction.lower():
-            # 特殊处理负载参数，查找负载关键词附近的数字
-            load_match = re.search(r'负载[^\d]*(\d+)', instruction)
-            if not load_match:
-                load_match = re.search(r'load[^\d]*(\d+)', instruction.lower())
-            if load_match:
-                parameters["load"] = load_match.group(1)
+        content = entities.first("content")
+        if content:
+            parameters["content"] = content.value
+        
+        # 提取数字参数: 延迟优先于负载
+        keyed = entities.first("keyed_number", "delay") or entities.first("keyed_number", "load")
+        if keyed:
+            parameters[keyed.key] = keyed.value
+        elif action == "delay" and entities.first("duration"):
+            # 关键词与数值不相邻（如 "delay network ... by 100ms"）时取第一个时长
+            parameters["delay"] = re.match(r"\d+", entities.first("duration").value).group()
+        elif action == "load" and entities.first("percentage"):
+            parameters["load"] = re.match(r"\d+", entities.first("percentage").value).group()
         
         # 提取网卡参数
-        if "网卡" in instruction or "interface" in instruction.lower():
-            interface_match = re.search(r'网卡\s+(\w+)', instruction)
-            if not interface_match:
-                interface_match = re.search(r'interface\s+(\w+)', instruction.lower())
-            if interface_match:
-                parameters["interface"] = interface_match.group(1)
+        interface = entities.first("interface")
+        if interface:
+            parameters["interface"] = interface.value
         
         # 提取节点/容器名称
-        names = self._extract_names(instruction)
+        names = self._extract_names(instruction, entities)
         if names:
             parameters["names"] = names
         
         # 提取命名空间
-        namespace_match = re.search(r'命名空间[为是]?[\"\'"]?([a-zA-Z0-9-]+)[\"\'"]?', instruction)
-        if namespace_match:
-            parameters["namespace"] = [namespace_match.group(1)]
+        namespace = entities.first("namespace")
+        if namespace:
+            parameters["namespace"] = [namespace.value]
         
         return parameters
     
-    def _extract_names(self, instruction: str) -> List[str]:
+    def _extract_names(self, instruction: str, entities: ExtractedEntities = None) -> List[str]:
         """提取名称列表"""
-        # 匹配IP地址
-        ip_matches = re.findall(r'\b(?:\d{1,3}\.){3}\d{1,3}\b', instruction)
-        if ip_matches:
-            return ip_matches
-        
-        # 匹配Pod名称格式
-        pod_matches = re.findall(r'[a-zA-Z0-9-]+-[a-zA-Z0-9]{5,10}', instruction)
-        if pod_matches:
-            return pod_matches
-        
-        # 匹配普通名称
-        name_matches = re.findall(r'[a-zA-Z0-9-]+', instruction)
-        return name_matches[:1] if name_matches else []
+        if entities is None:
+            entities = extract_entities(instruction)
+        return pick_names(entities, NAME_ANCHORS, NAME_STOPWORDS)
     
     def _generate_description(self, instruction: str, scope: str, target: str, action: str) -> str:
         """生成描述"""
         return f"{scope}级别{target}{action}实验"
     
-    def _calculate_confidence(self, scope: str, target: str, action: str, parameters: Dict[str, Any]) -> float:
-        """计算置信度"""
+    def _calculate_confidence(self, scope: str, target: str, action: str, parameters: Dict[str, Any],
+                              matches: List[KeywordMatch] = None) -> float:
+        """计算置信度
+        
+        提供关键词命中结果时，以目标/动作是否被关键词明确命中为准；
+        否则以是否为默认值判断。目标 file 和动作 add 同时也是未命中时的默认值，
+        只按默认值判断会把明确写了"添加文件"的指令当作未识别（0.7，低于分层阈值）。
+        """
         confidence = 0.5  # 基础置信度
         
         # 根据参数完整性提升置信度
         if parameters:
             confidence += 0.2
         
+        if matches is not None:
+            target_matched = any(match.category == "target" for match in matches)
+            action_matched = any(match.category == "action" for match in matches)
+        else:
+            target_matched = target != "file"  # 不是默认目标
+            action_matched = action != "add"  # 不是默认动作
+        
         # 根据目标匹配度提升置信度
-        if target != "file":  # 不是默认目标
+        if target_matched:
             confidence += 0.2
         
         # 根据动作匹配度提升置信度
-        if action != "add":  # 不是默认动作
+        if action_matched:
             confidence += 0.1
         
-        return min(confidence, 1.0)
+        # 按两位小数取整，避免浮点误差使恰好等于阈值的结果被判为低于阈值
+        return min(round(confidence, 2), 1.0)
     
     def _generate_warnings(self, scope: str, target: str, action: str, parameters: Dict[str, Any]) -> List[str]:
         """生成警告信息"""
@@ -253,6 +521,29 @@ class NaturalLanguageParser:
         return datetime.datetime.now().strftime("%Y%m%d%H%M%S")
 
 
+class AsyncClientPool:
+    """单个事件循环内按模型复用的异步客户端
+
+    异步客户端绑定创建它的事件循环，由批量任务在循环内创建，结束时调用 aclose 关闭。
+    开启路由时各候选模型的请求从同一个池中取各自的客户端。
+    """
+    
+    def __init__(self):
+        self._clients: Dict[Tuple[str, str], AsyncOpenAI] = {}
+    
+    def get(self, parser: NaturalLanguageParser) -> AsyncOpenAI:
+        key = (parser.model_key, parser.api_config["base_url"])
+        client = self._clients.get(key)
+        if client is None:
+            client = self._clients[key] = parser.create_async_client()
+        return client
+    
+    async def aclose(self):
+        for client in self._clients.values():
+            await client.close()
+        self._clients = {}
+
+
 class ScopeDetector:
     """作用域检测器"""
     
@@ -0,0 +1,134 @@
+import threading
+from collections import Counter, OrderedDict
+from typing import Dict, List, Optional, Set, Tuple
+
+from .spec_index import ActionSpec, SpecIndex, get_spec_index
+from .matcher import KeywordMatch, KeywordMatcher, get_instruction_matcher
+from .settings import get_setting
+
+
+# 规格片段占模型 max_tokens 的比例（模型配置中的 spec_context_tokens 优先）
+DEFAULT_SPEC_TOKEN_RATIO = 0.25
+# 同一作用域内出现比例不低于该值的flag视为通用flag，每个作用域只列一次
+COMMON_FLAG_RATIO = 0.4
+SHORT_DESC_MAX_LENGTH = 60
+
+
+def estimate_tokens(text: str) -> int:
+    """粗略估算token数: 英文约4字符一个token，中文约1字一个token"""
+    ascii_count = sum(1 for char in text if char.isascii())
+    return ascii_count // 4 + (len(text) - ascii_count) + 1
+
+
+def format_action(spec: ActionSpec, common_flags: Set[str] = frozenset()) -> str:
+    """紧凑格式: scope target action: 描述 | matchers: a*,b | flags: c*,d（*表示必需）"""
+    def names(params) -> str:
+        return ",".join(f"{p.name}*" if p.required else p.name
+                        for p in params.values() if p.name not in common_flags)
+
+    desc = spec.short_desc.strip().splitlines()[0] if spec.short_desc.strip() else ""
+    line = f"{spec.scope} {spec.target} {spec.action}"
+    if spec.aliases:
+        line += f"({','.join(spec.aliases)})"
+    if desc:
+        line += f": {desc[:SHORT_DESC_MAX_LENGTH]}"
+    matchers, flags = names(spec.matchers), names(spec.flags)
+    if matchers:
+        line += f" | matchers: {matchers}"
+    if flags:
+        line += f" | flags: {flags}"
+    return line
+
+
+class SpecPromptBuilder:
+    """根据指令的关键词命中，从规格索引中挑选候选实验组成提示词片段
+
+    只发送候选 (scope, target, action) 的matcher/flag名称和简短描述，
+    并按token预算截断，避免把整份规格文件放进提示词。
+    """
+
+    def __init__(self, index: SpecIndex, matcher: KeywordMatcher):
+        self.index = index
+        self.matcher = matcher
+        self._lines: Dict[Tuple[str, str, str], str] = {}
+        self._common_flags: Dict[str, Set[str]] = {}
+        self._compile()
+
+    def _compile(self):
+        """预先生成每个实验的紧凑描述"""
+        per_scope: Dict[str, List[ActionSpec]] = {}
+        for spec in self.index:
+            per_scope.setdefault(spec.scope, []).append(spec)
+
+        for scope, specs in per_scope.items():
+            counts = Counter(name for spec in specs for name in spec.flags)
+            common = {name for name, count in counts.items() if count >= len(specs) * COMMON_FLAG_RATIO}
+            self._common_flags[scope] = common
+            for spec in specs:
+                self._lines[(spec.scope, spec.target, spec.action)] = format_action(spec, common)
+
+    def select_candidates(self, matches: List[KeywordMatch]) -> List[ActionSpec]:
+        """按关键词命中给实验打分: 目标命中优先，其次动作、作用域"""
+        targets = KeywordMatcher.select_all(matches, "target")
+        actions = set(KeywordMatcher.select_all(matches, "action"))
+        scopes = set(KeywordMatcher.select_all(matches, "scope"))
+        if not targets and not actions:
+            return []
+
+        target_rank = {target: rank for rank, target in enumerate(targets)}
+        scored = []
+        for spec in self.index:
+            target_hit = spec.target in target_rank
+            action_hit = spec.action in actions or any(alias in actions for alias in spec.aliases)
+            if not target_hit and not action_hit:
+                continue
+            score = 4 * target_hit + 2 * action_hit + (spec.scope in scopes)
+            scored.append((-score, target_rank.get(spec.target, len(target_rank)),
+                           spec.scope, spec.target, spec.action, spec))
+        scored.sort(key=lambda item: item[:5])
+        return [item[-1] for item in scored]
+
+    def build(self, instruction: str, token_budget: int) -> str:
+        """生成不超过token预算的规格片段，没有候选时返回空字符串"""
+        candidates = self.select_candidates(self.matcher.find(instruction))
+        if not candidates or token_budget <= 0:
+            return ""
+
+        sections: "OrderedDict[str, List[str]]" = OrderedDict()
+        used = 0
+        for spec in candidates:
+            header = ""
+            if spec.scope not in sections:
+                common = sorted(self._common_flags.get(spec.scope, ()))
+                header = f"[{spec.scope}] 通用flags: {','.join(common)}" if common else f"[{spec.scope}]"
+            line = self._lines[(spec.scope, spec.target, spec.action)]
+            cost = estimate_tokens(line) + (estimate_tokens(header) if header else 0)
+            if used + cost > token_budget:
+                break
+            used += cost
+            sections.setdefault(spec.scope, [header] if header else []).append(line)
+
+        return "\n".join(line for lines in sections.values() for line in lines)
+
+
+def get_token_budget(model_config: Dict) -> int:
+    """规格片段的token预算"""
+    if model_config.get("spec_context_tokens") is not None:
+        return int(model_config["spec_context_tokens"])
+    ratio = get_setting("PROMPT_SPEC_TOKEN_RATIO", DEFAULT_SPEC_TOKEN_RATIO)
+    return int(model_config.get("max_tokens", 4096) * ratio)
+
+
+_builder: Optional[SpecPromptBuilder] = None
+_builder_lock = threading.Lock()
+
+
+def get_prompt_builder() -> SpecPromptBuilder:
+    """获取进程级共享的提示词构建器，规格版本变化时重建"""
+    global _builder
+    index = get_spec_index()
+    if _builder is None or _builder.index.version != index.version:
+        with _builder_lock:
+            if _builder is None or _builder.index.version != index.version:
+                _builder = SpecPromptBuilder(index, get_instruction_matcher())
+    return _builder
@@ -0,0 +1,81 @@
+import logging
+import threading
+from typing import Dict, Optional, Tuple
+
+from .parser import NaturalLanguageParser
+from .generator import YAMLGenerator
+from .settings import get_config_version
+
+
+logger = logging.getLogger(__name__)
+
+
+class InstanceRegistry:
+    """进程级解析器/生成器注册表
+
+    解析器按 (模型, base_url) 缓存，复用其中的OpenAI客户端及HTTP连接池；
+    生成器无模型相关状态，全进程共享一个。实例创建后只读共享，可被多线程并发使用。
+    配置热更新后（配置版本变化）丢弃全部实例，按新配置重建。
+    """
+
+    def __init__(self):
+        self._parsers: Dict[Tuple[Optional[str], Optional[str]], NaturalLanguageParser] = {}
+        self._generator: Optional[YAMLGenerator] = None
+        self._lock = threading.Lock()
+        self._config_version = get_config_version()
+
+    def _check_config_version(self):
+        if self._config_version != get_config_version():
+            self._config_version = get_config_version()
+            logger.info("配置已更新，重建解析器")
+            self.clear()
+
+    def get_parser(self, model: str = None, base_url: str = None) -> NaturalLanguageParser:
+        """获取指定模型的解析器"""
+        self._check_config_version()
+        key = (model, base_url)
+        parser = self._parsers.get(key)
+        if parser is None:
+            with self._lock:
+                parser = self._parsers.get(key)
+                if parser is None:
+                    logger.info(f"创建解析器: model={model or '默认'}")
+                    parser = NaturalLanguageParser(base_url, model)
+                    self._parsers[key] = parser
+        return parser
+
+    def get_generator(self) -> YAMLGenerator:
+        """获取共享的YAML生成器"""
+        self._check_config_version()
+        if self._generator is None:
+            with self._lock:
+                if self._generator is None:
+                    self._generator = YAMLGenerator()
+        return self._generator
+
+    def clear(self):
+        """丢弃全部实例，下次获取时按最新配置重建
+
+        旧实例可能仍被进行中的请求使用，不主动关闭其客户端，由垃圾回收释放。
+        """
+        with self._lock:
+            self._parsers = {}
+            self._generator = None
+
+
+_registry = InstanceRegistry()
+
+
+def get_registry() -> InstanceRegistry:
+    """获取进程级注册表"""
+    return _registry
+
+
+def get_parser(model: str = None, base_url: str = None) -> NaturalLanguageParser:
+    """获取共享的解析器"""
+    return _registry.get_parser(model, base_url)
+
+
+def get_generator() -> YAMLGenerator:
+    """获取共享的YAML生成器"""
+    return _registry.get_generator()
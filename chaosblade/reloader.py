@@ -0,0 +1,103 @@
+import os
+import glob
+import logging
+import threading
+from typing import Dict, Optional
+
+from .spec_index import DEFAULT_SPEC_DIR, SPEC_FILE_PATTERN, reload_spec_index
+from .settings import get_config_path, get_setting, reload_config
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RELOAD_INTERVAL = 5.0
+
+
+def _snapshot(paths) -> Dict[str, float]:
+    """路径 -> mtime，文件不存在时忽略"""
+    snapshot = {}
+    for path in paths:
+        try:
+            snapshot[path] = os.stat(path).st_mtime
+        except OSError:
+            pass
+    return snapshot
+
+
+class Reloader:
+    """轮询规格文件和config.py的修改时间，变化时在后台重新加载
+
+    规格索引整体重建后原子替换；配置在独立模块中执行成功后才替换，
+    出错时保留旧版本并记录日志。依赖它们的缓存按版本号失效。
+    """
+
+    def __init__(self, interval: float = DEFAULT_RELOAD_INTERVAL, spec_dir: str = None):
+        self.interval = interval
+        self.spec_dir = spec_dir or DEFAULT_SPEC_DIR
+        self._spec_snapshot = self._snapshot_specs()
+        self._config_snapshot = self._snapshot_config()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _snapshot_specs(self) -> Dict[str, float]:
+        return _snapshot(glob.glob(os.path.join(self.spec_dir, SPEC_FILE_PATTERN)))
+
+    def _snapshot_config(self) -> Dict[str, float]:
+        return _snapshot([get_config_path()])
+
+    def check(self) -> Dict[str, bool]:
+        """检查一次，返回各部分是否重新加载"""
+        reloaded = {"specs": False, "config": False}
+
+        # 无论成功与否都记录快照，避免对同一个错误版本反复重试
+        specs = self._snapshot_specs()
+        if specs != self._spec_snapshot:
+            self._spec_snapshot = specs
+            try:
+                reload_spec_index()
+                reloaded["specs"] = True
+            except Exception as e:
+                logger.error(f"规格文件重新加载失败，继续使用旧版本: {e}")
+
+        config = self._snapshot_config()
+        if config != self._config_snapshot:
+            self._config_snapshot = config
+            try:
+                reload_config()
+                reloaded["config"] = True
+                logger.info("配置已重新加载")
+            except Exception as e:
+                logger.error(f"配置重新加载失败，继续使用旧配置: {e}")
+
+        return reloaded
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.check()
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="chaosblade-reloader", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+
+_reloader: Optional[Reloader] = None
+_reloader_lock = threading.Lock()
+
+
+def start_reloader() -> Optional[Reloader]:
+    """启动进程级热更新线程，HOT_RELOAD_INTERVAL 为0时不启动"""
+    global _reloader
+    interval = get_setting("HOT_RELOAD_INTERVAL", DEFAULT_RELOAD_INTERVAL)
+    if not interval:
+        return None
+    with _reloader_lock:
+        if _reloader is None:
+            _reloader = Reloader(interval)
+            _reloader.start()
+            logger.info(f"热更新已启动，检查间隔 {interval} 秒")
+    return _reloader
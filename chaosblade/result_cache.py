@@ -0,0 +1,90 @@
+import os
+import copy
+import time
+import logging
+import threading
+from dataclasses import asdict
+from typing import Optional
+
+from .cache import LRUCache, SQLiteCache, TwoLevelCache, make_cache_key
+from .models import ParsedResult
+from .llm import normalize_instruction
+from .settings import get_setting
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RESULT_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".cache", "chaosblade-mcp", "results.sqlite3")
+DEFAULT_RESULT_CACHE_SIZE = 1024
+DEFAULT_RESULT_CACHE_MAX_ENTRIES = 50000
+# 解析结果只取决于指令和键中的版本，TTL仅用于逐步淘汰长期不用的条目
+DEFAULT_RESULT_CACHE_TTL = 7 * 24 * 3600
+
+# 缓存条目结构版本，修改存储内容时递增
+RESULT_SCHEMA_VERSION = 2
+
+
+class GenerationCache:
+    """持久化的解析结果缓存
+
+    键为 (指令, 模型, 解析模式, 规格版本, 解析器版本, 生成器版本) 的哈希，值为解析结果（含警告）；
+    进程重启后从SQLite读取，部署后的冷启动也能命中。不缓存生成的YAML，
+    因为其中的实验名称带时间戳，每次生成都必须唯一。
+    """
+
+    def __init__(self, cache: TwoLevelCache, ttl: float = None):
+        self.cache = cache
+        self.ttl = ttl
+
+    @staticmethod
+    def make_key(instruction: str, model: str, mode: str, spec_version: str, parser_version: str,
+                 generator_version: str) -> str:
+        return make_cache_key("generation", normalize_instruction(instruction), model, mode,
+                              spec_version, parser_version, generator_version)
+
+    def get(self, key: str) -> Optional[ParsedResult]:
+        """返回解析结果，未命中返回None"""
+        entry = self.cache.get(key)
+        if entry is None:
+            return None
+        if self.ttl and time.time() - entry.get("created_at", 0) > self.ttl:
+            return None
+        try:
+            # 内存缓存中的条目被多个请求共享，返回副本
+            return ParsedResult(**copy.deepcopy(entry["parsed"]))
+        except (KeyError, TypeError) as e:
+            logger.warning(f"生成结果缓存条目无效: {e}")
+            return None
+
+    def set(self, key: str, parsed: ParsedResult):
+        """写入缓存，大模型失败时的回退结果不缓存"""
+        if parsed.fallback:
+            return
+        self.cache.set(key, {
+            "parsed": asdict(parsed),
+            "created_at": time.time()
+        })
+
+
+_generation_cache: Optional[GenerationCache] = None
+_generation_cache_lock = threading.Lock()
+
+
+def get_generation_cache() -> GenerationCache:
+    """获取进程级共享的生成结果缓存（内存LRU + 磁盘SQLite）"""
+    global _generation_cache
+    if _generation_cache is None:
+        with _generation_cache_lock:
+            if _generation_cache is None:
+                path = get_setting("RESULT_CACHE_PATH", DEFAULT_RESULT_CACHE_PATH)
+                disk = SQLiteCache(
+                    os.path.expanduser(path),
+                    table="generation_results",
+                    max_entries=get_setting("RESULT_CACHE_MAX_ENTRIES", DEFAULT_RESULT_CACHE_MAX_ENTRIES),
+                    schema_version=RESULT_SCHEMA_VERSION
+                ) if path else None
+                _generation_cache = GenerationCache(
+                    TwoLevelCache(LRUCache(get_setting("RESULT_CACHE_SIZE", DEFAULT_RESULT_CACHE_SIZE)), disk),
+                    ttl=get_setting("RESULT_CACHE_TTL", DEFAULT_RESULT_CACHE_TTL)
+                )
+    return _generation_cache
@@ -0,0 +1,311 @@
+import time
+import asyncio
+import logging
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional
+
+from .settings import config, get_setting, get_config_version
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_EWMA_ALPHA = 0.3
+# 错误率EWMA超过该值的模型视为不健康
+DEFAULT_ERROR_THRESHOLD = 0.5
+# 样本不足时的对冲延迟（秒）
+DEFAULT_HEDGE_DELAY = 2.0
+HEDGE_MIN_SAMPLES = 5
+LATENCY_WINDOW = 100
+
+
+class ModelStats:
+    """单个模型的延迟/错误率统计"""
+
+    def __init__(self, alpha: float = DEFAULT_EWMA_ALPHA):
+        self.alpha = alpha
+        self.latency: Optional[float] = None
+        self.error_rate = 0.0
+        self.requests = 0
+        self.failures = 0
+        self.in_flight = 0
+        self.samples = deque(maxlen=LATENCY_WINDOW)
+
+    def record(self, latency: float, ok: bool):
+        self.requests += 1
+        self.in_flight = max(0, self.in_flight - 1)
+        self.error_rate += self.alpha * ((0.0 if ok else 1.0) - self.error_rate)
+        if ok:
+            self.latency = latency if self.latency is None else self.latency + self.alpha * (latency - self.latency)
+            self.samples.append(latency)
+        else:
+            self.failures += 1
+
+    def p95(self) -> Optional[float]:
+        if len(self.samples) < HEDGE_MIN_SAMPLES:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "latency_ewma": round(self.latency, 4) if self.latency is not None else None,
+            "latency_p95": self.p95(),
+            "error_rate": round(self.error_rate, 4),
+            "requests": self.requests,
+            "failures": self.failures,
+            "in_flight": self.in_flight
+        }
+
+
+class ModelRouter:
+    """按延迟和错误率在多个模型之间路由大模型请求
+
+    每个模型维护延迟和错误率的EWMA，请求发往最快的健康模型；
+    开启对冲时，主请求超过其p95延迟仍未返回，就向次优模型再发一次，
+    取先返回的有效结果。
+    """
+
+    def __init__(self, models: List[str], alpha: float = DEFAULT_EWMA_ALPHA,
+                 error_threshold: float = DEFAULT_ERROR_THRESHOLD, hedging: bool = False,
+                 hedge_delay: float = DEFAULT_HEDGE_DELAY):
+        self.models = list(models)
+        self.error_threshold = error_threshold
+        self.hedging = hedging
+        self.hedge_delay = hedge_delay
+        self._stats = {model: ModelStats(alpha) for model in self.models}
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def record(self, model: str, latency: float, ok: bool):
+        """记录一次请求结果"""
+        with self._lock:
+            self._stats.setdefault(model, ModelStats()).record(latency, ok)
+
+    def rank(self, exclude: Callable[[str], bool] = None) -> List[str]:
+        """按健康状况和延迟排序；没有样本且空闲的模型排在前面以便探测"""
+        with self._lock:
+            def key(model: str):
+                stats = self._stats[model]
+                unhealthy = stats.error_rate >= self.error_threshold
+                latency = stats.latency
+                if latency is None:
+                    # 首个请求尚未返回时按对冲延迟估计，避免请求全部压到未知模型上
+                    latency = self.hedge_delay if stats.in_flight else 0.0
+                return (unhealthy, latency, stats.error_rate)
+            ranked = sorted(self.models, key=key)
+        if exclude is not None:
+            ranked = [model for model in ranked if not exclude(model)]
+        return ranked
+
+    def get_hedge_delay(self, model: str) -> float:
+        with self._lock:
+            p95 = self._stats[model].p95()
+        return p95 if p95 is not None else self.hedge_delay
+
+    def _timed_call(self, model: str, call: Callable[[str], Any]) -> Any:
+        with self._lock:
+            self._stats.setdefault(model, ModelStats()).in_flight += 1
+        start = time.perf_counter()
+        try:
+            result = call(model)
+        except Exception:
+            self.record(model, time.perf_counter() - start, False)
+            raise
+        self.record(model, time.perf_counter() - start, True)
+        return result
+
+    async def _atimed_call(self, model: str, call: Callable[[str], Awaitable[Any]]) -> Any:
+        with self._lock:
+            self._stats.setdefault(model, ModelStats()).in_flight += 1
+        start = time.perf_counter()
+        try:
+            result = await call(model)
+        except asyncio.CancelledError:
+            # 对冲请求中落后的一方被取消，不计入统计
+            with self._lock:
+                self._stats[model].in_flight = max(0, self._stats[model].in_flight - 1)
+            raise
+        except Exception:
+            self.record(model, time.perf_counter() - start, False)
+            raise
+        self.record(model, time.perf_counter() - start, True)
+        return result
+
+    def request(self, call: Callable[[str], Any], exclude: Callable[[str], bool] = None) -> Any:
+        """把请求发往最优模型，call(model) 抛出异常表示结果无效
+
+        Args:
+            call: 以模型名为参数执行请求的函数
+            exclude: 需要跳过的模型（如熔断中的模型）
+        """
+        ranked = self.rank(exclude)
+        if not ranked:
+            raise RuntimeError("没有可用的大模型")
+
+        if not self.hedging or len(ranked) < 2:
+            return self._request_in_order(call, ranked)
+        return self._request_hedged(call, ranked)
+
+    async def arequest(self, call: Callable[[str], Awaitable[Any]], exclude: Callable[[str], bool] = None) -> Any:
+        """request 的异步版本，call(model) 返回协程；对冲时取消落后的请求"""
+        ranked = self.rank(exclude)
+        if not ranked:
+            raise RuntimeError("没有可用的大模型")
+
+        if not self.hedging or len(ranked) < 2:
+            error = None
+            for model in ranked:
+                try:
+                    return await self._atimed_call(model, call)
+                except Exception as e:
+                    logger.warning(f"模型 {model} 请求失败: {e}")
+                    error = e
+            raise error
+
+        primary, backup = ranked[0], ranked[1]
+        pending = {asyncio.ensure_future(self._atimed_call(primary, call)): primary}
+        hedged = False
+        error = None
+        try:
+            done, _ = await asyncio.wait(pending, timeout=self.get_hedge_delay(primary))
+            if not done:
+                logger.info(f"模型 {primary} 超过对冲延迟未返回，向 {backup} 发送对冲请求")
+                pending[asyncio.ensure_future(self._atimed_call(backup, call))] = backup
+                hedged = True
+
+            while pending:
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    model = pending.pop(task)
+                    try:
+                        return task.result()
+                    except Exception as e:
+                        logger.warning(f"模型 {model} 请求失败: {e}")
+                        error = e
+                if not hedged:
+                    pending[asyncio.ensure_future(self._atimed_call(backup, call))] = backup
+                    hedged = True
+        finally:
+            for task in pending:
+                task.cancel()
+        raise error
+
+    def stream(self, call: Callable[[str], Iterator[Any]], exclude: Callable[[str], bool] = None) -> Iterator[Any]:
+        """流式请求: 依次产出最优模型的 call(model) 的内容，返回其返回值
+
+        模型在产出任何内容之前失败时改用下一个模型；已产出内容后失败则直接抛出。
+        流式请求不做对冲。
+        """
+        ranked = self.rank(exclude)
+        if not ranked:
+            raise RuntimeError("没有可用的大模型")
+
+        error = None
+        for model in ranked:
+            with self._lock:
+                self._stats.setdefault(model, ModelStats()).in_flight += 1
+            start = time.perf_counter()
+            produced = False
+            iterator = None
+            try:
+                iterator = call(model)
+                while True:
+                    try:
+                        item = next(iterator)
+                    except StopIteration as stop:
+                        result = stop.value
+                        break
+                    produced = True
+                    yield item
+            except GeneratorExit:
+                # 调用方提前结束迭代，不计入统计
+                if iterator is not None:
+                    iterator.close()
+                with self._lock:
+                    self._stats[model].in_flight = max(0, self._stats[model].in_flight - 1)
+                raise
+            except Exception as e:
+                self.record(model, time.perf_counter() - start, False)
+                if produced:
+                    raise
+                logger.warning(f"模型 {model} 请求失败: {e}")
+                error = e
+                continue
+            self.record(model, time.perf_counter() - start, True)
+            return result
+        raise error
+
+    def _request_in_order(self, call: Callable[[str], Any], ranked: List[str]) -> Any:
+        """依次尝试，直到有模型返回有效结果"""
+        error = None
+        for model in ranked:
+            try:
+                return self._timed_call(model, call)
+            except Exception as e:
+                logger.warning(f"模型 {model} 请求失败: {e}")
+                error = e
+        raise error
+
+    def _request_hedged(self, call: Callable[[str], Any], ranked: List[str]) -> Any:
+        """主请求超过p95延迟未返回时向次优模型发对冲请求"""
+        executor = self._get_executor()
+        primary, backup = ranked[0], ranked[1]
+        pending = {executor.submit(self._timed_call, primary, call): primary}
+        hedged = False
+        done, _ = wait(pending, timeout=self.get_hedge_delay(primary))
+        if not done:
+            logger.info(f"模型 {primary} 超过对冲延迟未返回，向 {backup} 发送对冲请求")
+            pending[executor.submit(self._timed_call, backup, call)] = backup
+            hedged = True
+
+        error = None
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                model = pending.pop(future)
+                try:
+                    return future.result()
+                except Exception as e:
+                    logger.warning(f"模型 {model} 请求失败: {e}")
+                    error = e
+            # 主请求在对冲之前就失败时，改用次优模型
+            if not hedged:
+                pending[executor.submit(self._timed_call, backup, call)] = backup
+                hedged = True
+        raise error
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(thread_name_prefix="llm-hedge")
+        return self._executor
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """各模型的统计"""
+        with self._lock:
+            return {model: stats.to_dict() for model, stats in self._stats.items()}
+
+
+_router: Optional[ModelRouter] = None
+_router_config_version: Optional[int] = None
+_router_lock = threading.Lock()
+
+
+def get_model_router() -> ModelRouter:
+    """获取进程级共享的模型路由器，候选模型取 LLM_ROUTING_MODELS 或全部 AVAILABLE_MODELS，配置更新后重建"""
+    global _router, _router_config_version
+    if _router is None or _router_config_version != get_config_version():
+        with _router_lock:
+            if _router is None or _router_config_version != get_config_version():
+                models = get_setting("LLM_ROUTING_MODELS", None) or list(getattr(config, "AVAILABLE_MODELS", {}))
+                _router = ModelRouter(
+                    models,
+                    alpha=get_setting("LLM_ROUTING_EWMA_ALPHA", DEFAULT_EWMA_ALPHA),
+                    hedging=get_setting("LLM_HEDGING", False),
+                    hedge_delay=get_setting("LLM_HEDGE_DELAY", DEFAULT_HEDGE_DELAY)
+                )
+                _router_config_version = get_config_version()
+    return _router
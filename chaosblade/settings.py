@@ -0,0 +1,46 @@
+import os
+import sys
+import threading
+import importlib.util
+from typing import Any
+
+# 添加父目录到路径以导入config
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import config
+
+
+_config_version = 0
+_config_lock = threading.Lock()
+
+
+def get_setting(name: str, default: Any = None) -> Any:
+    """读取config中的可选配置项，未配置时返回默认值"""
+    return getattr(config, name, default)
+
+
+def get_config_version() -> int:
+    """配置版本号，每次热更新后递增，依赖配置的缓存据此失效"""
+    return _config_version
+
+
+def get_config_path() -> str:
+    return config.__file__
+
+
+def reload_config():
+    """重新执行config.py，并用新配置项原地替换config模块的内容
+
+    新配置先在独立模块中执行，出错时抛出异常且保留旧配置。
+    """
+    global _config_version
+    spec = importlib.util.spec_from_file_location(config.__name__, config.__file__)
+    fresh = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(fresh)
+
+    values = {name: value for name, value in vars(fresh).items() if not name.startswith("__")}
+    with _config_lock:
+        stale = [name for name in vars(config) if not name.startswith("__") and name not in values]
+        config.__dict__.update(values)
+        for name in stale:
+            delattr(config, name)
+        _config_version += 1
@@ -0,0 +1,78 @@
+import logging
+import threading
+from typing import Any, Callable, Dict, Hashable
+
+
+logger = logging.getLogger(__name__)
+
+
+class _Call:
+    """一次进行中的计算"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: BaseException = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """合并相同键的并发调用
+
+    同一时刻相同键只执行一次计算，其余调用方等待并共享结果（包括异常）；
+    计算完成后不保留结果，下一次调用重新执行。
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+        self._stats = {"calls": 0, "executions": 0, "coalesced": 0}
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """执行或加入键为key的计算"""
+        with self._lock:
+            self._stats["calls"] += 1
+            call = self._calls.get(key)
+            if call is not None:
+                call.waiters += 1
+                self._stats["coalesced"] += 1
+                leader = False
+            else:
+                call = _Call()
+                self._calls[key] = call
+                self._stats["executions"] += 1
+                leader = True
+
+        if not leader:
+            call.done.wait()
+        else:
+            try:
+                call.result = fn()
+            except BaseException as e:
+                call.error = e
+            finally:
+                with self._lock:
+                    del self._calls[key]
+                call.done.set()
+            if call.waiters:
+                logger.debug(f"合并了 {call.waiters} 个相同请求")
+
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+    def get_stats(self) -> Dict[str, Any]:
+        """调用统计，coalescing_rate 为被合并调用占全部调用的比例"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["in_flight"] = len(self._calls)
+        stats["coalescing_rate"] = stats["coalesced"] / stats["calls"] if stats["calls"] else 0.0
+        return stats
+
+
+_generation_flight = SingleFlight()
+
+
+def get_generation_flight() -> SingleFlight:
+    """获取quick_generate和stream_generate共用的进程级SingleFlight"""
+    return _generation_flight
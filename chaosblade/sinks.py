@@ -0,0 +1,104 @@
+import json
+import logging
+from abc import ABC, abstractmethod
+from typing import Any, Dict, IO, Optional
+
+from .models import GenerationResult
+
+
+logger = logging.getLogger(__name__)
+
+
+class ResultSink(ABC):
+    """批量生成结果的增量输出
+
+    每条结果生成后立即写入并刷新，调用方不需要在内存中保留已完成的结果。
+    """
+
+    def __init__(self, path: str = None, stream: IO[str] = None):
+        if (path is None) == (stream is None):
+            raise ValueError("path 和 stream 必须且只能指定一个")
+        self.path = path
+        self._stream = stream
+        self._owns_stream = stream is None
+        self.written = 0
+        self.failed = 0
+
+    def open(self) -> "ResultSink":
+        if self._stream is None:
+            self._stream = open(self.path, "w", encoding="utf-8")
+        return self
+
+    def close(self):
+        if self._stream is not None and self._owns_stream:
+            self._stream.close()
+            self._stream = None
+
+    def __enter__(self) -> "ResultSink":
+        return self.open()
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def write(self, index: int, instruction: str, result: GenerationResult):
+        """写入一条结果"""
+        if self._stream is None:
+            self.open()
+        self._stream.write(self.format(index, instruction, result))
+        self._stream.flush()
+        self.written += 1
+        if not result.success:
+            self.failed += 1
+
+    @abstractmethod
+    def format(self, index: int, instruction: str, result: GenerationResult) -> str:
+        """把一条结果格式化为写入的文本"""
+
+    def get_summary(self) -> Dict[str, Any]:
+        return {"total": self.written, "succeeded": self.written - self.failed, "failed": self.failed}
+
+
+class YAMLStreamSink(ResultSink):
+    """多文档YAML输出，每个成功结果一个文档，失败的指令以注释记录"""
+
+    def format(self, index: int, instruction: str, result: GenerationResult) -> str:
+        header = f"---\n# [{index}] {_single_line(instruction)}\n"
+        if not result.success:
+            return f"{header}# 生成失败: {_single_line(result.error_message or '')}\n"
+        content = result.yaml_content
+        return header + content + ("" if content.endswith("\n") else "\n")
+
+
+class NDJSONSink(ResultSink):
+    """NDJSON输出，每行一个JSON对象，index为指令在输入中的位置"""
+
+    def format(self, index: int, instruction: str, result: GenerationResult) -> str:
+        return format_ndjson(index, instruction, result)
+
+
+def format_ndjson(index: int, instruction: str, result: GenerationResult) -> str:
+    """把一条生成结果格式化为NDJSON行"""
+    return json.dumps({
+        "index": index,
+        "instruction": instruction,
+        "success": result.success,
+        "yaml_content": result.yaml_content,
+        "error_message": result.error_message,
+        "warnings": result.warnings,
+        "generated_files": result.generated_files
+    }, ensure_ascii=False) + "\n"
+
+
+def _single_line(text: str) -> str:
+    return " ".join(text.split())
+
+
+def open_sink(path: str, format: Optional[str] = None) -> ResultSink:
+    """按格式（或文件扩展名）创建输出，.ndjson/.jsonl 为NDJSON，其余为多文档YAML"""
+    if format is None:
+        format = "ndjson" if path.endswith((".ndjson", ".jsonl")) else "yaml"
+    if format == "ndjson":
+        return NDJSONSink(path)
+    if format == "yaml":
+        return YAMLStreamSink(path)
+    raise ValueError(f"不支持的输出格式: {format}")
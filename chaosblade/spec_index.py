@@ -0,0 +1,296 @@
+import os
+import json
+import glob
+import hashlib
+import logging
+import threading
+from dataclasses import dataclass, field
+from typing import Dict, List, Any, Optional, Tuple
+
+import yaml
+
+try:
+    from yaml import CSafeLoader as _SpecLoader
+except ImportError:  # 未编译libyaml时回退到纯Python实现
+    from yaml import SafeLoader as _SpecLoader
+
+
+logger = logging.getLogger(__name__)
+
+# 规格文件默认目录: 项目根目录下的 yaml/
+DEFAULT_SPEC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "yaml")
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "chaosblade-mcp")
+SPEC_FILE_PATTERN = "chaosblade-*-spec*.yaml"
+
+# 缓存格式版本，修改编译结果结构时需要递增
+INDEX_FORMAT_VERSION = 1
+
+
+@dataclass
+class FlagSpec:
+    """规格中的matcher/flag定义"""
+    name: str
+    desc: str = ""
+    no_args: bool = False
+    required: bool = False
+    required_when_destroyed: bool = False
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "desc": self.desc,
+            "no_args": self.no_args,
+            "required": self.required,
+            "required_when_destroyed": self.required_when_destroyed
+        }
+
+
+@dataclass
+class ActionSpec:
+    """(scope, target, action) 对应的实验规格"""
+    scope: str
+    target: str
+    action: str
+    short_desc: str = ""
+    aliases: List[str] = field(default_factory=list)
+    matchers: Dict[str, FlagSpec] = field(default_factory=dict)
+    flags: Dict[str, FlagSpec] = field(default_factory=dict)
+    source: str = ""
+
+    def get_param(self, name: str) -> Optional[FlagSpec]:
+        """按名称查找matcher或flag"""
+        return self.matchers.get(name) or self.flags.get(name)
+
+    def get_required_params(self) -> List[str]:
+        """获取必需的matcher和flag名称"""
+        return [spec.name for spec in list(self.matchers.values()) + list(self.flags.values())
+                if spec.required]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "scope": self.scope,
+            "target": self.target,
+            "action": self.action,
+            "short_desc": self.short_desc,
+            "aliases": self.aliases,
+            "matchers": [spec.to_dict() for spec in self.matchers.values()],
+            "flags": [spec.to_dict() for spec in self.flags.values()],
+            "source": self.source
+        }
+
+    @staticmethod
+    def from_dict(data: Dict[str, Any]) -> "ActionSpec":
+        return ActionSpec(
+            scope=data["scope"],
+            target=data["target"],
+            action=data["action"],
+            short_desc=data.get("short_desc", ""),
+            aliases=data.get("aliases", []),
+            matchers={item["name"]: FlagSpec(**item) for item in data.get("matchers", [])},
+            flags={item["name"]: FlagSpec(**item) for item in data.get("flags", [])},
+            source=data.get("source", "")
+        )
+
+
+class SpecIndex:
+    """ChaosBlade规格索引
+
+    一次性加载 yaml/ 目录下所有 chaosblade-*-spec*.yaml，
+    编译为 (scope, target, action) -> ActionSpec 的字典，
+    并按文件内容哈希缓存到磁盘，后续启动跳过PyYAML解析。
+    """
+
+    def __init__(self, spec_dir: str = None, cache_dir: str = None, use_cache: bool = True):
+        self.spec_dir = spec_dir or DEFAULT_SPEC_DIR
+        self.cache_dir = cache_dir or DEFAULT_CACHE_DIR
+        self.use_cache = use_cache
+        self.version = ""
+        self.files: List[str] = []
+        self._actions: Dict[Tuple[str, str, str], ActionSpec] = {}
+        self._aliases: Dict[Tuple[str, str, str], str] = {}
+        self.load()
+
+    def load(self):
+        """加载规格文件，优先使用磁盘缓存"""
+        self.files = self._discover_files()
+        self.version = self._compute_version(self.files)
+
+        data = self._read_cache() if self.use_cache else None
+        if data is None:
+            data = self._compile(self.files)
+            if self.use_cache:
+                self._write_cache(data)
+
+        self._build(data)
+        logger.info(f"规格索引已加载: {len(self._actions)} 个实验, 版本 {self.version}")
+
+    def _discover_files(self) -> List[str]:
+        """查找规格文件"""
+        files = sorted(glob.glob(os.path.join(self.spec_dir, SPEC_FILE_PATTERN)))
+        if not files:
+            logger.warning(f"未找到规格文件: {self.spec_dir}")
+        return files
+
+    @staticmethod
+    def _compute_version(files: List[str]) -> str:
+        """根据文件名和内容计算版本哈希"""
+        digest = hashlib.sha256(f"format-{INDEX_FORMAT_VERSION}".encode())
+        for path in files:
+            digest.update(os.path.basename(path).encode())
+            with open(path, "rb") as f:
+                digest.update(hashlib.sha256(f.read()).digest())
+        return digest.hexdigest()[:16]
+
+    def _cache_path(self) -> str:
+        return os.path.join(self.cache_dir, f"spec-index-{self.version}.json")
+
+    def _read_cache(self) -> Optional[List[Dict[str, Any]]]:
+        """读取磁盘缓存"""
+        path = self._cache_path()
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                cached = json.load(f)
+            if cached.get("version") == self.version:
+                return cached["actions"]
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"规格缓存读取失败 ({path}): {e}")
+        return None
+
+    def _write_cache(self, data: List[Dict[str, Any]]):
+        """写入磁盘缓存（先写临时文件再原子替换）"""
+        path = self._cache_path()
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"version": self.version, "actions": data}, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"规格缓存写入失败 ({path}): {e}")
+
+    @staticmethod
+    def _compile(files: List[str]) -> List[Dict[str, Any]]:
+        """解析YAML并编译为精简结构"""
+        compiled = []
+        for path in files:
+            with open(path, "r", encoding="utf-8") as f:
+                document = yaml.load(f, Loader=_SpecLoader) or {}
+
+            for item in document.get("items") or []:
+                scope = item.get("scope", "host")
+                target = item.get("target")
+                for action in item.get("actions") or []:
+                    compiled.append(ActionSpec(
+                        scope=scope,
+                        target=target,
+                        action=action.get("action"),
+                        short_desc=action.get("shortDesc", ""),
+                        aliases=list(action.get("aliases") or []),
+                        matchers=SpecIndex._compile_flags(action.get("matchers")),
+                        flags=SpecIndex._compile_flags(action.get("flags")),
+                        source=os.path.basename(path)
+                    ).to_dict())
+        return compiled
+
+    @staticmethod
+    def _compile_flags(items: Optional[List[Dict[str, Any]]]) -> Dict[str, FlagSpec]:
+        flags = {}
+        for item in items or []:
+            flags[item["name"]] = FlagSpec(
+                name=item["name"],
+                desc=item.get("desc", ""),
+                no_args=bool(item.get("noArgs", False)),
+                required=bool(item.get("required", False)),
+                required_when_destroyed=bool(item.get("requiredWhenDestroyed", False))
+            )
+        return flags
+
+    def _build(self, data: List[Dict[str, Any]]):
+        """构建查找表，文件按名称排序，同名实验以后加载的版本为准"""
+        actions = {}
+        aliases = {}
+        for item in data:
+            spec = ActionSpec.from_dict(item)
+            actions[(spec.scope, spec.target, spec.action)] = spec
+            for alias in spec.aliases:
+                aliases[(spec.scope, spec.target, alias)] = spec.action
+        self._actions = actions
+        self._aliases = aliases
+
+    def get(self, scope: str, target: str, action: str) -> Optional[ActionSpec]:
+        """O(1) 查找实验规格，支持动作别名"""
+        spec = self._actions.get((scope, target, action))
+        if spec is None:
+            canonical = self._aliases.get((scope, target, action))
+            if canonical:
+                spec = self._actions.get((scope, target, canonical))
+        return spec
+
+    def get_matchers(self, scope: str, target: str, action: str) -> Dict[str, FlagSpec]:
+        """获取实验的matchers"""
+        spec = self.get(scope, target, action)
+        return spec.matchers if spec else {}
+
+    def get_flags(self, scope: str, target: str, action: str) -> Dict[str, FlagSpec]:
+        """获取实验的flags"""
+        spec = self.get(scope, target, action)
+        return spec.flags if spec else {}
+
+    def get_scopes(self) -> List[str]:
+        """获取规格中出现的所有作用域"""
+        return sorted({key[0] for key in self._actions})
+
+    def get_targets(self, scope: str = None) -> List[str]:
+        """获取目标列表"""
+        return sorted({key[1] for key in self._actions if scope is None or key[0] == scope})
+
+    def get_actions(self, scope: str, target: str) -> List[str]:
+        """获取指定作用域和目标下的动作列表"""
+        return sorted(key[2] for key in self._actions if key[0] == scope and key[1] == target)
+
+    def __contains__(self, key: Tuple[str, str, str]) -> bool:
+        return self.get(*key) is not None
+
+    def __len__(self) -> int:
+        return len(self._actions)
+
+    def __iter__(self):
+        return iter(self._actions.values())
+
+
+_index: Optional[SpecIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_spec_index() -> SpecIndex:
+    """获取进程级共享的规格索引"""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = SpecIndex()
+    return _index
+
+
+def set_spec_index(index: SpecIndex):
+    """安装已构建的规格索引（如子进程启动时使用父进程传入的索引，避免重新加载）"""
+    global _index
+    with _index_lock:
+        _index = index
+
+
+def reload_spec_index() -> SpecIndex:
+    """重新加载规格文件，版本变化时原子替换共享索引
+
+    新索引在锁外构建，构建期间请求继续使用旧索引；
+    依赖规格的缓存（匹配器、提示词、校验规则、LLM缓存）按版本号失效。
+    """
+    global _index
+    index = SpecIndex()
+    with _index_lock:
+        if _index is None or _index.version != index.version:
+            logger.info(f"规格索引已更新: {_index.version if _index else '-'} -> {index.version}")
+            _index = index
+        return _index
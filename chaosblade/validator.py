@@ -2,47 +2,150 @@ import re
 import socket
 import subprocess
 import logging
-from typing import Dict, List, Any, Optional, Tuple
+import threading
+from dataclasses import dataclass, field
+from typing import Dict, List, Any, Optional, Tuple, Callable
 
+from .cache import LRUCache
 from .models import ValidationResult, ParsedResult, ScopeConfig, ValidationConfig
+from .spec_index import ActionSpec, FlagSpec, get_spec_index
+from .discovery import DiscoveryCache, get_discovery_cache
+from .inventory import ClusterInventory, load_inventory
+from .kubeconfig import read_current_namespace
 
 
 logger = logging.getLogger(__name__)
 
+# 解析器参数名 -> 规格参数名，生成前按实验规格改名
+SPEC_PARAMETER_ALIASES = {
+    "delay": "time"
+}
+
+# 需要对照集群清单检查资源名称的作用域
+INVENTORY_SCOPES = ("node", "pod", "container")
+# 规则表缓存上限: target/action 可能来自大模型输出，不能无限增长
+RULE_TABLE_CACHE_SIZE = 1024
+
+_BOOLEAN_VALUES = {"true", "false", "1", "0", ""}
+_TIMEOUT_UNIT_PATTERN = re.compile(r"^(\d+)([smh])$")
+
+# 参数检查函数: 返回错误信息，参数有效时返回None
+ParameterChecker = Callable[[Any], Optional[str]]
+
+
+@dataclass
+class CompiledRules:
+    """单个 (scope, target, action) 编译后的验证规则表"""
+    required: Tuple[str, ...] = ()
+    checkers: Dict[str, ParameterChecker] = field(default_factory=dict)
+
+
+def _make_no_args_checker(name: str) -> ParameterChecker:
+    """开关参数: 值只能是布尔值"""
+    def check(value: Any) -> Optional[str]:
+        if isinstance(value, bool) or str(value).lower() in _BOOLEAN_VALUES:
+            return None
+        return f"参数 {name} 为开关参数，值应为 true/false"
+    return check
+
+
+def _make_format_checker(name: str, rules: Dict[str, Any]) -> Optional[ParameterChecker]:
+    """格式参数: 使用预编译的正则或类型检查函数"""
+    pattern = rules.get("pattern")
+    is_valid = rules.get("checker") or (pattern.match if pattern else None)
+    if is_valid is None:
+        return None
+    message = rules.get("message") or f"参数 {name} 格式无效: {rules.get('description', '')}".rstrip(": ")
+
+    def check(value: Any) -> Optional[str]:
+        if value and not is_valid(value):
+            return message
+        return None
+    return check
+
+
+def _compile_param_checker(name: str, spec: Optional[FlagSpec]) -> Optional[ParameterChecker]:
+    """为单个参数编译检查函数"""
+    if spec is not None and spec.no_args:
+        return _make_no_args_checker(name)
+    return _make_format_checker(name, ValidationConfig.get_validation_rules(name))
+
+
+def compile_rules(scope: str, action_spec: Optional[ActionSpec]) -> CompiledRules:
+    """把作用域配置和规格元数据编译为规则表"""
+    required = list(ScopeConfig.get_scope_config(scope).get("required_matchers", []))
+    checkers: Dict[str, ParameterChecker] = {}
+    specs: Dict[str, FlagSpec] = {}
+
+    if action_spec is not None:
+        specs.update(action_spec.matchers)
+        specs.update(action_spec.flags)
+        for name in action_spec.get_required_params():
+            if name not in required:
+                required.append(name)
+
+    for name in set(specs) | set(ValidationConfig.PARAMETER_TYPES):
+        checker = _compile_param_checker(name, specs.get(name))
+        if checker:
+            checkers[name] = checker
+
+    return CompiledRules(required=tuple(required), checkers=checkers)
+
 
 class ParameterValidator:
     """参数验证器"""
     
+    # 进程内共享的规则表缓存: (规格版本, scope, target, action) -> CompiledRules，规格版本变化时清空
+    _rule_tables = LRUCache(RULE_TABLE_CACHE_SIZE)
+    _rule_tables_version: Optional[str] = None
+    _rule_lock = threading.Lock()
+    
     def __init__(self):
-        self.validation_rules = ValidationConfig()
+        self.validation_rules = ValidationConfig.get_instance()
+    
+    def get_rules(self, scope: str, target: str = None, action: str = None) -> CompiledRules:
+        """获取编译后的规则表，每个实验类型只编译一次"""
+        index = get_spec_index()
+        if ParameterValidator._rule_tables_version != index.version:
+            with self._rule_lock:
+                if ParameterValidator._rule_tables_version != index.version:
+                    self._rule_tables.clear()
+                    ParameterValidator._rule_tables_version = index.version
+        
+        key = (index.version, scope, target, action)
+        rules = self._rule_tables.get(key)
+        if rules is None:
+            action_spec = index.get(scope, target, action) if target and action else None
+            rules = compile_rules(scope, action_spec)
+            self._rule_tables.set(key, rules)
+        return rules
     
-    def validate_parameters(self, params: Dict[str, Any], scope: str) -> ValidationResult:
+    def validate_parameters(self, params: Dict[str, Any], scope: str,
+                            target: str = None, action: str = None) -> ValidationResult:
         """验证参数"""
         result = ValidationResult(is_valid=True)
+        rules = self.get_rules(scope, target, action)
         
-        # 获取作用域配置
-        scope_config = ScopeConfig.get_scope_config(scope)
-        required_matchers = scope_config.get("required_matchers", [])
+        # 单次遍历参数: 执行格式检查并记录已提供的规格参数
+        provided = set()
+        invalid_params = []
+        checkers = rules.checkers
+        for param_name, param_value in params.items():
+            provided.add(param_name)
+            checker = checkers.get(param_name)
+            if checker is not None:
+                message = checker(param_value)
+                if message:
+                    invalid_params.append(param_name)
+                    result.errors.append(message)
         
         # 检查必需参数
-        missing_required = []
-        for param in required_matchers:
-            if param not in params:
-                missing_required.append(param)
-        
+        missing_required = [param for param in rules.required if param not in provided]
         if missing_required:
             result.missing_required = missing_required
-            result.errors.append(f"缺少必需参数: {', '.join(missing_required)}")
+            result.errors.insert(0, f"缺少必需参数: {', '.join(missing_required)}")
             result.is_valid = False
         
-        # 检查参数格式
-        invalid_params = []
-        for param_name, param_value in params.items():
-            validation_result = self._validate_single_parameter(param_name, param_value)
-            if not validation_result["is_valid"]:
-                invalid_params.append(param_name)
-                result.errors.append(validation_result["message"])
-        
         if invalid_params:
             result.invalid_parameters = invalid_params
             result.is_valid = False
@@ -73,13 +176,10 @@ class ParameterValidator:
             }
         
         # 检查格式
-        pattern = rules.get("pattern")
-        if pattern and param_value:
-            if not re.match(pattern, str(param_value)):
-                return {
-                    "is_valid": False,
-                    "message": rules.get("message", f"参数 {param_name} 格式无效")
-                }
+        checker = _make_format_checker(param_name, rules)
+        message = checker(param_value) if checker else None
+        if message:
+            return {"is_valid": False, "message": message}
         
         return {"is_valid": True}
     
@@ -95,7 +195,7 @@ class ParameterValidator:
         # 检查超时时间合理性
         if "timeout" in params:
             timeout_str = str(params["timeout"])
-            timeout_match = re.match(r"^(\d+)([smh])$", timeout_str)
+            timeout_match = _TIMEOUT_UNIT_PATTERN.match(timeout_str)
             if timeout_match:
                 timeout_value = int(timeout_match.group(1))
                 timeout_unit = timeout_match.group(2)
@@ -125,8 +225,9 @@ class ParameterValidator:
 class SmartParameterOptimizer:
     """智能参数优化器"""
     
-    def __init__(self):
+    def __init__(self, discovery_cache: DiscoveryCache = None):
         self.validator = ParameterValidator()
+        self.discovery = discovery_cache or get_discovery_cache()
     
     def apply_smart_defaults(self, params: Dict[str, Any], scope: str) -> Dict[str, Any]:
         """应用智能默认值"""
@@ -181,20 +282,15 @@ class SmartParameterOptimizer:
         
         return detected_params
     
+    def _get_inventory(self) -> Optional[ClusterInventory]:
+        """获取集群清单（结果缓存，过期后后台刷新）"""
+        return self.discovery.get("inventory", load_inventory)
+    
     def _detect_current_node(self) -> Optional[str]:
         """检测当前节点"""
-        try:
-            # 尝试使用kubectl获取节点信息
-            result = subprocess.run(
-                ["kubectl", "get", "nodes", "-o", "jsonpath={.items[0].metadata.name}"],
-                capture_output=True,
-                text=True,
-                timeout=5
-            )
-            if result.returncode == 0 and result.stdout.strip():
-                return result.stdout.strip()
-        except (subprocess.TimeoutExpired, FileNotFoundError):
-            pass
+        inventory = self._get_inventory()
+        if inventory and inventory.node_names:
+            return inventory.node_names[0]
         
         # 回退到本地主机名
         try:
@@ -203,7 +299,14 @@ class SmartParameterOptimizer:
             return "localhost"
     
     def _detect_current_namespace(self) -> Optional[str]:
-        """检测当前命名空间"""
+        """检测当前命名空间，优先直接读取kubeconfig"""
+        namespace = read_current_namespace()
+        if namespace is not None:
+            return namespace
+        return self.discovery.get("current-namespace", self._probe_current_namespace)
+    
+    def _probe_current_namespace(self) -> Optional[str]:
+        """通过kubectl检测当前命名空间"""
         try:
             # 尝试获取当前命名空间
             result = subprocess.run(
@@ -221,22 +324,65 @@ class SmartParameterOptimizer:
         return "default"
     
     def _detect_container_names(self) -> Optional[List[str]]:
-        """检测容器名称"""
-        try:
-            # 尝试获取当前pod的容器信息
-            result = subprocess.run(
-                ["kubectl", "get", "pods", "-o", "jsonpath={.items[0].spec.containers[*].name}"],
-                capture_output=True,
-                text=True,
-                timeout=5
-            )
-            if result.returncode == 0 and result.stdout.strip():
-                return result.stdout.strip().split()
-        except (subprocess.TimeoutExpired, FileNotFoundError):
-            pass
+        """检测容器名称（当前命名空间第一个Pod的容器）"""
+        inventory = self._get_inventory()
+        if inventory:
+            namespace = self._detect_current_namespace()
+            pods = inventory.get_pods(namespace)
+            if pods:
+                return inventory.get_containers(pods[0], namespace) or None
         
         return None
     
+    def validate_resource_names(self, params: Dict[str, Any], scope: str) -> List[str]:
+        """对照集群清单检查资源名称，清单不可用时跳过"""
+        # 只有k8s作用域需要清单，其余作用域不调用kubectl
+        if scope not in INVENTORY_SCOPES:
+            return []
+        
+        inventory = self._get_inventory()
+        if inventory is None:
+            return []
+        
+        warnings = []
+        names = self._as_list(params.get("names"))
+        namespaces = self._as_list(params.get("namespace")) or [self._detect_current_namespace()]
+        
+        # 清单只包含部分资源（权限不足）时，只检查已列出的部分
+        if scope == "node":
+            if not inventory.nodes_listed:
+                return []
+            for name in names:
+                if not inventory.has_node(name):
+                    warnings.append(f"节点 {name} 不在集群中")
+            return warnings
+        
+        if not all(inventory.covers_namespace(namespace) for namespace in namespaces):
+            return []
+        
+        if scope == "pod":
+            for name in names:
+                if not any(inventory.has_pod(name, namespace) for namespace in namespaces):
+                    warnings.append(f"Pod {name} 不在命名空间 {', '.join(namespaces)} 中")
+        
+        elif scope == "container":
+            known = set()
+            for namespace in namespaces:
+                known |= inventory.get_namespace_containers(namespace)
+            for name in self._as_list(params.get("container-names")):
+                if name not in known:
+                    warnings.append(f"容器 {name} 不在命名空间 {', '.join(namespaces)} 中")
+        
+        return warnings
+    
+    @staticmethod
+    def _as_list(value: Any) -> List[str]:
+        if value is None:
+            return []
+        if isinstance(value, (list, tuple)):
+            return [str(item) for item in value]
+        return [item.strip() for item in str(value).split(",") if item.strip()]
+    
     def _detect_hostname(self) -> Optional[str]:
         """检测主机名"""
         try:
@@ -244,16 +390,21 @@ class SmartParameterOptimizer:
         except:
             return None
     
-    def optimize_parameters(self, params: Dict[str, Any], scope: str) -> Tuple[Dict[str, Any], List[str]]:
+    def optimize_parameters(self, params: Dict[str, Any], scope: str,
+                            target: str = None, action: str = None) -> Tuple[Dict[str, Any], List[str]]:
         """优化参数"""
         warnings = []
         
         # 应用智能默认值
         optimized_params = self.apply_smart_defaults(params, scope)
         
+        # 解析器参数名改为规格参数名（如 delay -> time）
+        optimized_params = self.apply_spec_aliases(optimized_params, scope, target, action)
+        
         # 验证参数
-        validation_result = self.validator.validate_parameters(optimized_params, scope)
+        validation_result = self.validator.validate_parameters(optimized_params, scope, target, action)
         warnings.extend(validation_result.warnings)
+        warnings.extend(self.validate_resource_names(optimized_params, scope))
         
         # 自动修复参数
         if not validation_result.is_valid:
@@ -261,9 +412,32 @@ class SmartParameterOptimizer:
             if fixed_params:
                 optimized_params.update(fixed_params)
                 warnings.append("已自动修复部分参数问题")
+            
+            # 无法自动修复的必需参数提示给用户
+            unresolved = [param for param in validation_result.missing_required
+                          if param not in fixed_params]
+            if unresolved:
+                warnings.append(f"缺少必需参数: {', '.join(unresolved)}")
         
         return optimized_params, warnings
     
+    @staticmethod
+    def apply_spec_aliases(params: Dict[str, Any], scope: str, target: str = None,
+                           action: str = None) -> Dict[str, Any]:
+        """规格中只定义了规格参数名时，把解析器的参数名改为规格参数名"""
+        action_spec = get_spec_index().get(scope, target, action) if target and action else None
+        if action_spec is None:
+            return params
+        
+        renamed = {}
+        for param_name, param_value in params.items():
+            spec_name = SPEC_PARAMETER_ALIASES.get(param_name)
+            if (spec_name and spec_name not in params and action_spec.get_param(param_name) is None
+                    and action_spec.get_param(spec_name) is not None):
+                param_name = spec_name
+            renamed[param_name] = param_value
+        return renamed
+    
     def _auto_fix_parameters(self, params: Dict[str, Any], scope: str, 
                             validation_result: ValidationResult) -> Dict[str, Any]:
         """自动修复参数"""
@@ -81,7 +81,8 @@ class ChaosBladeApp {
                 requestBody.model = this.selectedModel;
             }
 
-            const response = await fetch('/api/generate', {
+            // 流式生成: 边接收事件边渲染
+            const response = await fetch('/api/generate/stream', {
                 method: 'POST',
                 headers: {
                     'Content-Type': 'application/json',
@@ -89,17 +90,13 @@ class ChaosBladeApp {
                 body: JSON.stringify(requestBody)
             });
 
-            const result = await response.json();
-
-            if (result.success) {
-                this.currentYAML = result.yaml_content;
-                this.currentFilename = result.filename;
-                this.showResult(result.yaml_content);
-                this.showSuccess('YAML 生成成功！');
-                this.loadFiles(); // 刷新文件列表
-            } else {
-                this.showError(result.error);
+            if (!response.ok || !response.body) {
+                const result = await response.json();
+                this.showError(result.error || '生成失败');
+                return;
             }
+
+            await this.readEventStream(response, (event, data) => this.handleStreamEvent(event, data));
         } catch (error) {
             this.showError('网络错误: ' + error.message);
         } finally {
@@ -107,6 +104,80 @@ class ChaosBladeApp {
         }
     }
 
+    async readEventStream(response, onEvent) {
+        // 解析 text/event-stream: 事件之间以空行分隔
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder('utf-8');
+        let buffer = '';
+
+        while (true) {
+            const { done, value } = await reader.read();
+            if (done) break;
+            buffer += decoder.decode(value, { stream: true });
+
+            let boundary;
+            while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+                const block = buffer.slice(0, boundary);
+                buffer = buffer.slice(boundary + 2);
+
+                let event = 'message';
+                let data = '';
+                block.split('\n').forEach(line => {
+                    if (line.startsWith('event:')) event = line.slice(6).trim();
+                    else if (line.startsWith('data:')) data += line.slice(5).trim();
+                });
+                onEvent(event, data ? JSON.parse(data) : {});
+            }
+        }
+    }
+
+    handleStreamEvent(event, data) {
+        switch (event) {
+            case 'parse':
+                this.streamTokens = '';
+                this.streamWarnings = data.warnings || [];
+                this.showPreview(this.formatParsePreview(data));
+                break;
+            case 'token':
+                this.streamTokens += data.text;
+                this.showPreview(`# 模型输出中...\n${this.streamTokens}`);
+                break;
+            case 'validation':
+                this.streamWarnings = data.warnings || [];
+                break;
+            case 'yaml':
+                this.currentYAML = data.yaml_content;
+                this.currentFilename = data.filename;
+                this.showResult(data.yaml_content);
+                this.showSuccess(this.streamWarnings.length ?
+                    `YAML 生成成功（${this.streamWarnings.length} 条提示）` : 'YAML 生成成功！');
+                this.loadFiles(); // 刷新文件列表
+                break;
+            case 'error':
+                this.showError(data.error);
+                break;
+        }
+    }
+
+    formatParsePreview(data) {
+        const lines = [
+            `# ${data.stage === 'rule' ? '规则解析结果' : '解析完成，正在生成 YAML...'}`,
+            `# 作用域: ${data.scope}  目标: ${data.target}  动作: ${data.action}  置信度: ${data.confidence.toFixed(2)}`
+        ];
+        Object.entries(data.parameters || {}).forEach(([key, value]) => {
+            lines.push(`#   ${key}: ${Array.isArray(value) ? value.join(',') : value}`);
+        });
+        (data.warnings || []).forEach(warning => lines.push(`# ⚠️ ${warning}`));
+        return lines.join('\n');
+    }
+
+    showPreview(text) {
+        // 中间结果不做语法高亮和滚动，避免流式刷新时闪烁
+        const resultContainer = document.getElementById('resultContainer');
+        document.getElementById('yamlContent').textContent = text;
+        resultContainer.style.display = 'block';
+    }
+
     async batchGenerate() {
         const instructionsText = document.getElementById('batchInstructions').value.trim();
         
@@ -245,12 +316,16 @@ class ChaosBladeApp {
         const statusBadge = model.status === 'ready' ? 
             '<span class="badge bg-success">已配置</span>' : 
             '<span class="badge bg-warning">需要配置</span>';
+        const breakerState = model.breaker ? model.breaker.state : 'closed';
+        const breakerBadge = breakerState === 'open' ?
+            `<span class="badge bg-danger ms-1">已熔断 (${model.breaker.retry_in}s)</span>` :
+            (breakerState === 'half_open' ? '<span class="badge bg-info ms-1">探测中</span>' : '');
 
         modelInfo.innerHTML = `
             <div>
                 <div class="d-flex align-items-center mb-2">
                     <span class="model-badge me-2">${model.display_name}</span>
-                    ${statusBadge}
+                    ${statusBadge}${breakerBadge}
                 </div>
                 <div class="model-details">
                     <div><strong>温度:</strong> ${model.temperature} | <strong>最大令牌:</strong> ${model.max_tokens} | <strong>超时:</strong> ${model.timeout}s</div>
@@ -0,0 +1,106 @@
+import os
+import sys
+import json
+import threading
+import importlib.machinery
+import importlib.util
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# 未创建config.py时使用示例配置运行测试
+try:
+    import config  # noqa: F401
+except ImportError:
+    _path = os.path.join(ROOT, "config.py.example")
+    _loader = importlib.machinery.SourceFileLoader("config", _path)
+    _spec = importlib.util.spec_from_file_location("config", _path, loader=_loader)
+    _config = importlib.util.module_from_spec(_spec)
+    _loader.exec_module(_config)
+    sys.modules["config"] = _config
+
+
+class _ChatCompletionHandler(BaseHTTPRequestHandler):
+    """OpenAI兼容的 /chat/completions 桩服务，返回 server.reply(请求体) 给出的 (状态码, 内容)"""
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        self.server.requests.append(body)
+        status, content = self.server.reply(body)
+        if status != 200:
+            self._send_json(status, {"error": {"message": content, "type": "invalid_request_error"}})
+        elif body.get("stream"):
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.end_headers()
+            for start in range(0, len(content), 16):
+                chunk = {"id": "stub", "object": "chat.completion.chunk", "created": 0, "model": body["model"],
+                         "choices": [{"index": 0, "delta": {"content": content[start:start + 16]},
+                                      "finish_reason": None}]}
+                self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+            self.wfile.write(b"data: [DONE]\n\n")
+        else:
+            self._send_json(200, {
+                "id": "stub", "object": "chat.completion", "created": 0, "model": body["model"],
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": content},
+                             "finish_reason": "stop"}],
+                "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2}
+            })
+
+    def _send_json(self, status, data):
+        payload = json.dumps(data).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+@pytest.fixture
+def llm_server():
+    """本地大模型桩服务，测试中可替换 server.reply"""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _ChatCompletionHandler)
+    server.requests = []
+    server.reply = lambda body: (200, "{}")
+    server.base_url = f"http://127.0.0.1:{server.server_address[1]}/v1"
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def llm_parser(llm_server, monkeypatch):
+    """指向桩服务的解析器工厂，使用独立的内存缓存、熔断器和路由器"""
+    from chaosblade import breaker, registry, router, parser as parser_module
+    from chaosblade.cache import LRUCache, TwoLevelCache
+    from chaosblade.settings import get_config_version
+
+    monkeypatch.setattr(parser_module, "config", SimpleNamespace(
+        get_model_name=lambda key: key,
+        get_model_config=lambda key: {"temperature": 0.1, "max_tokens": 256, "timeout": 5},
+        get_effective_api_config=lambda key: {"base_url": llm_server.base_url, "api_key": "test", "headers": {}}
+    ))
+    monkeypatch.setattr(breaker, "_breakers", {})
+    monkeypatch.setattr(registry, "_registry", registry.InstanceRegistry())
+
+    def create(model="stub-model", mode="llm", routing_models=None):
+        if routing_models:
+            monkeypatch.setattr(router, "_router", router.ModelRouter(routing_models))
+            monkeypatch.setattr(router, "_router_config_version", get_config_version())
+            model = parser_module.AUTO_MODEL_KEY
+        parser = parser_module.NaturalLanguageParser(model=model, mode=mode)
+        parser.client = parser.client.with_options(max_retries=0)
+        parser.response_cache = TwoLevelCache(LRUCache(16))
+        parser.skeleton_cache = TwoLevelCache(LRUCache(16))
+        return parser
+
+    return create
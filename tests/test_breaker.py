@@ -0,0 +1,36 @@
+import pytest
+
+from chaosblade.breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError
+
+
+def _fail(breaker, error=RuntimeError, neutral=()):
+    with pytest.raises(error):
+        with breaker.protect(neutral=neutral):
+            raise error("失败")
+
+
+def test_opens_after_consecutive_failures():
+    breaker = CircuitBreaker("m", failure_threshold=2, reset_timeout=60)
+    _fail(breaker)
+    assert breaker.state == CLOSED
+    _fail(breaker)
+    assert breaker.state == OPEN
+    with pytest.raises(CircuitOpenError):
+        with breaker.protect():
+            pass
+
+
+def test_half_open_allows_single_probe():
+    breaker = CircuitBreaker("m", failure_threshold=1, reset_timeout=0)
+    _fail(breaker)
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow()
+    assert not breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CLOSED
+
+
+def test_neutral_errors_count_as_success():
+    breaker = CircuitBreaker("m", failure_threshold=1, reset_timeout=60)
+    _fail(breaker, ValueError, neutral=(ValueError,))
+    assert breaker.state == CLOSED
@@ -0,0 +1,94 @@
+import os
+import shutil
+
+import pytest
+
+from chaosblade.cache import LRUCache, SQLiteCache, TwoLevelCache
+from chaosblade.canonical import canonicalize, skeleton_cache_key
+from chaosblade.llm import response_cache_key
+from chaosblade.spec_index import DEFAULT_SPEC_DIR, SpecIndex
+
+SPEC_FILE = "chaosblade-os-spec-1.7.4.yaml"
+
+
+def test_lru_evicts_least_recently_used():
+    cache = LRUCache(2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert "a" in cache and "c" in cache and "b" not in cache
+
+
+def test_sqlite_cache_persists_and_evicts(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    cache = SQLiteCache(path, max_entries=2)
+    for key in ("a", "b", "c"):
+        cache.set(key, {"value": key})
+    cache.close()
+
+    reopened = SQLiteCache(path, max_entries=2)
+    assert len(reopened) == 2
+    assert reopened.get("c") == {"value": "c"}
+    assert reopened.get("a") is None
+
+
+def test_sqlite_schema_change_drops_entries(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    old = SQLiteCache(path, schema_version=1)
+    old.set("a", 1)
+    old.close()
+    assert SQLiteCache(path, schema_version=2).get("a") is None
+
+
+def test_two_level_cache_fills_memory_from_disk(tmp_path):
+    disk = SQLiteCache(str(tmp_path / "cache.sqlite3"))
+    disk.set("a", [1, 2])
+    cache = TwoLevelCache(LRUCache(4), disk)
+    assert cache.get("a") == [1, 2]
+    assert cache.memory.get("a") == [1, 2]
+
+
+@pytest.fixture
+def spec_dir(tmp_path):
+    directory = tmp_path / "yaml"
+    directory.mkdir()
+    shutil.copy(os.path.join(DEFAULT_SPEC_DIR, SPEC_FILE), directory / SPEC_FILE)
+    return str(directory)
+
+
+def test_spec_index_reuses_disk_cache(spec_dir, tmp_path, monkeypatch):
+    cache_dir = str(tmp_path / "cache")
+    first = SpecIndex(spec_dir, cache_dir)
+    assert len(first) > 0
+
+    def fail(files):
+        raise AssertionError("命中磁盘缓存时不应重新解析YAML")
+
+    monkeypatch.setattr(SpecIndex, "_compile", staticmethod(fail))
+    second = SpecIndex(spec_dir, cache_dir)
+    assert second.version == first.version
+    assert len(second) == len(first)
+    assert second.get("host", "network", "delay") == first.get("host", "network", "delay")
+
+
+def test_spec_index_version_follows_file_content(spec_dir, tmp_path):
+    cache_dir = str(tmp_path / "cache")
+    version = SpecIndex(spec_dir, cache_dir).version
+    with open(os.path.join(spec_dir, SPEC_FILE), "a", encoding="utf-8") as f:
+        f.write("\n# changed\n")
+    assert SpecIndex(spec_dir, cache_dir).version != version
+
+
+def test_response_cache_key_parts():
+    key = response_cache_key("model-a", "在 Pod nginx 上创建延迟", "v1")
+    assert key == response_cache_key("model-a", "在　Pod  nginx 上创建延迟", "v1")
+    assert key != response_cache_key("model-b", "在 Pod nginx 上创建延迟", "v1")
+    assert key != response_cache_key("model-a", "在 Pod nginx 上创建延迟", "v2")
+
+
+def test_skeleton_cache_key_shared_by_instructions_with_same_shape():
+    first = canonicalize("在 Pod nginx-pod 上创建网络延迟，延迟 100ms")
+    second = canonicalize("在 Pod redis-pod 上创建网络延迟，延迟 300ms")
+    assert skeleton_cache_key("m", first, "v1") == skeleton_cache_key("m", second, "v1")
+    assert skeleton_cache_key("m", first, "v1") != skeleton_cache_key("other", first, "v1")
@@ -0,0 +1,60 @@
+import pytest
+
+from chaosblade.canonical import canonicalize
+
+
+def _llm_result(instruction, name, delay):
+    return {
+        "scope": "pod",
+        "target": "network",
+        "action": "delay",
+        "parameters": {"names": [name], "time": delay},
+        "description": f"在 Pod {name} 上创建网络延迟 {instruction[-5:]}"
+    }
+
+
+@pytest.mark.parametrize("first, second, expected_desc", [
+    (("在 Pod nginx-pod 上创建网络延迟，延迟 100ms", "nginx-pod", "100"),
+     ("在 Pod redis-pod 上创建网络延迟，延迟 300ms", "redis-pod", "300"),
+     "在 Pod redis-pod 上创建网络延迟 300ms"),
+    (("在Pod mysql-pod上创建网络延迟，延迟300ms", "mysql-pod", "300"),
+     ("在Pod kafka-pod上创建网络延迟，延迟400ms", "kafka-pod", "400"),
+     "在 Pod kafka-pod 上创建网络延迟 400ms"),
+])
+def test_skeleton_replaces_values_in_description(first, second, expected_desc):
+    instruction, name, delay = first
+    canonical = canonicalize(instruction)
+    skeleton = canonical.build_skeleton(_llm_result(instruction, name, delay))
+    assert skeleton is not None
+
+    other = canonicalize(second[0])
+    assert other.text == canonical.text
+    filled = other.fill(skeleton)
+    assert filled["parameters"] == {"names": [second[1]], "time": second[2]}
+    assert filled["description"] == expected_desc
+
+
+def test_skeleton_rejected_when_description_keeps_literal_value():
+    canonical = canonicalize("在 Pod nginx-pod 上创建网络延迟，延迟 100ms")
+    data = _llm_result("", "nginx-pod", "100")
+    data["description"] = "延迟x100ms"
+    assert canonical.build_skeleton(data) is None
+
+
+def test_units_are_part_of_the_skeleton():
+    millis = canonicalize("在 Pod nginx-pod 上创建网络延迟，延迟 100ms")
+    seconds = canonicalize("在 Pod nginx-pod 上创建网络延迟，延迟 2s")
+    assert millis.text != seconds.text
+    assert millis.text.endswith("<KEYED_NUMBER0>ms")
+
+    skeleton = millis.build_skeleton(_llm_result("延迟 100ms", "nginx-pod", "100ms"))
+    same_unit = canonicalize("在 Pod redis-pod 上创建网络延迟，延迟 250ms")
+    assert same_unit.text == millis.text
+    assert same_unit.fill(skeleton)["parameters"]["time"] == "250ms"
+
+
+def test_unit_entities_keep_their_unit_literal():
+    seconds = canonicalize("在节点 node-1 上填充磁盘 10GiB，持续 60s")
+    minutes = canonicalize("在节点 node-1 上填充磁盘 10GiB，持续 5m")
+    assert seconds.text.endswith("<SIZE0>GiB，持续 <DURATION0>s")
+    assert seconds.text != minutes.text
@@ -0,0 +1,63 @@
+import random
+
+import pytest
+import yaml
+
+from chaosblade.emitter import dump_experiment
+
+
+EDGE_SCALARS = [
+    "", " ", "plain", "it's", "'quoted'", '"double"', "key: value", "a:b", "trailing:",
+    "# comment", "a #b", "a#b", "007", "0x1F", "1e3", "1.5", "-1", "+1", ".5",
+    "true", "false", "yes", "no", "on", "off", "null", "Null", "~", "y", "n",
+    "2024-01-01", "12:30:00", "中文描述", "延迟 100ms", "é", "emoji 🙂",
+    "line1\nline2", "tab\there", "\x07bell", "﻿bom", "---", "...", "- item", "? key",
+    "[list]", "{map}", "&anchor", "*alias", "!tag", "|literal", ">folded", "%directive",
+    "@at", "`tick", "a, b", "x" * 120, "word " * 30, "/tmp/test.log", "192.168.1.1/24",
+]
+
+
+def _experiment(value):
+    return {
+        "apiVersion": "chaosblade.io/v1alpha1",
+        "kind": "ChaosBlade",
+        "metadata": {"name": "test", "namespace": "default"},
+        "spec": {
+            "experiments": [{
+                "scope": "node",
+                "target": "file",
+                "action": "add",
+                "desc": value,
+                "matchers": [{"name": "names", "value": [value, "node-1"]}],
+                "flags": [{"name": "content", "value": value}]
+            }]
+        }
+    }
+
+
+def _reference(document):
+    return yaml.dump(document, default_flow_style=False, allow_unicode=True)
+
+
+@pytest.mark.parametrize("value", EDGE_SCALARS)
+def test_scalar_round_trip_matches_pyyaml(value):
+    document = _experiment(value)
+    assert dump_experiment(document) == _reference(document)
+
+
+@pytest.mark.parametrize("document", [
+    {"empty_list": [], "empty_map": {}, "none": None, "number": 3, "flag": True},
+    {"spec": {"experiments": []}},
+    {"nested": [{"a": []}, {}, "x"]},
+])
+def test_empty_and_non_string_values_match_pyyaml(document):
+    assert dump_experiment(document) == _reference(document)
+
+
+def test_random_documents_match_pyyaml():
+    rng = random.Random(0)
+    alphabet = ["a", "1", "-", ":", " ", "#", "'", '"', "中", "\n", ".", "0", "~", "é"]
+    for _ in range(500):
+        value = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 12)))
+        document = _experiment(value)
+        assert dump_experiment(document) == _reference(document)
@@ -0,0 +1,46 @@
+import pytest
+
+import config
+from chaosblade.entities import extract_entities
+
+
+# 关键词与数值之间的其他实体不能被关键数字吞掉
+SENTENCES = [
+    ("在节点 node-1 上创建网络延迟，网卡 eth0，延迟 100ms",
+     {"delay": "100", "interface": "eth0", "names": ["node-1"]}),
+    ("delay network on pod nginx-pod by 100ms",
+     {"delay": "100", "names": ["nginx-pod"]}),
+    ("load cpu on node worker-1 to 80%",
+     {"load": "80", "names": ["worker-1"]}),
+    ("create network delay on pod frontend-abc12 namespace shop with 200ms",
+     {"delay": "200", "names": ["frontend-abc12"], "namespace": ["shop"]}),
+]
+
+
+@pytest.mark.parametrize("instruction, expected", SENTENCES)
+def test_keyed_number_does_not_swallow_entities(instruction, expected):
+    entities = extract_entities(instruction)
+    objects = entities.values("object")
+    for name in expected["names"]:
+        assert name in objects
+    if "interface" in expected:
+        assert entities.first("interface").value == expected["interface"]
+    if "namespace" in expected:
+        assert entities.values("namespace") == expected["namespace"]
+    for keyed in entities.all("keyed_number"):
+        assert keyed.value == expected.get(keyed.key)
+
+
+def test_keyed_number_allows_short_connector():
+    assert extract_entities("延迟为200ms").first("keyed_number", "delay").value == "200"
+    assert extract_entities("delay of 50ms").first("keyed_number", "delay").value == "50"
+
+
+@pytest.mark.skipif(not hasattr(config, "get_model_name"), reason="需要config.py中的模型配置")
+@pytest.mark.parametrize("instruction, expected", SENTENCES)
+def test_rule_parser_parameters(instruction, expected):
+    from chaosblade.parser import NaturalLanguageParser
+
+    parameters = NaturalLanguageParser(mode="rule").parse_instruction(instruction).parameters
+    for name, value in expected.items():
+        assert parameters.get(name) == value
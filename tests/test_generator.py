@@ -0,0 +1,48 @@
+import pytest
+import yaml
+
+from chaosblade.generator import YAMLGenerator
+from chaosblade.models import ParsedResult
+
+
+def _parsed(name, namespace, timeout=None):
+    parameters = {"names": ["web"], "namespace": [namespace], "time": "100", "interface": "eth0"}
+    if timeout:
+        parameters["timeout"] = timeout
+    return ParsedResult(name=name, scope="pod", target="network", action="delay",
+                        parameters=parameters, description="")
+
+
+@pytest.fixture
+def generator():
+    generator = YAMLGenerator()
+    generator.optimizer._get_inventory = lambda: None
+    return generator
+
+
+def _documents(result):
+    return [document for document in yaml.safe_load_all(result.yaml_content) if document]
+
+
+def test_pack_groups_by_namespace_and_limit(generator):
+    results = generator.generate_packed_yaml(
+        [_parsed("a", "shop"), _parsed("b", "ops"), _parsed("c", "shop"), _parsed("d", "shop")],
+        max_experiments=2, name_prefix="batch"
+    )
+    assert all(result.success for result in results)
+    packs = [_documents(result)[0] for result in results]
+    assert [(pack["metadata"]["name"], pack["metadata"]["namespace"], len(pack["spec"]["experiments"]))
+            for pack in packs] == [("batch-1", "shop", 2), ("batch-2", "shop", 1), ("batch-3", "ops", 1)]
+
+
+def test_pack_separates_timeouts(generator):
+    results = generator.generate_packed_yaml([_parsed("a", "shop", "60"), _parsed("b", "shop", "120")],
+                                             name_prefix="batch")
+    assert len(results) == 2
+
+
+def test_multi_document_pack_has_unique_names(generator):
+    results = generator.generate_packed_yaml([_parsed("a", "shop"), _parsed("a", "shop")],
+                                             multi_document=True, name_prefix="batch")
+    names = [document["metadata"]["name"] for document in _documents(results[0])]
+    assert len(names) == 2 and len(set(names)) == 2
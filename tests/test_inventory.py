@@ -0,0 +1,62 @@
+import json
+import subprocess
+
+from chaosblade import inventory as inventory_module
+from chaosblade.inventory import ClusterInventory
+from chaosblade.validator import SmartParameterOptimizer
+
+NODES = {"kind": "List", "items": [{"kind": "Node", "metadata": {"name": "node-1"}}]}
+PODS = {"kind": "List", "items": [{"kind": "Pod", "metadata": {"name": "web-1", "namespace": "shop"},
+                                   "spec": {"containers": [{"name": "nginx"}]}}]}
+FORBIDDEN = "Error from server (Forbidden): pods is forbidden"
+
+
+def _fake_kubectl(monkeypatch, responses, namespace="shop"):
+    """responses: 资源名 -> 文档，缺省表示权限不足"""
+    calls = []
+
+    def run(command, **kwargs):
+        calls.append(command)
+        document = responses.get(command[2])
+        if document is None:
+            return subprocess.CompletedProcess(command, 1, "", FORBIDDEN)
+        return subprocess.CompletedProcess(command, 0, json.dumps(document), "")
+
+    monkeypatch.setattr(inventory_module.subprocess, "run", run)
+    monkeypatch.setattr(inventory_module, "read_current_namespace", lambda: namespace)
+    return calls
+
+
+def test_falls_back_to_current_namespace(monkeypatch):
+    calls = _fake_kubectl(monkeypatch, {"nodes": NODES, "pods": PODS})
+    inventory = ClusterInventory.from_kubectl()
+
+    assert ["kubectl", "get", "pods", "-o", "json", "-n", "shop"] in calls
+    assert inventory.nodes_listed and inventory.has_node("node-1")
+    assert inventory.has_pod("web-1", "shop")
+    assert inventory.covers_namespace("shop") and not inventory.covers_namespace("default")
+
+
+def test_keeps_pods_when_nodes_are_forbidden(monkeypatch):
+    _fake_kubectl(monkeypatch, {"pods": PODS})
+    inventory = ClusterInventory.from_kubectl()
+
+    assert not inventory.nodes_listed
+    assert inventory.get_namespace_containers("shop") == {"nginx"}
+
+
+def test_no_inventory_when_everything_is_forbidden(monkeypatch):
+    _fake_kubectl(monkeypatch, {})
+    assert ClusterInventory.from_kubectl() is None
+
+
+def test_partial_inventory_only_checks_listed_resources(monkeypatch):
+    _fake_kubectl(monkeypatch, {"pods": PODS})
+    optimizer = SmartParameterOptimizer()
+    monkeypatch.setattr(optimizer, "_get_inventory", ClusterInventory.from_kubectl)
+
+    assert optimizer.validate_resource_names({"names": ["node-9"]}, "node") == []
+    assert optimizer.validate_resource_names({"names": ["web-2"], "namespace": ["other"]}, "pod") == []
+    assert optimizer.validate_resource_names({"names": ["web-2"], "namespace": ["shop"]}, "pod") == [
+        "Pod web-2 不在命名空间 shop 中"
+    ]
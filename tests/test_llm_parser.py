@@ -0,0 +1,115 @@
+import json
+import asyncio
+
+from chaosblade.llm import response_cache_key
+from chaosblade.parser import AsyncClientPool, get_tier_stats
+
+
+DELAY_RESULT = {
+    "scope": "pod", "target": "network", "action": "delay",
+    "parameters": {"names": ["nginx-pod"], "time": "100", "interface": None, "namespace": [None]},
+    "description": "Pod网络延迟"
+}
+
+
+def test_response_cache_miss_then_hit(llm_server, llm_parser):
+    llm_server.reply = lambda body: (200, json.dumps(DELAY_RESULT))
+    parser = llm_parser()
+
+    first = parser.parse_instruction("在 Pod nginx-pod 上创建网络延迟，延迟 100ms")
+    second = parser.parse_instruction("在 Pod nginx-pod 上创建网络延迟，延迟 100ms")
+
+    assert len(llm_server.requests) == 1
+    assert llm_server.requests[0]["model"] == "stub-model"
+    assert first.parameters == second.parameters == {"names": ["nginx-pod"], "time": "100"}
+    assert parser.get_tier_stats() == {"llm": 1, "llm_cache": 1}
+
+
+def test_cache_key_keeps_case(llm_server, llm_parser):
+    llm_server.reply = lambda body: (200, json.dumps(DELAY_RESULT))
+    parser = llm_parser()
+
+    parser.parse_instruction("删除文件 /tmp/App.log")
+    parser.parse_instruction("删除文件 /tmp/app.log")
+    assert len(llm_server.requests) == 2
+
+
+def test_request_error_falls_back_to_rules(llm_server, llm_parser):
+    llm_server.reply = lambda body: (400, "bad request")
+    parser = llm_parser()
+
+    result = parser.parse_instruction("在 Pod nginx-pod 上创建网络延迟，延迟 100ms")
+    assert result.fallback
+    assert result.target == "network" and result.parameters["delay"] == "100"
+    assert any("LLM解析失败" in warning for warning in result.warnings)
+    assert parser.get_tier_stats() == {"llm_fallback": 1}
+
+
+def test_invalid_response_is_not_cached(llm_server, llm_parser):
+    replies = iter([(200, "无法解析"), (200, json.dumps(DELAY_RESULT))])
+    llm_server.reply = lambda body: next(replies)
+    parser = llm_parser()
+
+    assert parser.parse_instruction("在 Pod nginx-pod 上创建网络延迟，延迟 100ms").fallback
+    assert not parser.parse_instruction("在 Pod nginx-pod 上创建网络延迟，延迟 100ms").fallback
+    assert len(llm_server.requests) == 2
+
+
+def test_routed_stream_skips_failing_model(llm_server, llm_parser):
+    llm_server.reply = lambda body: (400, "down") if body["model"] == "down" else (200, json.dumps(DELAY_RESULT))
+    parser = llm_parser(routing_models=["down", "up"])
+
+    events = list(parser.stream_instruction("在 Pod nginx-pod 上创建网络延迟，延迟 100ms"))
+    assert [body["model"] for body in llm_server.requests] == ["down", "up"]
+    assert any(event == "token" for event, _ in events)
+    event, parsed = events[-1]
+    assert event == "parsed" and not parsed.fallback
+    assert parsed.parameters["time"] == "100"
+
+
+def test_routed_result_is_cached_under_answering_model(llm_server, llm_parser):
+    llm_server.reply = lambda body: (400, "down") if body["model"] == "down" else (200, json.dumps(DELAY_RESULT))
+    parser = llm_parser(routing_models=["down", "up"])
+    instruction = "在 Pod nginx-pod 上创建网络延迟，延迟 100ms"
+
+    assert not parser.parse_instruction(instruction).fallback
+    version = parser.specifications.version
+    assert parser.response_cache.get(response_cache_key("up", instruction, version)) is not None
+    assert parser.response_cache.get(response_cache_key("down", instruction, version)) is None
+
+    parser.parse_instruction(instruction)
+    assert len(llm_server.requests) == 2
+
+
+def test_async_parse_is_routed(llm_server, llm_parser):
+    llm_server.reply = lambda body: (400, "down") if body["model"] == "down" else (200, json.dumps(DELAY_RESULT))
+    parser = llm_parser(routing_models=["down", "up"])
+
+    async def parse():
+        clients = AsyncClientPool()
+        try:
+            return await parser.aparse_instruction("在 Pod nginx-pod 上创建网络延迟，延迟 100ms", clients)
+        finally:
+            await clients.aclose()
+
+    result = asyncio.run(parse())
+    assert not result.fallback and result.parameters["time"] == "100"
+    assert [body["model"] for body in llm_server.requests] == ["down", "up"]
+
+
+def test_tier_counters_are_aggregated_across_parsers(llm_server, llm_parser):
+    llm_server.reply = lambda body: (200, json.dumps(DELAY_RESULT))
+    before = get_tier_stats()
+    llm_parser(model="a").parse_instruction("在 Pod nginx-pod 上创建网络延迟，延迟 100ms")
+    llm_parser(model="b", mode="rule").parse_instruction("在 Pod nginx-pod 上创建网络延迟，延迟 100ms")
+
+    after = get_tier_stats()
+    assert after.get("llm", 0) - before.get("llm", 0) == 1
+    assert after.get("rule", 0) - before.get("rule", 0) == 1
+
+
+def test_confidence_counts_explicit_default_keywords(llm_parser):
+    parser = llm_parser(mode="rule")
+    assert parser.parse_instruction("在节点 node-1 上添加文件 /root/test.log").confidence == 1.0
+    # 未命中目标/动作关键词时回退到默认的 file/add，不应达到分层阈值
+    assert parser.parse_instruction("在节点 node-1 上处理 /root/test.log").confidence < parser.confidence_threshold
@@ -0,0 +1,20 @@
+import pytest
+
+from chaosblade.matcher import KeywordMatcher, get_instruction_matcher
+
+
+@pytest.mark.parametrize("instruction, category, keyword", [
+    ("暂停容器 container-id-12345", "target", "container"),
+    ("在 Pod mysql-primary 上注入故障", "target", "mysql"),
+    ("在 Pod web-dns-1 上注入故障", "action", "dns"),
+    ("在 Pod redis.cache.local 上注入故障", "target", "redis"),
+])
+def test_keywords_inside_resource_names_are_ignored(instruction, category, keyword):
+    matches = get_instruction_matcher().find(instruction)
+    assert keyword not in KeywordMatcher.select_all(matches, category)
+
+
+def test_trailing_period_is_a_boundary():
+    matches = get_instruction_matcher().find("delay network on the pod.")
+    assert "network" in KeywordMatcher.select_all(matches, "target")
+    assert "pod" in KeywordMatcher.select_all(matches, "scope")
@@ -0,0 +1,15 @@
+from chaosblade import registry
+
+
+def test_parsers_are_shared_per_model(llm_parser):
+    parser = registry.get_parser(model="a")
+    assert registry.get_parser(model="a") is parser
+    assert registry.get_parser(model="b") is not parser
+
+
+def test_config_reload_rebuilds_instances(llm_parser, monkeypatch):
+    parser = registry.get_parser(model="a")
+    generator = registry.get_generator()
+    monkeypatch.setattr(registry, "get_config_version", lambda: -1)
+    assert registry.get_parser(model="a") is not parser
+    assert registry.get_generator() is not generator
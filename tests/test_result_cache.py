@@ -0,0 +1,44 @@
+from chaosblade.cache import LRUCache, SQLiteCache, TwoLevelCache
+from chaosblade.models import ParsedResult
+from chaosblade.result_cache import GenerationCache
+
+
+def _key(instruction, parser_version="1"):
+    return GenerationCache.make_key(instruction, "llama3.1", "rule", "spec-v1", parser_version, "1")
+
+
+def _parsed(**kwargs):
+    values = dict(name="exp", scope="pod", target="network", action="delay",
+                  parameters={"names": ["nginx"], "time": "100"}, description="")
+    values.update(kwargs)
+    return ParsedResult(**values)
+
+
+def test_key_preserves_case_but_normalizes_width_and_whitespace():
+    assert _key("在 Pod  Nginx 上创建延迟") == _key("在　Pod Nginx 上创建延迟 ")
+    assert _key("删除文件 /tmp/App.log") != _key("删除文件 /tmp/app.log")
+
+
+def test_key_includes_parser_version():
+    assert _key("在 Pod nginx 上创建延迟") != _key("在 Pod nginx 上创建延迟", parser_version="2")
+
+
+def test_cached_result_survives_restart(tmp_path):
+    path = str(tmp_path / "results.sqlite3")
+    key = _key("在 Pod nginx 上创建延迟")
+    GenerationCache(TwoLevelCache(LRUCache(4), SQLiteCache(path))).set(key, _parsed())
+
+    restarted = GenerationCache(TwoLevelCache(LRUCache(4), SQLiteCache(path)))
+    cached = restarted.get(key)
+    assert cached == _parsed()
+    cached.parameters["names"].append("changed")
+    assert restarted.get(key) == _parsed()
+
+
+def test_fallback_and_expired_results_are_not_served():
+    cache = GenerationCache(TwoLevelCache(LRUCache(4)), ttl=60)
+    cache.set("fallback", _parsed(fallback=True))
+    assert cache.get("fallback") is None
+
+    cache.cache.set("old", {"parsed": {}, "created_at": 0})
+    assert cache.get("old") is None
@@ -0,0 +1,62 @@
+import asyncio
+
+import pytest
+
+from chaosblade.router import ModelRouter
+
+
+def _stream(tokens, fail_after=None):
+    def generate():
+        for index, token in enumerate(tokens):
+            if index == fail_after:
+                raise RuntimeError("连接中断")
+            yield token
+        return "".join(tokens)
+    return generate()
+
+
+def test_stream_switches_model_when_first_fails_before_output():
+    router = ModelRouter(["primary", "backup"])
+    streams = {"primary": _stream(["a"], fail_after=0), "backup": _stream(["b", "c"])}
+
+    tokens = []
+    iterator = router.stream(lambda model: streams[model])
+    with pytest.raises(StopIteration) as stop:
+        while True:
+            tokens.append(next(iterator))
+    assert tokens == ["b", "c"] and stop.value.value == "bc"
+
+    stats = router.get_stats()
+    assert stats["primary"]["failures"] == 1 and stats["backup"]["requests"] == 1
+    assert stats["primary"]["in_flight"] == stats["backup"]["in_flight"] == 0
+
+
+def test_stream_does_not_switch_after_output():
+    router = ModelRouter(["primary", "backup"])
+    streams = {"primary": _stream(["a", "b"], fail_after=1), "backup": _stream(["c"])}
+
+    tokens = []
+    with pytest.raises(RuntimeError):
+        for token in router.stream(lambda model: streams[model]):
+            tokens.append(token)
+    assert tokens == ["a"]
+
+
+def test_stream_skips_excluded_models():
+    router = ModelRouter(["primary", "backup"])
+    assert list(router.stream(lambda model: _stream([model]), exclude=lambda model: model == "primary")) == ["backup"]
+    with pytest.raises(RuntimeError):
+        list(router.stream(lambda model: _stream([model]), exclude=lambda model: True))
+
+
+def test_async_hedge_cancels_slow_primary():
+    router = ModelRouter(["primary", "backup"], hedging=True, hedge_delay=0.05)
+
+    async def call(model):
+        await asyncio.sleep(1 if model == "primary" else 0)
+        return model
+
+    assert asyncio.run(router.arequest(call)) == "backup"
+    stats = router.get_stats()
+    assert stats["primary"]["in_flight"] == 0 and stats["primary"]["requests"] == 0
+    assert stats["backup"]["requests"] == 1
@@ -0,0 +1,48 @@
+import time
+import threading
+
+import pytest
+
+from chaosblade.singleflight import SingleFlight
+
+
+def test_concurrent_calls_share_one_execution():
+    flight = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+    executions = []
+
+    def compute():
+        executions.append(1)
+        started.set()
+        release.wait(5)
+        return "result"
+
+    results = []
+    leader = threading.Thread(target=lambda: results.append(flight.do("key", compute)))
+    leader.start()
+    started.wait(5)
+    followers = [threading.Thread(target=lambda: results.append(flight.do("key", compute))) for _ in range(3)]
+    for thread in followers:
+        thread.start()
+    while flight.get_stats()["coalesced"] < 3:
+        time.sleep(0.001)
+    release.set()
+    for thread in [leader] + followers:
+        thread.join(5)
+
+    assert results == ["result"] * 4 and len(executions) == 1
+    stats = flight.get_stats()
+    assert stats["executions"] == 1 and stats["coalescing_rate"] == 0.75 and stats["in_flight"] == 0
+
+
+def test_errors_are_raised_and_results_not_kept():
+    flight = SingleFlight()
+
+    def fail():
+        raise ValueError("解析失败")
+
+    with pytest.raises(ValueError):
+        flight.do("key", fail)
+    assert flight.do("key", lambda: 1) == 1
+    assert flight.do("key", lambda: 2) == 2
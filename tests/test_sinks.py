@@ -0,0 +1,41 @@
+import io
+import json
+
+import pytest
+
+from chaosblade.models import GenerationResult
+from chaosblade.sinks import NDJSONSink, ResultSink, YAMLStreamSink, open_sink
+
+
+def test_result_sink_is_abstract():
+    with pytest.raises(TypeError):
+        ResultSink(stream=io.StringIO())
+
+
+def test_yaml_sink_writes_documents_and_failures():
+    stream = io.StringIO()
+    with YAMLStreamSink(stream=stream) as sink:
+        sink.write(0, "添加文件", GenerationResult(success=True, yaml_content="kind: ChaosBlade"))
+        sink.write(1, "无效\n指令", GenerationResult(success=False, error_message="无法解析"))
+
+    assert stream.getvalue() == ("---\n# [0] 添加文件\nkind: ChaosBlade\n"
+                                 "---\n# [1] 无效 指令\n# 生成失败: 无法解析\n")
+    assert sink.get_summary() == {"total": 2, "succeeded": 1, "failed": 1}
+
+
+def test_ndjson_sink_writes_one_line_per_result(tmp_path):
+    path = str(tmp_path / "out.ndjson")
+    sink = open_sink(path)
+    assert isinstance(sink, NDJSONSink)
+    with sink:
+        sink.write(3, "添加文件", GenerationResult(success=True, yaml_content="a: 1\n"))
+
+    with open(path, encoding="utf-8") as f:
+        lines = f.read().splitlines()
+    assert len(lines) == 1
+    assert json.loads(lines[0])["index"] == 3
+
+
+def test_open_sink_rejects_unknown_format():
+    with pytest.raises(ValueError):
+        open_sink("out.txt", format="csv")
@@ -0,0 +1,44 @@
+from chaosblade.cache import LRUCache
+from chaosblade.validator import ParameterValidator, SmartParameterOptimizer
+
+
+def test_delay_renamed_to_spec_time_flag():
+    params = SmartParameterOptimizer.apply_spec_aliases(
+        {"delay": "100", "interface": "eth0"}, "pod", "network", "delay"
+    )
+    assert params == {"time": "100", "interface": "eth0"}
+
+
+def test_delay_does_not_satisfy_required_time():
+    result = ParameterValidator().validate_parameters(
+        {"delay": "100", "interface": "eth0", "names": ["nginx"], "namespace": ["default"]},
+        "pod", "network", "delay"
+    )
+    assert "time" in result.missing_required
+
+
+def test_host_scope_skips_cluster_inventory(monkeypatch):
+    optimizer = SmartParameterOptimizer()
+
+    def fail():
+        raise AssertionError("host作用域不应读取集群清单")
+
+    monkeypatch.setattr(optimizer, "_get_inventory", fail)
+    assert optimizer.validate_resource_names({"names": ["192.168.1.10"]}, "host") == []
+
+
+def test_rule_tables_are_bounded(monkeypatch):
+    monkeypatch.setattr(ParameterValidator, "_rule_tables", LRUCache(4))
+    validator = ParameterValidator()
+    for index in range(10):
+        validator.get_rules("pod", "network", f"action-{index}")
+    assert len(ParameterValidator._rule_tables) == 4
+
+
+def test_rule_tables_cleared_when_spec_version_changes(monkeypatch):
+    monkeypatch.setattr(ParameterValidator, "_rule_tables", LRUCache(16))
+    validator = ParameterValidator()
+    validator.get_rules("pod", "network", "delay")
+    monkeypatch.setattr(ParameterValidator, "_rule_tables_version", "old-version")
+    validator.get_rules("pod", "network", "loss")
+    assert len(ParameterValidator._rule_tables) == 1
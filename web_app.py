@@ -1,18 +1,27 @@
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, render_template, request, jsonify, Response, stream_with_context
 from flask_cors import CORS
 import os
 import sys
+import json
 from datetime import datetime
 
 # 添加当前目录到Python路径
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from chaosblade import quick_generate, batch_generate
+from chaosblade import quick_generate, batch_generate, iter_batch_generate, stream_generate, get_generation_flight
+from chaosblade.sinks import format_ndjson
+from chaosblade.router import get_model_router
+from chaosblade.parser import get_tier_stats
+from chaosblade.breaker import get_circuit_breaker
+from chaosblade.reloader import start_reloader
 import config
 
 app = Flask(__name__)
 CORS(app)
 
+# 后台轮询规格文件和config.py，修改后无需重启即可生效
+start_reloader()
+
 # 配置
 app.config['SECRET_KEY'] = 'your-secret-key-here'
 app.config['GENERATED_DIR'] = 'generated-yamls'
@@ -66,6 +75,47 @@ def generate_yaml():
             'error': str(e)
         }), 500
 
+def format_sse(event, data):
+    """格式化一条SSE事件"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+@app.route('/api/generate/stream', methods=['POST'])
+def generate_yaml_stream():
+    """流式生成YAML API（Server-Sent Events）
+    
+    依次推送 parse、token（使用大模型时）、validation、yaml/error 事件，最后是 done。
+    """
+    data = request.get_json() or {}
+    instruction = data.get('instruction', '').strip()
+    model = data.get('model', None)
+    
+    if not instruction:
+        return jsonify({
+            'success': False,
+            'error': '请输入指令'
+        }), 400
+    
+    def events():
+        try:
+            for event, payload in stream_generate(instruction, model=model):
+                if event == 'yaml':
+                    # 保存文件
+                    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+                    filename = f'generated_{timestamp}.yaml'
+                    filepath = os.path.join(app.config['GENERATED_DIR'], filename)
+                    with open(filepath, 'w', encoding='utf-8') as f:
+                        f.write(payload['yaml_content'])
+                    payload.update(filename=filename, filepath=filepath, timestamp=timestamp)
+                yield format_sse(event, payload)
+        except Exception as e:
+            yield format_sse('error', {'error': str(e)})
+        yield format_sse('done', {})
+    
+    return Response(stream_with_context(events()), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+
 @app.route('/api/batch-generate', methods=['POST'])
 def batch_generate_yaml():
     """批量生成YAML API"""
@@ -79,8 +129,13 @@ def batch_generate_yaml():
                 'error': '请输入指令列表'
             }), 400
         
-        # 批量生成
-        results = batch_generate(instructions, app.config['GENERATED_DIR'])
+        # 批量生成，pack为真时把兼容的实验打包到同一个资源中
+        results = batch_generate(
+            instructions, app.config['GENERATED_DIR'],
+            pack=bool(data.get('pack', False)),
+            max_experiments=data.get('max_experiments'),
+            multi_document=bool(data.get('multi_document', False))
+        )
         
         return jsonify({
             'success': True,
@@ -94,6 +149,27 @@ def batch_generate_yaml():
             'error': str(e)
         }), 500
 
+@app.route('/api/batch-generate/stream', methods=['POST'])
+def batch_generate_stream():
+    """流式批量生成: 按完成顺序返回NDJSON，每行一条结果，index为指令在输入中的位置"""
+    data = request.get_json() or {}
+    instructions = data.get('instructions', [])
+    
+    if not instructions:
+        return jsonify({
+            'success': False,
+            'error': '请输入指令列表'
+        }), 400
+    
+    def lines():
+        for index, instruction, result in iter_batch_generate(instructions, data.get('model')):
+            yield format_ndjson(index, instruction, result)
+    
+    return Response(stream_with_context(lines()), mimetype='application/x-ndjson', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+
 @app.route('/api/models', methods=['GET'])
 def get_models():
     """获取可用模型列表"""
@@ -115,7 +191,8 @@ def get_models():
                 'timeout': model_config.get('timeout', 30),
                 'base_url': api_config.get('base_url', 'N/A'),
                 'has_api_key': has_api_key,
-                'status': 'ready' if has_api_key else 'needs_config'
+                'status': 'ready' if has_api_key else 'needs_config',
+                'breaker': get_circuit_breaker(key).get_state()
             })
         
         return jsonify({
@@ -237,6 +314,17 @@ def health_check():
         'timestamp': datetime.now().isoformat()
     })
 
+@app.route('/api/metrics', methods=['GET'])
+def get_metrics():
+    """运行指标"""
+    return jsonify({
+        'success': True,
+        'singleflight': get_generation_flight().get_stats(),
+        'models': get_model_router().get_stats(),
+        'tiers': get_tier_stats(),
+        'timestamp': datetime.now().isoformat()
+    })
+
 if __name__ == '__main__':
     import os
     import sys